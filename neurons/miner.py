@@ -1,6 +1,7 @@
 from argparse import ArgumentParser
 import sys
 import bittensor as bt
+from nextplace.miner.ml.inference_pool import InferencePoolArgs
 from nextplace.miner.ml.model_loader import ModelArgs
 from nextplace.miner.real_estate_miner import RealEstateMiner
 
@@ -67,6 +68,64 @@ def build_argument_parser() -> ArgumentParser:
             Your Hugging Face API key. Use only if you are using a private Hugging Face model.
         """
     )
+    parser.add_argument(
+        "--prediction_cache_size",
+        default=50000,
+        type=int,
+        help="""
+            <int>
+            Maximum number of predictions to cache. Validators send the same homes repeatedly, and a cached home
+            skips inference until its price, days on market or listing changes. 0 disables the cache.
+        """
+    )
+    parser.add_argument(
+        "--prediction_cache_ttl",
+        default=12 * 60 * 60,
+        type=float,
+        help="""
+            <float>
+            Seconds a cached prediction stays valid.
+        """
+    )
+    parser.add_argument(
+        "--prediction_cache_path",
+        default="",
+        help="""
+            <string>
+            File to persist the prediction cache to, so it survives restarts. Leave empty to keep it in memory only.
+        """
+    )
+    parser.add_argument(
+        "--inference_workers",
+        default=1,
+        type=int,
+        help="""
+            <int>
+            Number of validator requests to run inference for at the same time. Raise this if your model is
+            thread safe and releases the GIL (e.g. NumPy or PyTorch models).
+        """
+    )
+    parser.add_argument(
+        "--inference_queue_size",
+        default=8,
+        type=int,
+        help="""
+            <int>
+            Maximum number of validator requests waiting for an inference worker. When the queue is full, the
+            request from the validator with the least stake is dropped.
+        """
+    )
+    parser.add_argument(
+        "--inference_chunk_size",
+        default=0,
+        type=int,
+        help="""
+            <int>
+            Predictions per call to a model without `run_inference_batch`. Smaller chunks let a slow model answer with
+            the predictions it finished before the validator's timeout. 0 sends the whole synapse in one call. Ignored
+            for models with `run_inference_batch`, which always get the whole synapse.
+        """
+    )
     return parser
 
 
@@ -94,6 +153,17 @@ def check_args(args: ModelArgs) -> None:
             sys.exit(1)
 
 
+def check_inference_pool_args(args: InferencePoolArgs) -> None:
+
+    if args['max_workers'] < 1:
+        bt.logging.error("'--inference_workers' must be at least 1.")
+        sys.exit(1)
+
+    if args['max_queue'] < 0 or args['chunk_size'] < 0:
+        bt.logging.error("'--inference_queue_size' and '--inference_chunk_size' must not be negative.")
+        sys.exit(1)
+
+
 # Build RealEstateMiner object, call .run() on it
 def main():
 
@@ -117,7 +187,23 @@ def main():
 
     check_args(model_args)
 
-    miner = RealEstateMiner(model_args, force_update_past_predictions, config)  # instantiate Miner object
+    # build arguments object for the PredictionCache class
+    prediction_cache_args = {
+        'max_entries': args.prediction_cache_size,
+        'ttl_seconds': args.prediction_cache_ttl,
+        'path': args.prediction_cache_path or None
+    }
+
+    # build arguments object for the InferencePool class
+    inference_pool_args = {
+        'max_workers': args.inference_workers,
+        'max_queue': args.inference_queue_size,
+        'chunk_size': args.inference_chunk_size
+    }
+
+    check_inference_pool_args(inference_pool_args)
+
+    miner = RealEstateMiner(model_args, force_update_past_predictions, config, prediction_cache_args, inference_pool_args)  # instantiate Miner object
 
     bt.logging.info("Miner has been initialized and we are connected to the network. Calling miner.run()")
     miner.run()  # run the miner
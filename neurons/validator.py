@@ -3,14 +3,23 @@ import argparse
 import bittensor as bt
 import threading
 import traceback
-from nextplace.validator.nextplace_validator import RealEstateValidator
+from nextplace.validator.nextplace_validator import RealEstateValidator, PROPERTIES_THREAD_NAME
+from nextplace.validator.scheduler.job_scheduler import JobScheduler
 import configparser
 import os
 
-from nextplace.validator.utils.contants import build_miner_predictions_table_name
 from nextplace.validator.website_data.website_communicator import WebsiteCommunicator
 
 SCORE_THREAD_NAME = "🏋🏻 ScoreThread 🏋"
+IDLE_SLEEP_SECONDS = 5  # Longest we sleep when there is nothing to send to miners
+
+# How often each periodic job runs, in seconds
+METAGRAPH_SYNC_INTERVAL = 60
+SET_WEIGHTS_INTERVAL = 3 * 60
+MINER_MANAGEMENT_INTERVAL = 15 * 60
+THREAD_WATCHDOG_INTERVAL = 10 * 60
+SEND_SCORES_INTERVAL = 2 * 60 * 60
+LOG_JOB_METRICS_INTERVAL = 30 * 60
 
 
 def main(validator):
@@ -18,44 +27,24 @@ def main(validator):
     step = 1  # Initialize step
     current_thread = threading.current_thread().name
 
-    # Start the scoring thread
-    scoring_thread = threading.Thread(target=validator.scorer.run_score_thread, name=SCORE_THREAD_NAME)
-    scoring_thread.start()
+    # Start the scoring and property prefetch threads
+    start_scoring_thread(validator)
+    start_properties_thread(validator)
+
+    scheduler = build_scheduler(validator)
 
     while True:
         validator.should_step = True
         try:
-            bt.logging.info(f"| {current_thread} | 🦶 Validator step: {step}")
-
-            if step % 5 == 0:  # See if it's time to set weights. If so, set weights.
-                validator.check_timer_set_weights()
+            scheduler.run_pending()  # Kick off any periodic jobs that are due
 
-            validator.sync_metagraph()  # Sync metagraph
+            bt.logging.info(f"| {current_thread} | 🦶 Validator step: {step}")
             validator.forward(step)  # Get predictions from the Miners
 
-            if step % 25 == 0:  # Check if any registrations/deregistrations have happened, make necessary updates
-                thread = threading.Thread(target=validator.miner_manager.manage_miner_data, name="📋 MinerManagementThread 📋")
-                thread.start()
-
-            if step % 200 == 0:  # Check that the scoring thread is running, if not, start it up
-                scoring_thread_is_alive = validator.is_thread_running(SCORE_THREAD_NAME)
-                if not scoring_thread_is_alive:
-                    bt.logging.info(f"| {current_thread} | ☢️ ScoreThread was found not running, restarting it...")
-                    scoring_thread = threading.Thread(target=validator.scorer.run_score_thread, name=SCORE_THREAD_NAME)
-                    scoring_thread.start()
-
-            if step % 250 == 0:  # Send score data to website
-                thread = threading.Thread(target=validator.miner_score_sender.send_miner_scores_to_website, name="🌊 MinerScoresToWebsiteThread 🌊")
-                thread.start()
-
-            if step >= 1000:  # Reset the step
-                step = 1
-                validator.should_step = False
-
             if validator.should_step:
                 step += 1  # Increment step
-
-            time.sleep(5)  # Sleep for a bit
+            else:  # Nothing to send, wait for properties or the next job
+                time.sleep(min(IDLE_SLEEP_SECONDS, scheduler.seconds_until_next_job()))
 
         except Exception as e:
             bt.logging.error(f"| {current_thread} | Error in main loop: {str(e)}")
@@ -63,6 +52,55 @@ def main(validator):
             bt.logging.error(f"| {current_thread} | Stack Trace: {stack_trace}")
             time.sleep(10)
 
+
+def build_scheduler(validator) -> JobScheduler:
+    """
+    Register the validator's periodic jobs
+    Args:
+        validator: the validator
+
+    Returns:
+        The job scheduler
+    """
+    scheduler = JobScheduler()
+    # Metagraph sync runs on the main thread, between forwards, so forward never sees a half-synced metagraph
+    scheduler.register('metagraph_sync', validator.sync_metagraph, METAGRAPH_SYNC_INTERVAL, run_inline=True)
+    scheduler.register('set_weights', validator.check_timer_set_weights, SET_WEIGHTS_INTERVAL, depends_on=['metagraph_sync'])
+    scheduler.register('miner_management', validator.miner_manager.manage_miner_data, MINER_MANAGEMENT_INTERVAL, depends_on=['metagraph_sync'])
+    scheduler.register('thread_watchdog', lambda: check_background_threads(validator), THREAD_WATCHDOG_INTERVAL)
+    scheduler.register('send_scores', validator.miner_score_sender.send_miner_scores_to_website, SEND_SCORES_INTERVAL)
+    scheduler.register('log_job_metrics', scheduler.log_metrics, LOG_JOB_METRICS_INTERVAL)
+    return scheduler
+
+
+def start_scoring_thread(validator) -> None:
+    scoring_thread = threading.Thread(target=validator.scorer.run_score_thread, name=SCORE_THREAD_NAME)
+    scoring_thread.start()
+
+
+def start_properties_thread(validator) -> None:
+    properties_thread = threading.Thread(target=validator.market_manager.run_prefetch_thread, name=PROPERTIES_THREAD_NAME)
+    properties_thread.start()
+
+
+def check_background_threads(validator) -> None:
+    """
+    Check that the scoring and prefetch threads are running, if not, start them up
+    Args:
+        validator: the validator
+
+    Returns:
+        None
+    """
+    current_thread = threading.current_thread().name
+    if not validator.is_thread_running(SCORE_THREAD_NAME):
+        bt.logging.info(f"| {current_thread} | ☢️ ScoreThread was found not running, restarting it...")
+        start_scoring_thread(validator)
+    if not validator.is_thread_running(PROPERTIES_THREAD_NAME):
+        bt.logging.info(f"| {current_thread} | ☢️ PropertiesThread was found not running, restarting it...")
+        start_properties_thread(validator)
+
+
 def get_and_send_version():
     current_thread = threading.current_thread().name
     config_file_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'setup.cfg')
@@ -0,0 +1,181 @@
+import asyncio
+import heapq
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypedDict, List, Tuple
+import bittensor as bt
+from nextplace.protocol import RealEstatePrediction
+from nextplace.miner.ml.model import Model
+from nextplace.miner.ml.prediction_cache import PredictionCache
+
+'''
+Container class for inference pool arguments. Used to define and enforce data types.
+'''
+
+
+class InferencePoolArgs(TypedDict):
+    max_workers: int  # Requests running inference at the same time
+    max_queue: int  # Requests allowed to wait for a worker
+    chunk_size: int  # Predictions per call to a per-row model. 0 sends the whole request in one call
+
+
+'''
+Helper class for RealEstateMiner
+Runs inference off the axon's event loop, so one validator's request never blocks another's. When every worker is busy,
+requests wait in a bounded queue ordered by the validator's priority. Batch models score the whole request in one call.
+Per-row models can run in chunks against the deadline, so a slow model still answers with the predictions it finished
+before the validator stops waiting.
+'''
+
+INFERENCE_THREAD_NAME_PREFIX = "🧠 InferenceThread"
+
+
+class InferencePool:
+
+    def __init__(self, model: Model, prediction_cache: PredictionCache, pool_args: InferencePoolArgs):
+        self.model = model
+        self.prediction_cache = prediction_cache
+        self.max_workers = pool_args['max_workers']
+        self.max_queue = pool_args['max_queue']
+        self.chunk_size = pool_args['chunk_size']
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=INFERENCE_THREAD_NAME_PREFIX)
+        self.running = 0  # Requests holding a worker. Only touched from the event loop, so no lock is needed
+        self.waiting: list[Tuple[float, int, asyncio.Future]] = []  # Heap of (-priority, arrival, future)
+        self.arrivals = itertools.count()
+
+    async def run(self, predictions: List[RealEstatePrediction], priority: float, deadline: float) -> int:
+        """
+        Run inference on the predictions, updating them by reference, until they are done or the deadline passes
+
+        Args:
+            predictions (List[RealEstatePrediction]): Predictions to update by reference
+            priority: the requesting validator's priority. Higher priority requests get a worker first
+            deadline: event loop time by which we must answer
+
+        Returns:
+            The number of predictions that were updated
+        """
+        if len(predictions) == 0:
+            return 0
+        if not await self._acquire(priority, deadline):
+            bt.logging.info(f"🚦 No inference worker available for a request with priority {priority}")
+            return 0
+
+        completed = 0
+        in_flight: list[asyncio.Future] = []  # The chunk running on the executor, if any
+        try:
+            completed = await self._infer(predictions, deadline, in_flight)
+        except Exception as e:
+            bt.logging.error(f"❗Inference failed. Error: {e}")
+        finally:
+            if len(in_flight) == 0 or in_flight[0].done():
+                self._release()
+            else:  # Past the deadline or cancelled. Keep the worker until the model actually finishes, so we never oversubscribe it
+                in_flight[0].add_done_callback(lambda _: self._release())
+
+        if completed < len(predictions):
+            bt.logging.info(f"⏰ Deadline reached, answering with {completed} of {len(predictions)} predictions")
+        return completed
+
+    async def _acquire(self, priority: float, deadline: float) -> bool:
+        """
+        Wait for a worker. A full queue sheds its lowest priority request to admit a higher priority one.
+
+        Args:
+            priority: the requesting validator's priority
+            deadline: event loop time after which there is no point waiting
+
+        Returns:
+            True if we got a worker, which must be handed back with `_release`
+        """
+        if self.running < self.max_workers and len(self.waiting) == 0:
+            self.running += 1
+            return True
+
+        if len(self.waiting) >= self.max_queue:
+            if len(self.waiting) == 0:  # Queueing is disabled
+                return False
+            lowest = max(self.waiting)  # Largest negated priority, latest arrival
+            if -lowest[0] >= priority:
+                return False
+            self.waiting.remove(lowest)
+            heapq.heapify(self.waiting)
+            lowest[2].set_result(False)
+
+        loop = asyncio.get_running_loop()
+        entry = (-priority, next(self.arrivals), loop.create_future())
+        heapq.heappush(self.waiting, entry)
+        try:
+            await asyncio.wait({entry[2]}, timeout=max(0.0, deadline - loop.time()))
+        except asyncio.CancelledError:  # The validator hung up. Don't strand a worker we were handed
+            if entry[2].done() and entry[2].result():
+                self._release()
+            elif not entry[2].done():
+                self.waiting.remove(entry)
+                heapq.heapify(self.waiting)
+            raise
+        if entry[2].done():
+            return entry[2].result()
+
+        self.waiting.remove(entry)  # Timed out while queued
+        heapq.heapify(self.waiting)
+        return False
+
+    def _release(self) -> None:
+        """
+        Hand a worker to the highest priority waiting request, or give it back to the pool
+
+        Returns:
+            None
+        """
+        if len(self.waiting) > 0:
+            _, _, future = heapq.heappop(self.waiting)
+            future.set_result(True)  # The worker passes straight over, `running` is unchanged
+        else:
+            self.running -= 1
+
+    async def _infer(self, predictions: List[RealEstatePrediction], deadline: float, in_flight: list[asyncio.Future]) -> int:
+        """
+        Run the model on the predictions, chunk by chunk for per-row models, stopping at the deadline. The model works on
+        copies, so a chunk that misses the deadline can't change a synapse that is already on its way back. Late chunks
+        still warm the cache.
+
+        Args:
+            predictions (List[RealEstatePrediction]): Predictions to update by reference
+            deadline: event loop time by which we must answer
+            in_flight: set to the future of the chunk on the executor, so the caller can tell if it's still running
+
+        Returns:
+            The number of predictions updated
+        """
+        loop = asyncio.get_running_loop()
+        chunk_size = len(predictions) if self.model.supports_batch_inference or self.chunk_size <= 0 else self.chunk_size
+        completed = 0
+        for start in range(0, len(predictions), chunk_size):
+            chunk = predictions[start:start + chunk_size]
+            copies = [prediction.model_copy() for prediction in chunk]
+            future = loop.run_in_executor(self.executor, self._predict_and_store, copies)
+            in_flight[:] = [future]
+            await asyncio.wait({future}, timeout=max(0.0, deadline - loop.time()))
+            if not future.done():
+                return completed
+
+            future.result()  # Raise the model's error, if any
+            for prediction, copy in zip(chunk, copies):
+                prediction.predicted_sale_price = copy.predicted_sale_price
+                prediction.predicted_sale_date = copy.predicted_sale_date
+            completed += len(chunk)
+        return completed
+
+    def _predict_and_store(self, predictions: List[RealEstatePrediction]) -> None:
+        """
+        Run the model and cache its answers. Runs on a worker thread, so a cache write to disk never blocks the axon.
+
+        Args:
+            predictions (List[RealEstatePrediction]): Predictions to update by reference
+
+        Returns:
+            None
+        """
+        self.model.predict(predictions)
+        self.prediction_cache.store(predictions)
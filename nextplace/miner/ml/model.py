@@ -1,7 +1,11 @@
-from nextplace.protocol import RealEstateSynapse
+import datetime
+import bittensor as bt
+import numpy as np
+from typing import List
+from nextplace.protocol import RealEstateSynapse, RealEstatePrediction
 from nextplace.miner.ml.model_loader import ModelArgs
 from nextplace.miner.ml.model_loader import ModelLoader
-from nextplace.miner.ml.utils import prepare_input
+from nextplace.miner.ml.utils import prepare_input, prepare_input_batch
 
 '''
 This class facilitates running inference on data from a synapse using a model specified by the user
@@ -13,6 +17,7 @@ class Model:
     def __init__(self, model_args: ModelArgs):
         model_loader = ModelLoader(model_args)
         self.model = model_loader.load_model()
+        self.supports_batch_inference = model_loader.supports_batch_inference
 
     def run_inference(self, synapse: RealEstateSynapse) -> None:
         """
@@ -24,8 +29,68 @@ class Model:
         Returns:
             None. Synapse is updated by reference.
         """
-        for prediction in synapse.real_estate_predictions.predictions:
+        self.predict(synapse.real_estate_predictions.predictions)
+
+    def predict(self, predictions: List[RealEstatePrediction]) -> None:
+        """
+        Run inference on a list of predictions using the loaded model.
+        Uses the model's `run_inference_batch` when it has one, falling back to `run_inference` one home at a time.
+
+        Args:
+            predictions (List[RealEstatePrediction]): Predictions to update by reference
+
+        Returns:
+            None
+        """
+        if len(predictions) == 0:
+            return
+        if self.supports_batch_inference and self._run_batch_inference(predictions):
+            return
+
+        for prediction in predictions:
             input_data = prepare_input(prediction)  # transform synapse into dictionary
             price, date = self.model.run_inference(input_data)  # run inference
             prediction.predicted_sale_price = price  # Update price by reference
             prediction.predicted_sale_date = date  # Update price by reference
+
+    def _run_batch_inference(self, predictions: List[RealEstatePrediction]) -> bool:
+        """
+        Run inference on every prediction in a single call to the model's `run_inference_batch`
+
+        Args:
+            predictions (List[RealEstatePrediction]): Predictions to update by reference
+
+        Returns:
+            True if the predictions were updated, False if the per-row path should be used instead
+        """
+        try:
+            prices, dates = self.model.run_inference_batch(prepare_input_batch(predictions))
+            if len(prices) != len(predictions) or len(dates) != len(predictions):
+                raise ValueError(f"expected {len(predictions)} prices and dates, got {len(prices)} and {len(dates)}")
+            updates = [(float(price), self._format_date(date)) for price, date in zip(prices, dates)]
+        except Exception as e:
+            if not hasattr(self.model, 'run_inference'):
+                raise
+            bt.logging.warning(f"❗Batched inference failed, falling back to 'run_inference'. Error: {e}")
+            return False
+
+        for prediction, (price, date) in zip(predictions, updates):
+            prediction.predicted_sale_price = price
+            prediction.predicted_sale_date = date
+        return True
+
+    def _format_date(self, date) -> str:
+        """
+        Format a predicted sale date from a batch as `yyyy-mm-dd`
+
+        Args:
+            date: a string, date, datetime or numpy datetime64
+
+        Returns:
+            The date as a string
+        """
+        if isinstance(date, (datetime.date, datetime.datetime)):
+            return date.strftime("%Y-%m-%d")
+        if isinstance(date, np.datetime64):
+            return str(date.astype('datetime64[D]'))
+        return str(date)
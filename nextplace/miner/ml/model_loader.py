@@ -37,6 +37,7 @@ class ModelLoader:
             bt.logging.info(f"🛤️ Using {hf_model_access} Hugging Face model with path: '{model_args['model_path']}'")
 
         self.model_args = model_args  # Store the model args
+        self.supports_batch_inference = False  # Set once the model class is imported
 
     def load_model(self):
         """
@@ -112,6 +113,7 @@ class ModelLoader:
     def _import_class(self, driver_class_file, model_class_filename):
         """
         Loads a Python class into the Python environment, instantiates the class, checks if it has the required `run_inference` method
+        and whether it implements the optional `run_inference_batch` method
 
         Args:
             driver_class_file: reference to a downloaded or cached file
@@ -142,8 +144,12 @@ class ModelLoader:
 
         model_class = getattr(module, class_name)  # Create the class from the module
         model_instance = model_class()  # Instantiate the class
-        if not hasattr(model_instance, 'run_inference'):  # Check if the instance has a method called `run_inference`
-            bt.logging.error(f"❗The class {class_name} does not have a method called 'run_inference'. Terminating...")
-            sys.exit(1)  # Exit program if method `run_inference` is not defined in this class
+        self.supports_batch_inference = callable(getattr(model_instance, 'run_inference_batch', None))  # Optional columnar contract
+        if not hasattr(model_instance, 'run_inference') and not self.supports_batch_inference:
+            bt.logging.error(f"❗The class {class_name} does not have a method called 'run_inference' or 'run_inference_batch'. Terminating...")
+            sys.exit(1)  # Exit program if neither inference method is defined in this class
+
+        if self.supports_batch_inference:
+            bt.logging.info(f"📦 The class {class_name} supports batched inference with 'run_inference_batch'")
 
         return model_instance  # Return the object
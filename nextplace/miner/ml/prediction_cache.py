@@ -0,0 +1,167 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import TypedDict, Optional, List
+import bittensor as bt
+from nextplace.protocol import RealEstatePrediction
+
+'''
+Container classes for the prediction cache. Used to define and enforce data types.
+'''
+
+
+class PredictionCacheArgs(TypedDict):
+    max_entries: int  # 0 disables the cache
+    ttl_seconds: float
+    path: Optional[str]  # File to persist the cache to, or None to keep it in memory only
+
+
+class CachedPrediction(TypedDict):
+    fingerprint: list  # [listing_id, price, days_on_market] of the listing the prediction was made for
+    predicted_sale_price: float
+    predicted_sale_date: str
+    expires_at: float  # Unix timestamp
+
+
+'''
+Helper class for RealEstateMiner
+Remembers the predictions for homes we were recently asked about. Every validator cycles through the same markets, so
+the same listings come back again and again. A home is only served from the cache while its listing is unchanged.
+'''
+
+PERSIST_INTERVAL_SECONDS = 300  # Write the cache to disk at most this often
+
+
+class PredictionCache:
+
+    def __init__(self, cache_args: PredictionCacheArgs):
+        self.max_entries = cache_args['max_entries']
+        self.ttl_seconds = cache_args['ttl_seconds']
+        self.path = cache_args['path']
+        self.lock = threading.Lock()
+        self.entries: OrderedDict[str, CachedPrediction] = OrderedDict()  # Least recently used first
+        self.dirty = False
+        self.last_persist = time.time()
+        if self.path:
+            self._load()
+
+    def apply(self, predictions: List[RealEstatePrediction]) -> List[RealEstatePrediction]:
+        """
+        Fill in every prediction we have a fresh cached answer for
+
+        Args:
+            predictions (List[RealEstatePrediction]): Predictions to update by reference
+
+        Returns:
+            The predictions that were not in the cache, and still need inference
+        """
+        if self.max_entries <= 0:
+            return predictions
+
+        now = time.time()
+        misses = []
+        with self.lock:
+            for prediction in predictions:
+                entry = self.entries.get(prediction.nextplace_id)
+                if entry is None or entry['expires_at'] <= now or entry['fingerprint'] != self._fingerprint(prediction):
+                    misses.append(prediction)
+                    continue
+                self.entries.move_to_end(prediction.nextplace_id)
+                prediction.predicted_sale_price = entry['predicted_sale_price']
+                prediction.predicted_sale_date = entry['predicted_sale_date']
+
+        bt.logging.trace(f"🗃️ Served {len(predictions) - len(misses)} of {len(predictions)} predictions from the cache")
+        return misses
+
+    def store(self, predictions: List[RealEstatePrediction]) -> None:
+        """
+        Remember freshly inferred predictions, evicting the least recently used ones when full
+
+        Args:
+            predictions (List[RealEstatePrediction]): Predictions that have been through inference
+
+        Returns:
+            None
+        """
+        if self.max_entries <= 0:
+            return
+
+        expires_at = time.time() + self.ttl_seconds
+        with self.lock:
+            for prediction in predictions:
+                if prediction.nextplace_id is None or prediction.predicted_sale_price is None or prediction.predicted_sale_date is None:
+                    continue
+                self.entries[prediction.nextplace_id] = {
+                    'fingerprint': self._fingerprint(prediction),
+                    'predicted_sale_price': prediction.predicted_sale_price,
+                    'predicted_sale_date': prediction.predicted_sale_date,
+                    'expires_at': expires_at,
+                }
+                self.entries.move_to_end(prediction.nextplace_id)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            self.dirty = True
+
+        if self.path and time.time() - self.last_persist >= PERSIST_INTERVAL_SECONDS:
+            self.persist()
+
+    def persist(self) -> None:
+        """
+        Write the unexpired entries to disk. The file is replaced atomically, so a crash never leaves it half written.
+
+        Returns:
+            None
+        """
+        if not self.path:
+            return
+
+        now = time.time()
+        with self.lock:
+            if not self.dirty:
+                return
+            entries = [[key, entry] for key, entry in self.entries.items() if entry['expires_at'] > now]
+            self.dirty = False
+            self.last_persist = now
+
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, 'w') as f:
+                json.dump(entries, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            bt.logging.warning(f"❗Failed to persist the prediction cache to '{self.path}'. Error: {e}")
+
+    def _load(self) -> None:
+        """
+        Load unexpired entries persisted by a previous run
+
+        Returns:
+            None
+        """
+        if not os.path.isfile(self.path):
+            return
+        now = time.time()
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            bt.logging.warning(f"❗Ignoring unreadable prediction cache '{self.path}'. Error: {e}")
+            return
+        for key, entry in entries[-self.max_entries:] if self.max_entries > 0 else []:
+            if entry['expires_at'] > now:
+                self.entries[key] = entry
+        bt.logging.info(f"🗃️ Loaded {len(self.entries)} cached predictions from '{self.path}'")
+
+    def _fingerprint(self, prediction: RealEstatePrediction) -> list:
+        """
+        The parts of a listing that invalidate a cached prediction when they change
+
+        Args:
+            prediction (RealEstatePrediction): The incoming prediction
+
+        Returns:
+            The fingerprint, as a list so it compares equal after a JSON round trip
+        """
+        return [prediction.listing_id, prediction.price, prediction.days_on_market]
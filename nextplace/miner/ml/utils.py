@@ -1,6 +1,10 @@
-from typing import Union
+from typing import Union, List
+import numpy as np
 from nextplace.protocol import RealEstatePrediction
 
+# Columns that are numeric in the synapse. Batched, these become float arrays with NaN standing in for missing values
+NUMERIC_COLUMNS = {'price', 'beds', 'baths', 'sqft', 'lot_size', 'year_built', 'days_on_market', 'latitude', 'longitude', 'hoa_dues'}
+
 
 def prepare_input(prediction: RealEstatePrediction) -> dict[str, Union[str, int, float]]:
     """
@@ -36,3 +40,26 @@ def prepare_input(prediction: RealEstatePrediction) -> dict[str, Union[str, int,
         "query_date": prediction.query_date,
         "market": prediction.market,
     }
+
+
+def prepare_input_batch(predictions: List[RealEstatePrediction]) -> dict[str, np.ndarray]:
+    """
+    Convert a list of predictions into a columnar batch, one array per field.
+
+    Args:
+        predictions (List[RealEstatePrediction]): The input data from the validator.
+
+    Returns:
+        dict[str, np.ndarray]: The input for the model. Numeric columns are float arrays, with NaN for missing values.
+            All other columns are object arrays, with None for missing values.
+    """
+    rows = [prepare_input(prediction) for prediction in predictions]
+    columns = rows[0].keys() if len(rows) > 0 else prepare_input(RealEstatePrediction()).keys()
+    batch = {}
+    for column in columns:
+        values = [row[column] for row in rows]
+        if column in NUMERIC_COLUMNS:
+            batch[column] = np.array([np.nan if value is None else value for value in values], dtype=float)
+        else:
+            batch[column] = np.array(values, dtype=object)
+    return batch
@@ -1,14 +1,20 @@
+import asyncio
 import bittensor as bt
 from template.base.miner import BaseMinerNeuron
 from typing import Tuple
 from nextplace.protocol import RealEstateSynapse
 from nextplace.miner.ml.model import Model
 from nextplace.miner.ml.model_loader import ModelArgs
+from nextplace.miner.ml.prediction_cache import PredictionCache, PredictionCacheArgs
+from nextplace.miner.ml.inference_pool import InferencePool, InferencePoolArgs
+
+DEFAULT_SYNAPSE_TIMEOUT_SECONDS = 12  # Bittensor's default, used when the synapse doesn't carry a timeout
+DEADLINE_MARGIN_SECONDS = 3  # Answer this long before the validator's timeout, to leave time for the response to travel
 
 
 class RealEstateMiner(BaseMinerNeuron):
 
-    def __init__(self, model_args: ModelArgs, force_update_past_predictions: bool, config=None):
+    def __init__(self, model_args: ModelArgs, force_update_past_predictions: bool, config=None, prediction_cache_args: PredictionCacheArgs = None, inference_pool_args: InferencePoolArgs = None):
         super(RealEstateMiner, self).__init__(config=config)  # call superclass constructor
         if force_update_past_predictions:
             bt.logging.trace("🦬 Forcing update of past predictions")
@@ -16,10 +22,16 @@ class RealEstateMiner(BaseMinerNeuron):
             bt.logging.trace("🐨 Not forcing update of past predictions")
         self.model = Model(model_args)
         self.force_update_past_predictions = force_update_past_predictions
+        self.prediction_cache = PredictionCache(prediction_cache_args or {'max_entries': 0, 'ttl_seconds': 0, 'path': None})
+        self.inference_pool = InferencePool(self.model, self.prediction_cache, inference_pool_args or {'max_workers': 1, 'max_queue': 8, 'chunk_size': 0})
+        self.hotkey_index: dict[str, Tuple[int, float]] = self._build_hotkey_index()
 
     # OVERRIDE | Required
-    def forward(self, synapse: RealEstateSynapse) -> RealEstateSynapse:
-        self.model.run_inference(synapse)
+    async def forward(self, synapse: RealEstateSynapse) -> RealEstateSynapse:
+        deadline = asyncio.get_running_loop().time() + (synapse.timeout or DEFAULT_SYNAPSE_TIMEOUT_SECONDS) - DEADLINE_MARGIN_SECONDS
+        misses = self.prediction_cache.apply(synapse.real_estate_predictions.predictions)  # Skip inference for cached homes
+        if len(misses) > 0:
+            await self.inference_pool.run(misses, self.priority(synapse), deadline)  # Unfinished predictions are left empty
         self._set_force_update_prediction_flag(synapse)
         return synapse
 
@@ -27,11 +39,16 @@ class RealEstateMiner(BaseMinerNeuron):
         for prediction in synapse.real_estate_predictions.predictions:
             prediction.force_update_past_predictions = self.force_update_past_predictions
 
+    # OVERRIDE
+    def resync_metagraph(self):
+        super(RealEstateMiner, self).resync_metagraph()
+        self.hotkey_index = self._build_hotkey_index()  # Swap in the new index in one assignment, requests never see a partial one
+
     # OVERRIDE | Required
     def blacklist(self, synapse: RealEstateSynapse) -> Tuple[bool, str]:
 
         # Check if synapse hotkey is in the metagraph
-        if synapse.dendrite.hotkey not in self.metagraph.hotkeys:
+        if synapse.dendrite.hotkey not in self.hotkey_index:
             bt.logging.info(f"❗Blacklisted unknown hotkey: {synapse.dendrite.hotkey}")
             return True, f"❗Hotkey {synapse.dendrite.hotkey} was not found from metagraph.hotkeys",
 
@@ -56,5 +73,14 @@ class RealEstateMiner(BaseMinerNeuron):
 
     # HELPER
     def get_validator_stake_and_uid(self, hotkey):
-        uid = self.metagraph.hotkeys.index(hotkey)  # get uid
-        return float(self.metagraph.S[uid]), uid  # return validator stake
+        uid, stake = self.hotkey_index.get(hotkey, (None, 0.0))  # constant time lookup, unknown hotkeys have no stake
+        return stake, uid  # return validator stake
+
+    # HELPER
+    def _build_hotkey_index(self) -> dict[str, Tuple[int, float]]:
+        """
+        Index the metagraph by hotkey, so blacklist and priority don't scan the hotkey list on every request
+        Returns:
+            Dictionary of hotkey to (uid, stake)
+        """
+        return {hotkey: (uid, float(self.metagraph.S[uid])) for uid, hotkey in enumerate(self.metagraph.hotkeys)}
@@ -1,5 +1,10 @@
 from abc import ABC
 import os
+import threading
+import time
+import bittensor as bt
+import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 import hmac
 import hashlib
@@ -9,20 +14,70 @@ from nextplace.validator.database.database_manager import DatabaseManager
 Abstract base class contains data global to all API calls
 """
 
+REDFIN_API_HOST = "redfin-com-data.p.rapidapi.com"
+REDFIN_API_BASE_URL = f"https://{REDFIN_API_HOST}"
+MAX_RATE_LIMIT_RETRIES = 5  # Give up on a request after this many 429 responses in a row
+MAX_RETRY_AFTER_SECONDS = 60  # Never sleep longer than this between rate-limited attempts
+
 
 class ApiBase(ABC):
 
-    def __init__(self, database_manager: DatabaseManager, markets: list[dict[str, str]]):
+    def __init__(self, database_manager: DatabaseManager, markets: list[dict[str, str]], base_url: str or None = None, max_connections: int = 1):
         self.nextplace_hash_key = b'next_place_hash_key_3b1f2aebc9d8e456'  # For creating the nextplace_id
         self.database_manager = database_manager
         self.markets = markets
         api_key = self._get_api_key_from_env()
         self.headers = {
             "X-RapidAPI-Key": api_key,
-            "X-RapidAPI-Host": "redfin-com-data.p.rapidapi.com"
+            "X-RapidAPI-Host": REDFIN_API_HOST
         }
+        self.base_url = (base_url or os.getenv("NEXT_PLACE_REDFIN_API_URL") or REDFIN_API_BASE_URL).rstrip('/')
         self.max_results_per_page = 350  # This is typically the maximum allowed by Redfin's API
 
+        # One keep-alive session shared by every request, with enough pooled connections for concurrent fetchers
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_connections)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _get(self, path: str, params: dict) -> requests.Response:
+        """
+        GET an API endpoint on the shared session, backing off and retrying when we're rate limited
+        Args:
+            path: endpoint path, relative to the base url
+            params: query string parameters
+
+        Returns:
+            The API response. A 429 is returned as-is once we run out of retries
+        """
+        url = f"{self.base_url}{path}"
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            response = self.session.get(url, headers=self.headers, params=params)
+            if response.status_code != 429 or attempt == MAX_RATE_LIMIT_RETRIES:
+                return response
+            delay = self._get_retry_after(response, attempt)
+            current_thread = threading.current_thread().name
+            bt.logging.trace(f"| {current_thread} | 🐢 Rate limited by the API, retrying in {delay}s")
+            time.sleep(delay)
+        return response
+
+    def _get_retry_after(self, response: requests.Response, attempt: int) -> float:
+        """
+        Work out how long to wait before retrying a rate-limited request
+        Args:
+            response: the 429 response
+            attempt: how many times we've already retried
+
+        Returns:
+            Seconds to wait. Honours the Retry-After header if present, otherwise backs off exponentially
+        """
+        retry_after = response.headers.get('Retry-After')
+        try:
+            delay = float(retry_after) if retry_after is not None else 2 ** attempt
+        except ValueError:  # Retry-After can also be an HTTP date, just fall back to exponential backoff
+            delay = 2 ** attempt
+        return max(0.0, min(delay, MAX_RETRY_AFTER_SECONDS))
+
     def get_hash(self, address: str, zip_code: str) -> str:
         """
         Build the nextplace_id using a 1-way cryptographic hash function
@@ -1,7 +1,6 @@
 import json
 import threading
 
-import requests
 import bittensor as bt
 from datetime import datetime, timezone
 from nextplace.validator.api.api_base import ApiBase
@@ -19,18 +18,19 @@ class PropertiesAPI(ApiBase):
     def __init__(self, database_manager: DatabaseManager, markets: list[dict[str, str]]):
         super(PropertiesAPI, self).__init__(database_manager, markets)
 
-    def process_region_market(self, market: dict[str, str]) -> None:
+    def process_region_market(self, market: dict[str, str]) -> int:
         """
         Process a specific region's housing market data. Ingest 1 page at a time.
         Args:
             market: the current market
 
         Returns:
-            None
+            The number of homes received from the API
         """
         current_thread = threading.current_thread().name
-        url_for_sale = "https://redfin-com-data.p.rapidapi.com/properties/search-sale"  # Redfin URL
+        path_for_sale = "/properties/search-sale"  # Redfin endpoint
         page = 1  # Page number for api results
+        number_of_homes = 0
 
         while True:
 
@@ -40,7 +40,7 @@ class PropertiesAPI(ApiBase):
                 "limit": self.max_results_per_page,
                 "page": page
             }
-            response = requests.get(url_for_sale, headers=self.headers, params=querystring)  # Hit the API
+            response = self._get(path_for_sale, querystring)  # Hit the API
 
             # Only proceed with status code is 200
             if response.status_code != 200:
@@ -56,6 +56,7 @@ class PropertiesAPI(ApiBase):
                 break
 
             self._ingest_properties(homes, market['name'])
+            number_of_homes += len(homes)
 
             if len(homes) < self.max_results_per_page:  # Last page
                 break
@@ -63,6 +64,8 @@ class PropertiesAPI(ApiBase):
             bt.logging.trace(f"| {current_thread} | Ingested {len(homes)} homes on page {page}")
             page += 1
 
+        return number_of_homes
+
     def _ingest_properties(self, homes: list, market: str) -> None:
         """
         Ingest all valid results into the `properties` table
@@ -83,8 +86,7 @@ class PropertiesAPI(ApiBase):
         values = []
         for home in homes:
             self._process_home_for_ingestion(home, market, values)  # Conditionally add home to the `values` list
-        with self.database_manager.lock:  # Acquire database lock
-            self.database_manager.query_and_commit_many(query_str, values)  # Update properties table
+        self.database_manager.query_and_commit_many(query_str, values)  # Update properties table
 
     def _process_home_for_ingestion(self, home: any, market_name: str, values: list) -> None:
         """
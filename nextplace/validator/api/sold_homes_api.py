@@ -1,72 +1,122 @@
 import threading
-from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone, timedelta
 import bittensor as bt
-import requests
 from nextplace.validator.api.api_base import ApiBase
 from nextplace.validator.database.database_manager import DatabaseManager
 import pytz
+from nextplace.validator.utils.contants import ISO8601, to_epoch_day
 
 """
 Helper class to get recently sold homes
 """
 
+SALES_WINDOW_DAYS = 21  # How far back we keep sold homes, and the widest window we ever ask the API for
+SALES_SYNC_OVERLAP_DAYS = 2  # Re-fetch a few days before the high-water mark to catch sales that were reported late
+SALES_FULL_SYNC_INTERVAL_HOURS = 24  # Re-fetch the whole sales window this often, for sales reported later than the overlap
+SALES_FETCH_WORKERS = 8  # Number of markets fetched concurrently
+SOLD_HOMES_THREAD_NAME_PREFIX = "SoldHomesThread"
+
 
 class SoldHomesAPI(ApiBase):
 
-    def __init__(self, database_manager: DatabaseManager, markets: list[dict[str, str]]):
-        super(SoldHomesAPI, self).__init__(database_manager, markets)
+    def __init__(self, database_manager: DatabaseManager, markets: list[dict[str, str]], base_url: str or None = None, max_workers: int = SALES_FETCH_WORKERS):
+        super(SoldHomesAPI, self).__init__(database_manager, markets, base_url=base_url, max_connections=max_workers)
+        self.max_workers = max_workers
 
     def get_sold_properties(self) -> None:
         """
-        Query the redfin API for recently sold homes, store the results in the database
+        Query the redfin API for homes sold since the last sync of each market, upsert the results in the database,
+        then prune sales that have aged out of the window
         Returns:
             None
         """
         current_thread = threading.current_thread().name
         num_markets = len(self.markets)
         bt.logging.trace(f"| {current_thread} | 🕵🏻 Looking for recently sold homes'")
-        for idx, market in enumerate(self.markets):
-            bt.logging.trace(f"| {current_thread} | 🔍 Getting sold homes in {market['name']}")
-            self._process_region_sold_homes(market)
-            percent_done = round(((idx + 1) / num_markets) * 100, 2)
-            bt.logging.trace(f"| {current_thread} | {percent_done}% of markets processed")
+        sync_states = self._get_sync_states()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=SOLD_HOMES_THREAD_NAME_PREFIX) as executor:
+            futures = {
+                executor.submit(self._process_region_sold_homes, market, *sync_states.get(market['id'], (None, None))): market
+                for market in self.markets
+            }
+            for idx, future in enumerate(as_completed(futures)):
+                try:
+                    future.result()
+                except Exception as e:
+                    bt.logging.error(f"| {current_thread} | ❗Failed to get sold homes in {futures[future]['name']}: {e}")
+                percent_done = round(((idx + 1) / num_markets) * 100, 2)
+                bt.logging.trace(f"| {current_thread} | {percent_done}% of markets processed")
+        self._prune_expired_sales()
+
+    def _get_sync_states(self) -> dict[str, tuple[str or None, str or None]]:
+        """
+        Get the sale date of the newest sale we've ingested for each market, and when we last fetched its whole window
+        Returns:
+            Dictionary of market id to (ISO8601 sale date, ISO8601 last full sync)
+        """
+        results = self.database_manager.query("SELECT market_id, high_water_mark, last_full_sync FROM sales_sync_state")
+        return {market_id: (high_water_mark, last_full_sync) for market_id, high_water_mark, last_full_sync in results}
+
+    def _get_sold_within(self, high_water_mark: str or None, last_full_sync: str or None) -> int:
+        """
+        Work out how many days of sales to ask the API for. Most syncs only cover the days since the high-water mark, but
+        the whole window is fetched periodically, so sales reported long after their sale date are still picked up.
+        Args:
+            high_water_mark: sale date of the newest sale we have for the market, or None if we've never synced it
+            last_full_sync: when we last fetched the market's whole window, or None if we never have
 
-    def _process_region_sold_homes(self, market: dict) -> None:
+        Returns:
+            Number of days for the `soldWithin` query parameter
         """
-        Iteratively hit API for sold homes in market, store valid homes in memory, ingest
+        now = datetime.now(timezone.utc)
+        if high_water_mark is None or last_full_sync is None:
+            return SALES_WINDOW_DAYS
+        if now - datetime.strptime(last_full_sync, ISO8601).replace(tzinfo=timezone.utc) >= timedelta(hours=SALES_FULL_SYNC_INTERVAL_HOURS):
+            return SALES_WINDOW_DAYS
+        high_water_datetime = datetime.strptime(high_water_mark, ISO8601).replace(tzinfo=timezone.utc)
+        days_since = (now - high_water_datetime).days + 1
+        return max(1, min(SALES_WINDOW_DAYS, days_since + SALES_SYNC_OVERLAP_DAYS))
+
+    def _process_region_sold_homes(self, market: dict, high_water_mark: str or None, last_full_sync: str or None) -> None:
+        """
+        RUN IN THREAD
+        Iteratively hit API for sold homes in market, ingesting each page as it arrives
         Args:
             market: current market
-            oldest_prediction: timestamp of our oldest unscored prediction
+            high_water_mark: sale date of the newest sale we have for this market, or None
+            last_full_sync: when we last fetched this market's whole window, or None
 
         Returns:
             None
         """
         current_thread = threading.current_thread().name
+        bt.logging.trace(f"| {current_thread} | 🔍 Getting sold homes in {market['name']}")
         region_id = market['id']
-        url_sold = "https://redfin-com-data.p.rapidapi.com/properties/search-sold"  # URL for sold houses
+        path_sold = "/properties/search-sold"  # Endpoint for sold houses
         page = 1  # Page number for api results
+        sold_within = self._get_sold_within(high_water_mark, last_full_sync)
+        newest_sale_date = high_water_mark
 
         invalid_results = {'date': 0, 'price': 0, 'timezone': 0}
-        valid_results = []
         # Iteratively call the API until we have no more results to read
         while True:
 
             # Build the query string for this page
             querystring = {
                 "regionId": region_id,
-                "soldWithin": 21,
+                "soldWithin": sold_within,
                 "limit": self.max_results_per_page,
                 "page": page
             }
 
-            response = requests.get(url_sold, headers=self.headers, params=querystring)  # Get API response
+            response = self._get(path_sold, querystring)  # Get API response
 
-            # Only proceed with status code is 200
+            # Only proceed with status code is 200. Leave the high-water mark alone so this market is fetched again
             if response.status_code != 200:
-                current_thread = threading.current_thread().name
                 bt.logging.error(f"| {current_thread} | ❗Error querying sold properties: {response.status_code}")
                 bt.logging.error(response.text)
-                break
+                return
 
             data = response.json()  # Get response body
             homes = data.get('data', [])  # Extract data
@@ -74,17 +124,23 @@ class SoldHomesAPI(ApiBase):
             if not homes:  # No more results
                 break
 
-            # Iterate all homes
+            # Iterate all homes, ingest this page
+            valid_results = []
             for home in homes:
                 self._process_home(home, valid_results, invalid_results)
+            self._ingest_valid_homes(valid_results)
+            sale_dates = [x[3] for x in valid_results]
+            if newest_sale_date is not None:
+                sale_dates.append(newest_sale_date)
+            newest_sale_date = max(sale_dates, default=None)
 
             if len(homes) < self.max_results_per_page:  # Last page
                 break
 
             page += 1  # Increment page
 
-        bt.logging.trace(f"| {current_thread} | 📣 Found {invalid_results['date']} homes with invalid dates, {invalid_results['price']} homes with invalid prices, {invalid_results['timezone']} homes with invalid timezones")
-        self._ingest_valid_homes(valid_results)
+        bt.logging.trace(f"| {current_thread} | 📣 Found {invalid_results['date']} homes with invalid dates, {invalid_results['price']} homes with invalid prices, {invalid_results['timezone']} homes with invalid timezones in {market['name']}")
+        self._record_sync_state(region_id, newest_sale_date, sold_within == SALES_WINDOW_DAYS)
 
     def _process_home(self, home: any, result_tuples: list[tuple], invalid_results: dict[str, int]) -> None:
         home_data = home['homeData']
@@ -115,20 +171,59 @@ class SoldHomesAPI(ApiBase):
             if utc_sale_datetime > now:  # If sale date is in the future, ignore
                 invalid_results['date'] += 1
                 return
-            result_tuples.append((nextplace_id, property_id, sale_price, utc_sale_string))
+            result_tuples.append((nextplace_id, property_id, sale_price, utc_sale_string, to_epoch_day(utc_sale_datetime)))
 
     def _ingest_valid_homes(self, result_tuples: list[tuple]) -> None:
         """
-        Ingest valid results into the database
+        Upsert valid results into the database
         Args:
-            valid_results: list of valid sold homes
+            result_tuples: list of valid sold homes
 
         Returns:
             None
         """
-        with self.database_manager.lock:  # Acquire lock
-            query_str = """
-                INSERT OR IGNORE INTO sales (nextplace_id, property_id, sale_price, sale_date)
-                VALUES (?, ?, ?, ?)
-            """
-            self.database_manager.query_and_commit_many(query_str, result_tuples)
+        query_str = """
+            INSERT INTO sales (nextplace_id, property_id, sale_price, sale_date, sale_day)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(nextplace_id) DO UPDATE SET
+                property_id = excluded.property_id,
+                sale_price = excluded.sale_price,
+                sale_date = excluded.sale_date,
+                sale_day = excluded.sale_day
+        """
+        self.database_manager.query_and_commit_many(query_str, result_tuples)
+
+    def _record_sync_state(self, market_id: str, high_water_mark: str or None, full_sync: bool) -> None:
+        """
+        Record a completed sync of a market
+        Args:
+            market_id: id of the market
+            high_water_mark: sale date of the newest sale we now have for the market
+            full_sync: whether this sync fetched the market's whole window
+
+        Returns:
+            None
+        """
+        query_str = """
+            INSERT INTO sales_sync_state (market_id, high_water_mark, last_sync, last_full_sync)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (market_id) DO UPDATE SET
+                high_water_mark = excluded.high_water_mark,
+                last_sync = excluded.last_sync,
+                last_full_sync = COALESCE(excluded.last_full_sync, last_full_sync)
+        """
+        now = datetime.now(timezone.utc).strftime(ISO8601)
+        self.database_manager.query_and_commit_with_values(query_str, (market_id, high_water_mark, now, now if full_sync else None))
+
+    def _prune_expired_sales(self) -> None:
+        """
+        Delete sales that have aged out of the sales window
+        Returns:
+            None
+        """
+        current_thread = threading.current_thread().name
+        cutoff_day = to_epoch_day(datetime.now(timezone.utc) - timedelta(days=SALES_WINDOW_DAYS))
+        deleted = self.database_manager.run_in_transaction(
+            lambda cursor: cursor.execute("DELETE FROM sales WHERE sale_day < ?", (cutoff_day,)).rowcount
+        )
+        bt.logging.trace(f"| {current_thread} | 🧹 Pruned {deleted} expired sales")
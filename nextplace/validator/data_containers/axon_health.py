@@ -0,0 +1,9 @@
+from datetime import datetime
+from typing import TypedDict, Optional
+
+
+class AxonHealth(TypedDict):
+    last_latency: Optional[float]
+    last_status_code: Optional[int]
+    failure_streak: int
+    next_probe: Optional[datetime]  # Skip this axon until this time
@@ -0,0 +1,11 @@
+from datetime import datetime
+from typing import TypedDict, Optional
+
+
+class JobMetrics(TypedDict):
+    runs: int
+    failures: int
+    last_duration: Optional[float]  # Seconds
+    average_duration: Optional[float]  # Seconds
+    max_duration: Optional[float]  # Seconds
+    last_finished: Optional[datetime]
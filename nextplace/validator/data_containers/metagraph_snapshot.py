@@ -0,0 +1,10 @@
+from typing import NamedTuple, Any
+
+
+class MetagraphSnapshot(NamedTuple):
+    block: int  # Block the metagraph was synced at
+    hotkeys: tuple[str, ...]
+    axons: tuple[Any, ...]
+    uids: tuple[int, ...]
+    S: tuple[float, ...]  # Stake
+    validator_permit: tuple[bool, ...]
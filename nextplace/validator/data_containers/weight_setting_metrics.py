@@ -0,0 +1,13 @@
+from datetime import datetime
+from typing import TypedDict, Optional
+
+
+class WeightSettingMetrics(TypedDict):
+    attempts: int
+    successes: int
+    failures: int
+    timeouts: int
+    last_compute_duration: Optional[float]  # Seconds spent calculating weights
+    last_extrinsic_duration: Optional[float]  # Seconds spent waiting on the chain
+    max_extrinsic_duration: Optional[float]  # Seconds
+    last_success: Optional[datetime]
@@ -0,0 +1,143 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+"""
+Helper class keeps long-lived SQLite connections around so they can be reused across queries
+"""
+
+# Applied to every connection. WAL lets readers run alongside the single writer without blocking on it.
+CONNECTION_PRAGMAS = [
+    'PRAGMA busy_timeout = 30000',  # Wait up to 30s for a lock instead of failing immediately
+    'PRAGMA synchronous = NORMAL',  # Safe with WAL, skips an fsync per commit
+    'PRAGMA cache_size = -65536',  # 64 MiB page cache per connection
+    'PRAGMA mmap_size = 268435456',  # Memory-map up to 256 MiB of the database file
+    'PRAGMA temp_store = MEMORY',
+]
+
+
+class ConnectionPool:
+
+    def __init__(self, db_path: str, read_pool_size: int = 4):
+        self.db_path = db_path
+        self.read_pool_size = read_pool_size
+        self._pool_lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        """
+        Drop all references to existing connections and start over with empty pools
+        Returns:
+            None
+        """
+        self._pid = os.getpid()
+        self._thread_connections: dict[int, tuple[threading.Thread, sqlite3.Connection]] = {}
+        self._read_pool: queue.Queue = queue.Queue(maxsize=self.read_pool_size)
+        self._read_connections: list[sqlite3.Connection] = []
+
+    def _check_process(self) -> None:
+        """
+        SQLite connections must never be shared across a fork. If we're running in a child process, forget the
+        parent's connections so this process opens its own.
+        Returns:
+            None
+        """
+        if self._pid != os.getpid():
+            self._pool_lock = threading.Lock()  # The parent's lock may have been held at fork time
+            self._reset()
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Open a new connection to the database, switch it to WAL mode and apply our pragmas
+        Returns:
+            A database connection
+        """
+        connection = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        connection.execute('PRAGMA journal_mode = WAL')
+        for pragma in CONNECTION_PRAGMAS:
+            connection.execute(pragma)
+        return connection
+
+    def get_thread_connection(self) -> sqlite3.Connection:
+        """
+        Get the connection owned by the current thread, opening it on first use
+        Returns:
+            A database connection
+        """
+        self._check_process()
+        thread = threading.current_thread()
+        entry = self._thread_connections.get(thread.ident)
+        if entry is not None and entry[0] is thread:
+            return entry[1]
+
+        connection = self._connect()
+        with self._pool_lock:
+            self._close_dead_thread_connections()
+            self._thread_connections[thread.ident] = (thread, connection)
+        return connection
+
+    @contextmanager
+    def read_connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a connection from the shared read pool. The connection is returned to the pool on exit.
+        Returns:
+            A read-only database connection
+        """
+        self._check_process()
+        read_pool = self._read_pool
+        connection = self._borrow_read_connection(read_pool)
+        try:
+            yield connection
+        finally:
+            if read_pool is self._read_pool:
+                read_pool.put(connection)
+            else:  # Pool was reset while the connection was borrowed
+                connection.close()
+
+    def _borrow_read_connection(self, read_pool: queue.Queue) -> sqlite3.Connection:
+        """
+        Take an idle connection from the read pool, open a new one if the pool isn't full yet, otherwise wait
+        Args:
+            read_pool: the pool to borrow from
+
+        Returns:
+            A read-only database connection
+        """
+        try:
+            return read_pool.get_nowait()
+        except queue.Empty:
+            pass
+        with self._pool_lock:
+            if len(self._read_connections) < self.read_pool_size:
+                connection = self._connect()
+                connection.execute('PRAGMA query_only = ON')
+                self._read_connections.append(connection)
+                return connection
+        return read_pool.get()
+
+    def _close_dead_thread_connections(self) -> None:
+        """
+        Close connections that belonged to threads which have since exited. Caller must hold the pool lock.
+        Returns:
+            None
+        """
+        dead_idents = [ident for ident, (thread, _) in self._thread_connections.items() if not thread.is_alive()]
+        for ident in dead_idents:
+            _, connection = self._thread_connections.pop(ident)
+            connection.close()
+
+    def close_all(self) -> None:
+        """
+        Close every connection held by the pool
+        Returns:
+            None
+        """
+        with self._pool_lock:
+            for _, connection in self._thread_connections.values():
+                connection.close()
+            for connection in self._read_connections:
+                connection.close()
+            self._reset()
@@ -1,7 +1,9 @@
 import sqlite3
-from typing import Tuple
+from concurrent.futures import Future
+from typing import Any, Callable, Tuple
 import os
-from threading import RLock
+from nextplace.validator.database.connection_pool import ConnectionPool
+from nextplace.validator.database.database_writer import DatabaseWriter
 
 """
 Helper class manager connections to the SQLite database
@@ -16,9 +18,10 @@ class DatabaseManager:
         os.makedirs(data_dir, exist_ok=True)  # Ensure data directory exists
         self.db_path = f'{data_dir}/validator_v{db_version}.db'  # Set db path
         db_dir = os.path.dirname(self.db_path)
-        self.lock = RLock()  # Reentrant lock for thread safety
         if not os.path.exists(db_dir):
             os.makedirs(db_dir)  # Create db dir
+        self.connection_pool = ConnectionPool(self.db_path)  # Long-lived connections, reused across queries
+        self.writer = DatabaseWriter(self.connection_pool.get_thread_connection)  # All writes go through one thread
 
     def query(self, query: str) -> list[tuple]:
         """
@@ -30,14 +33,14 @@ class DatabaseManager:
             All rows matching the query
         """
         rows = []
-        cursor, db_connection = self.get_cursor()
-        try:
-            cursor.execute(query)
-            rows = cursor.fetchall()
-        finally:
-            cursor.close()
-            db_connection.close()
-            return rows
+        with self.connection_pool.read_connection() as db_connection:
+            cursor = db_connection.cursor()
+            try:
+                cursor.execute(query)
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+                return rows
 
     def query_with_values(self, query: str, values: tuple) -> list[tuple]:
         """
@@ -50,14 +53,14 @@ class DatabaseManager:
             All rows matching the query
         """
         rows = []
-        cursor, db_connection = self.get_cursor()
-        try:
-            cursor.execute(query, values)
-            rows = cursor.fetchall()
-        finally:
-            cursor.close()
-            db_connection.close()
-            return rows
+        with self.connection_pool.read_connection() as db_connection:
+            cursor = db_connection.cursor()
+            try:
+                cursor.execute(query, values)
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+                return rows
 
     def query_and_commit(self, query: str) -> None:
         """
@@ -68,13 +71,7 @@ class DatabaseManager:
         Returns:
             None
         """
-        cursor, db_connection = self.get_cursor()
-        try:
-            cursor.execute(query)
-            db_connection.commit()
-        finally:
-            cursor.close()
-            db_connection.close()
+        self.writer.execute(lambda cursor: cursor.execute(query))
 
     def query_and_commit_with_values(self, query: str, values: tuple) -> None:
         """
@@ -86,13 +83,7 @@ class DatabaseManager:
         Returns:
             None
         """
-        cursor, db_connection = self.get_cursor()
-        try:
-            cursor.execute(query, values)
-            db_connection.commit()
-        finally:
-            cursor.close()
-            db_connection.close()
+        self.writer.execute(lambda cursor: cursor.execute(query, values))
 
     def query_and_commit_many(self, query: str, values: list[tuple]) -> None:
         """
@@ -104,17 +95,34 @@ class DatabaseManager:
         Returns:
             None
         """
-        cursor, db_connection = self.get_cursor()
-        try:
-            cursor.executemany(query, values)
-            db_connection.commit()
-        finally:
-            cursor.close()
-            db_connection.close()
+        self.writer.execute(lambda cursor: cursor.executemany(query, values))
+
+    def run_in_transaction(self, work: Callable[[sqlite3.Cursor], Any]) -> Any:
+        """
+        Run several statements as one transaction on the writer thread
+        Args:
+            work: callable taking a cursor. Committed if it returns, rolled back if it raises
+
+        Returns:
+            Whatever `work` returns
+        """
+        return self.writer.execute(work)
+
+    def submit_transaction(self, work: Callable[[sqlite3.Cursor], Any]) -> Future:
+        """
+        Queue a transaction for the writer thread without waiting for it to run
+        Args:
+            work: callable taking a cursor. Committed if it returns, rolled back if it raises
+
+        Returns:
+            A Future resolving to whatever `work` returns
+        """
+        return self.writer.submit(work)
 
     def get_cursor(self) -> Tuple[sqlite3.Cursor, sqlite3.Connection]:
         """
-        Get a cursor and connection reference from the database
+        Get a cursor and connection reference from the database. The connection is owned by the pool, don't close it.
+        Prefer `run_in_transaction` for writes, so they're serialized with everything else on the writer thread.
         Returns:
             cursor & connection objects
         """
@@ -124,11 +132,19 @@ class DatabaseManager:
 
     def get_db_connection(self) -> sqlite3.Connection:
         """
-        Get a reference to the database
+        Get a reference to the database. Each thread reuses its own long-lived connection.
         Returns:
             A database connection
         """
-        return sqlite3.connect(self.db_path)
+        return self.connection_pool.get_thread_connection()
+
+    def close(self) -> None:
+        """
+        Close all pooled connections
+        Returns:
+            None
+        """
+        self.connection_pool.close_all()
 
     def delete_all_sales(self) -> None:
         """
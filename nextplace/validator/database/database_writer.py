@@ -0,0 +1,109 @@
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable
+
+"""
+Helper class funnels every write to the database through a single writer thread
+"""
+
+DATABASE_WRITER_THREAD_NAME = "✍️ DatabaseWriterThread ✍️"
+
+
+class DatabaseWriter:
+
+    def __init__(self, get_connection: Callable[[], sqlite3.Connection]):
+        self.get_connection = get_connection  # Called on the writer thread to get its connection
+        self._start_lock = threading.Lock()
+        self._pid = None
+        self._thread = None
+        self._queue = None
+
+    def execute(self, work: Callable[[sqlite3.Cursor], Any]) -> Any:
+        """
+        Run `work` in a single transaction on the writer thread and wait for it to finish
+        Args:
+            work: callable taking a cursor. Its changes are committed if it returns, rolled back if it raises
+
+        Returns:
+            Whatever `work` returns
+        """
+        if threading.current_thread() is self._thread:  # Nested write, join the transaction already in progress
+            cursor = self.get_connection().cursor()
+            try:
+                return work(cursor)
+            finally:
+                cursor.close()
+        return self.submit(work).result()
+
+    def submit(self, work: Callable[[sqlite3.Cursor], Any]) -> Future:
+        """
+        Queue `work` for the writer thread without waiting for it
+        Args:
+            work: callable taking a cursor
+
+        Returns:
+            A Future resolving to whatever `work` returns
+        """
+        self._ensure_started()
+        future = Future()
+        self._queue.put((work, future))
+        return future
+
+    def _ensure_started(self) -> None:
+        """
+        Start the writer thread on first use, or again if we're in a forked child that didn't inherit it
+        Returns:
+            None
+        """
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._queue = queue.Queue()
+            self._thread = threading.Thread(target=self._run_writer, args=(self._queue,), name=DATABASE_WRITER_THREAD_NAME, daemon=True)
+            self._thread.start()
+
+    def _run_writer(self, work_queue: queue.Queue) -> None:
+        """
+        RUN IN THREAD
+        Drain the write queue forever
+        Args:
+            work_queue: queue of (work, future) tuples
+
+        Returns:
+            None
+        """
+        while True:
+            work, future = work_queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self._run(work))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def _run(self, work: Callable[[sqlite3.Cursor], Any]) -> Any:
+        """
+        Run `work` inside a transaction on the writer connection
+        Args:
+            work: callable taking a cursor
+
+        Returns:
+            Whatever `work` returns
+        """
+        db_connection = self.get_connection()
+        cursor = db_connection.cursor()
+        try:
+            result = work(cursor)
+            db_connection.commit()
+            return result
+        except Exception:
+            db_connection.rollback()  # Don't leave a half-written transaction open on the writer connection
+            raise
+        finally:
+            cursor.close()
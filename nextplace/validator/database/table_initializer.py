@@ -1,4 +1,11 @@
+import threading
+import bittensor as bt
+from datetime import datetime, timezone
 from nextplace.validator.database.database_manager import DatabaseManager
+from nextplace.validator.utils.contants import MARKET_COVERAGE_WINDOW_DAYS, to_epoch_day
+
+LEGACY_PREDICTIONS_TABLE_PREFIX = "predictions_"  # Old per-miner tables were named `predictions_<hotkey>`
+EPOCH_DAY_SQL = "CAST(julianday(DATE({column})) - 2440587.5 AS INTEGER)"  # Days since 1970-01-01, same as `to_epoch_day`
 
 """
 Helper class to setup database tables, indices
@@ -15,16 +22,28 @@ class TableInitializer:
         Returns:
             None
         """
-        cursor, db_connection = self.database_manager.get_cursor()
+        self.database_manager.run_in_transaction(self._create_all_tables)
+
+    def _create_all_tables(self, cursor) -> None:
+        """
+        Create all validator tables using the writer's cursor
+        Args:
+            cursor: a database cursor
+
+        Returns:
+            None
+        """
         self._create_properties_table(cursor)
+        self._create_predictions_table(cursor)
+        self._migrate_legacy_predictions_tables(cursor)
         self._create_scored_predictions_table(cursor)
         self._create_sales_table(cursor)
+        self._create_sales_sync_state_table(cursor)
         self._create_miner_scores_table(cursor)
         self._create_active_miners_table(cursor)
         self._create_daily_scores_table(cursor)
-        db_connection.commit()
-        cursor.close()
-        db_connection.close()
+        self._create_axon_health_table(cursor)
+        self._create_market_coverage_table(cursor)
 
     def _create_sales_table(self, cursor) -> None:
         """
@@ -40,12 +59,141 @@ class TableInitializer:
                 nextplace_id TEXT PRIMARY KEY,
                 property_id TEXT,
                 sale_price REAL,
-                sale_date DATETIME
+                sale_date DATETIME,
+                sale_day INTEGER
             )
         ''')
+        self._add_epoch_day_column_if_not_exists(cursor, 'sales', 'sale_day', 'sale_date')
         cursor.execute('''
             CREATE INDEX IF NOT EXISTS idx_sale_date ON sales(sale_date)
         ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_sales_nextplace_day ON sales(nextplace_id, sale_day)
+        ''')
+
+    def _create_sales_sync_state_table(self, cursor) -> None:
+        """
+        Create the sales sync state table, which tracks the newest sale we've ingested for each market, and when we last
+        re-fetched the market's whole sales window
+        Args:
+            cursor: a database cursor
+
+        Returns:
+            None
+        """
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sales_sync_state (
+                market_id TEXT PRIMARY KEY,
+                high_water_mark DATETIME,
+                last_sync DATETIME,
+                last_full_sync DATETIME
+            )
+        ''')
+        cursor.execute("PRAGMA table_info(sales_sync_state)")
+        if 'last_full_sync' not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute("ALTER TABLE sales_sync_state ADD COLUMN last_full_sync DATETIME")  # NULL, so the next sync is a full one
+
+    def _create_predictions_table(self, cursor) -> None:
+        """
+        Create the predictions table, shared by all miners
+        Args:
+            cursor: a database cursor
+
+        Returns:
+            None
+        """
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS predictions (
+                nextplace_id TEXT,
+                miner_hotkey TEXT,
+                predicted_sale_price REAL,
+                predicted_sale_date TEXT,
+                prediction_timestamp TEXT,
+                market TEXT,
+                prediction_day INTEGER,
+                PRIMARY KEY (miner_hotkey, nextplace_id)
+            )
+        ''')
+        self._add_epoch_day_column_if_not_exists(cursor, 'predictions', 'prediction_day', 'prediction_timestamp')
+        cursor.execute('''
+            DROP INDEX IF EXISTS idx_predictions_nextplace_id
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_predictions_nextplace_day ON predictions(nextplace_id, prediction_day)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_predictions_timestamp ON predictions(prediction_timestamp)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_predictions_miner_timestamp_market ON predictions(miner_hotkey, prediction_timestamp, market)
+        ''')
+
+    def _migrate_legacy_predictions_tables(self, cursor) -> None:
+        """
+        Move rows from the old per-miner `predictions_<hotkey>` tables into the predictions table, then drop them
+        Args:
+            cursor: a database cursor
+
+        Returns:
+            None
+        """
+        cursor.execute(f"""
+            SELECT name FROM sqlite_master
+            WHERE type='table' AND name GLOB '{LEGACY_PREDICTIONS_TABLE_PREFIX}*'
+        """)
+        legacy_tables = [row[0] for row in cursor.fetchall()]
+        if len(legacy_tables) == 0:
+            return
+
+        current_thread = threading.current_thread().name
+        bt.logging.info(f"| {current_thread} | 🚚 Migrating {len(legacy_tables)} per-miner predictions tables into the predictions table")
+        for table_name in legacy_tables:
+            cursor.execute(f'''
+                INSERT OR IGNORE INTO predictions
+                (nextplace_id, miner_hotkey, predicted_sale_price, predicted_sale_date, prediction_timestamp, market, prediction_day)
+                SELECT nextplace_id, miner_hotkey, predicted_sale_price, predicted_sale_date, prediction_timestamp, market, {EPOCH_DAY_SQL.format(column='prediction_timestamp')}
+                FROM "{table_name}"
+            ''')
+            cursor.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+
+    def _add_epoch_day_column_if_not_exists(self, cursor, table_name: str, day_column: str, source_column: str) -> None:
+        """
+        Add an integer day column to a table created before we stored one, and backfill it from a date column.
+        Integer days can be compared directly, so joins and range filters on them can use an index.
+        Args:
+            cursor: a database cursor
+            table_name: the table to update
+            day_column: name of the new day column
+            source_column: name of the date/datetime column to derive the day from
+
+        Returns:
+            None
+        """
+        cursor.execute(f"PRAGMA table_info({table_name})")
+        columns = [row[1] for row in cursor.fetchall()]
+        if day_column in columns:
+            return
+        cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {day_column} INTEGER")
+        cursor.execute(f"UPDATE {table_name} SET {day_column} = {EPOCH_DAY_SQL.format(column=source_column)}")
+
+    def _add_sum_score_column_if_not_exists(self, cursor, table_name: str, average_column: str) -> None:
+        """
+        Add the running score sum to a score table created before we stored one, and backfill it from the average.
+        With the sum stored, new scores are added in place instead of re-weighting the average every time.
+        Args:
+            cursor: a database cursor
+            table_name: the table to update
+            average_column: name of the average score column
+
+        Returns:
+            None
+        """
+        cursor.execute(f"PRAGMA table_info({table_name})")
+        columns = [row[1] for row in cursor.fetchall()]
+        if 'sum_score' in columns:
+            return
+        cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN sum_score REAL")
+        cursor.execute(f"UPDATE {table_name} SET sum_score = {average_column} * total_predictions")
 
     def _create_scored_predictions_table(self, cursor) -> None:
         """
@@ -127,9 +275,11 @@ class TableInitializer:
                 miner_hotkey TEXT PRIMARY KEY,
                 lifetime_score REAL,
                 total_predictions INTEGER,
-                last_update_timestamp DATETIME
+                last_update_timestamp DATETIME,
+                sum_score REAL
             )
         ''')
+        self._add_sum_score_column_if_not_exists(cursor, 'miner_scores', 'lifetime_score')
 
     def _create_daily_scores_table(self, cursor) -> None:
         """
@@ -146,9 +296,11 @@ class TableInitializer:
                 date DATE,
                 score REAL,
                 total_predictions INTEGER,
+                sum_score REAL,
                 PRIMARY KEY (miner_hotkey, date)
             )
         ''')
+        self._add_sum_score_column_if_not_exists(cursor, 'daily_scores', 'score')
 
 
     def _create_active_miners_table(self, cursor) -> None:
@@ -165,3 +317,54 @@ class TableInitializer:
                 miner_hotkey TEXT PRIMARY KEY
             )
         ''')
+
+    def _create_axon_health_table(self, cursor) -> None:
+        """
+        Create the axon health table
+        Args:
+            cursor: a database cursor
+
+        Returns:
+            None
+        """
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS axon_health (
+                miner_hotkey TEXT PRIMARY KEY,
+                last_latency REAL,
+                last_status_code INTEGER,
+                failure_streak INTEGER,
+                next_probe DATETIME
+            )
+        ''')
+
+    def _create_market_coverage_table(self, cursor) -> None:
+        """
+        Create the market coverage table, a per-day summary of the markets each miner predicted on. When the table is
+        new, backfill it from the predictions table so weights don't drop to zero after an upgrade.
+        Args:
+            cursor: a database cursor
+
+        Returns:
+            None
+        """
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='market_coverage'")
+        is_new = cursor.fetchone() is None
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS market_coverage (
+                miner_hotkey TEXT,
+                market TEXT,
+                day INTEGER,
+                predictions INTEGER,
+                PRIMARY KEY (miner_hotkey, market, day)
+            ) WITHOUT ROWID
+        ''')
+        if not is_new:
+            return
+        first_day = to_epoch_day(datetime.now(timezone.utc)) - MARKET_COVERAGE_WINDOW_DAYS + 1
+        cursor.execute('''
+            INSERT INTO market_coverage (miner_hotkey, market, day, predictions)
+            SELECT miner_hotkey, market, prediction_day, COUNT(*)
+            FROM predictions
+            WHERE prediction_day >= ? AND market IS NOT NULL
+            GROUP BY miner_hotkey, market, prediction_day
+        ''', (first_day,))
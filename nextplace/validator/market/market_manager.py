@@ -1,3 +1,4 @@
+import time
 import bittensor as bt
 from nextplace.validator.api.properties_api import PropertiesAPI
 from nextplace.validator.database.database_manager import DatabaseManager
@@ -7,12 +8,18 @@ import threading
 Helper class manages the real estate market
 """
 
+DEFAULT_PREFETCH_MARKETS = 2  # Keep this many markets in the properties table
+DEFAULT_PROPERTIES_LOW_WATER_MARK = 500  # Fetch another market once fewer properties than this are left
+PREFETCH_POLL_SECONDS = 10  # How often the prefetch thread checks the buffer
+
 
 class MarketManager:
-    def __init__(self, database_manager: DatabaseManager, markets: list[dict[str, str]]):
+    def __init__(self, database_manager: DatabaseManager, markets: list[dict[str, str]], prefetch_markets: int = DEFAULT_PREFETCH_MARKETS, low_water_mark: int = DEFAULT_PROPERTIES_LOW_WATER_MARK):
         self.database_manager = database_manager
         self.markets = markets
         self.properties_api = PropertiesAPI(database_manager, markets)
+        self.prefetch_markets = max(1, prefetch_markets)
+        self.low_water_mark = low_water_mark
         self.lock = threading.RLock()  # Reentrant lock for thread safety
         current_thread = threading.current_thread().name
         initial_market_index = self._find_initial_market_index()
@@ -34,34 +41,69 @@ class MarketManager:
 
     def _find_initial_market_from_properties(self) -> int:
         """
-        Query the properties table and get the market represented there. Then return the next market
+        Query the properties table and get the most recently fetched market. Then return the next market
         Returns:
             The next market
         """
-        # Get any property
+        # Get the newest property
         some_property = self.database_manager.query("""
             SELECT market
             FROM properties
+            ORDER BY rowid DESC
             LIMIT 1
         """)
         if some_property:
             market = some_property[0][0]  # Extract market
             idx = next((i for i, obj in enumerate(self.markets) if obj["name"] == market), None)  # Get market index
+            if idx is None:
+                return 0
             return idx + 1 if idx < len(self.markets) - 1 else 0  # Get next market, wrap around if need be
         return 0
 
+    def run_prefetch_thread(self) -> None:
+        """
+        RUN IN THREAD
+        Keep the properties table stocked so synapses never wait on the API. Fetch the next market whenever we're
+        holding fewer than `prefetch_markets` markets, or the remaining properties drop below the low-water mark.
+        Returns:
+            None
+        """
+        current_thread = threading.current_thread().name
+        bt.logging.trace(f"| {current_thread} | 🏁 Beginning property prefetch thread")
+        while True:
+            try:
+                if self._needs_prefetch() and self.get_properties_for_market() > 0:
+                    continue  # Check again straight away, we may need more than one market
+            except Exception as e:
+                bt.logging.error(f"| {current_thread} | ❗Failed to prefetch properties: {e}")
+            time.sleep(PREFETCH_POLL_SECONDS)
+
+    def _needs_prefetch(self) -> bool:
+        """
+        Check whether the properties buffer needs another market
+        Returns:
+            True if we should fetch the next market
+        """
+        number_of_properties, number_of_markets = self.database_manager.query(
+            "SELECT COUNT(*), COUNT(DISTINCT market) FROM properties"
+        )[0]
+        if number_of_markets < self.prefetch_markets:
+            return True
+        # Top up early when the buffer is running low, but never hold more than one extra market
+        return number_of_properties < self.low_water_mark and number_of_markets <= self.prefetch_markets
 
-    def get_properties_for_market(self) -> None:
+    def get_properties_for_market(self) -> int:
         """
         RUN IN THREAD
         Hit the API, update the database
         Returns:
-            None
+            The number of homes received for the market
         """
         current_thread = threading.current_thread().name
-        bt.logging.info(f"| {current_thread} | 🔑 No properties were found, getting the next market and updating properties")
+        bt.logging.info(f"| {current_thread} | 🔑 Prefetching the next market and updating properties")
         current_market = self.markets[self.market_index]  # Extract market object
-        self.properties_api.process_region_market(current_market)  # Populate database with this market
+        number_of_homes = self.properties_api.process_region_market(current_market)  # Populate database with this market
         with self.lock:  # Acquire lock
             bt.logging.info(f"| {current_thread} | ✅ Finished ingesting properties in {current_market['name']}")
             self.market_index = self.market_index + 1 if self.market_index < len(self.markets) - 1 else 0 # Wrap index around
+        return number_of_homes
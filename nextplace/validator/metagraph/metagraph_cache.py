@@ -0,0 +1,65 @@
+import threading
+import bittensor as bt
+from nextplace.validator.data_containers.metagraph_snapshot import MetagraphSnapshot
+
+"""
+Helper class caches the metagraph, only re-syncing it once the chain has moved on far enough
+"""
+
+DEFAULT_SYNC_INTERVAL_BLOCKS = 25  # About 5 minutes of 12 second blocks
+
+
+class MetagraphCache:
+
+    def __init__(self, metagraph, subtensor, sync_interval_blocks: int = DEFAULT_SYNC_INTERVAL_BLOCKS):
+        self.metagraph = metagraph  # Only ever mutated by `sync`
+        self.subtensor = subtensor
+        self.sync_interval_blocks = sync_interval_blocks
+        self.sync_lock = threading.Lock()
+        self._snapshot = self._build_snapshot(int(metagraph.block))
+
+    def snapshot(self) -> MetagraphSnapshot:
+        """
+        Get the latest metagraph snapshot. Snapshots are never modified, so they're safe to share across threads
+        Returns:
+            The latest MetagraphSnapshot
+        """
+        return self._snapshot
+
+    def sync(self) -> bool:
+        """
+        Re-sync the metagraph if the chain has advanced at least `sync_interval_blocks` since the last sync
+        Returns:
+            True if the metagraph was synced, False if the cached snapshot is still fresh
+        """
+        current_thread = threading.current_thread().name
+        with self.sync_lock:
+            current_block = self.subtensor.get_current_block()
+            blocks_since_sync = current_block - self._snapshot.block
+            if blocks_since_sync < self.sync_interval_blocks:
+                bt.logging.trace(f"| {current_thread} | 📦 Metagraph synced {blocks_since_sync} blocks ago, using cached snapshot")
+                return False
+
+            bt.logging.info(f"| {current_thread} | 🔗 Syncing metagraph at block {current_block}")
+            self.metagraph.sync(block=current_block, lite=True, subtensor=self.subtensor)  # We never need weights or bonds
+            self._snapshot = self._build_snapshot(current_block)
+            bt.logging.trace(f"| {current_thread} | 📈 Metagraph has {len(self._snapshot.hotkeys)} hotkeys")
+            return True
+
+    def _build_snapshot(self, block: int) -> MetagraphSnapshot:
+        """
+        Copy the parts of the metagraph we use into an immutable snapshot
+        Args:
+            block: block the metagraph was synced at
+
+        Returns:
+            A MetagraphSnapshot
+        """
+        return MetagraphSnapshot(
+            block=block,
+            hotkeys=tuple(self.metagraph.hotkeys),
+            axons=tuple(self.metagraph.axons),
+            uids=tuple(int(x) for x in self.metagraph.uids),
+            S=tuple(float(x) for x in self.metagraph.S),
+            validator_permit=tuple(bool(x) for x in self.metagraph.validator_permit),
+        )
@@ -0,0 +1,155 @@
+import threading
+from datetime import datetime, timezone, timedelta
+import bittensor as bt
+from nextplace.validator.data_containers.axon_health import AxonHealth
+from nextplace.validator.database.database_manager import DatabaseManager
+from nextplace.validator.utils.contants import ISO8601
+from template.utils.uids import check_uid_availability
+
+"""
+Helper class tracks the health of Miner axons, so we stop wasting queries on dead endpoints
+"""
+
+FAILURE_STREAK_THRESHOLD = 3  # Consecutive failed queries before an axon is backed off
+BASE_BACKOFF_SECONDS = 60  # First backoff, doubled for every further failure
+MAX_BACKOFF_SECONDS = 6 * 60 * 60  # Always re-probe a backed off axon at least this often
+SUCCESS_STATUS_CODE = 200
+
+
+class AxonHealthTracker:
+
+    def __init__(self, database_manager: DatabaseManager):
+        self.database_manager = database_manager
+        self.lock = threading.Lock()
+        self.health: dict[str, AxonHealth] = self._load()
+        self.dirty_hotkeys: set[str] = set()
+        self.removed_hotkeys: set[str] = set()
+
+    def _load(self) -> dict[str, AxonHealth]:
+        """
+        Load persisted axon health from the database
+        Returns:
+            Dictionary of miner hotkey to AxonHealth
+        """
+        rows = self.database_manager.query("""
+            SELECT miner_hotkey, last_latency, last_status_code, failure_streak, next_probe
+            FROM axon_health
+        """)
+        return {
+            miner_hotkey: {
+                'last_latency': last_latency,
+                'last_status_code': last_status_code,
+                'failure_streak': failure_streak,
+                'next_probe': datetime.strptime(next_probe, ISO8601).replace(tzinfo=timezone.utc) if next_probe else None,
+            }
+            for miner_hotkey, last_latency, last_status_code, failure_streak, next_probe in rows
+        }
+
+    def select_axons(self, metagraph, vpermit_tao_limit: int) -> list[tuple[str, any]]:
+        """
+        Pick the axons worth querying: serving, not a high-stake validator, and not currently backed off
+        Args:
+            metagraph: the metagraph
+            vpermit_tao_limit: validators with more stake than this are never queried
+
+        Returns:
+            List of (miner hotkey, axon) pairs
+        """
+        current_thread = threading.current_thread().name
+        now = datetime.now(timezone.utc)
+        selected = []
+        backed_off = 0
+        with self.lock:
+            self._forget_deregistered(set(metagraph.hotkeys))
+            for uid, miner_hotkey in enumerate(metagraph.hotkeys):
+                if not check_uid_availability(metagraph, uid, vpermit_tao_limit):
+                    continue
+                health = self.health.get(miner_hotkey)
+                if health is not None and health['next_probe'] is not None and now < health['next_probe']:
+                    backed_off += 1
+                    continue
+                selected.append((miner_hotkey, metagraph.axons[uid]))
+        bt.logging.trace(f"| {current_thread} | 🩺 Querying {len(selected)} of {len(metagraph.hotkeys)} axons, {backed_off} are backed off")
+        return selected
+
+    def record_response(self, miner_hotkey: str, status_code: int or None, latency: float or None) -> None:
+        """
+        Record the outcome of querying an axon. Repeated failures back the axon off exponentially.
+        Args:
+            miner_hotkey: the miner's hotkey
+            status_code: the dendrite status code of the response
+            latency: seconds the axon took to respond
+
+        Returns:
+            None
+        """
+        with self.lock:
+            health = self.health.setdefault(miner_hotkey, {'last_latency': None, 'last_status_code': None, 'failure_streak': 0, 'next_probe': None})
+            health['last_latency'] = latency
+            health['last_status_code'] = status_code
+            if status_code == SUCCESS_STATUS_CODE:
+                health['failure_streak'] = 0
+                health['next_probe'] = None
+            else:
+                health['failure_streak'] += 1
+                if health['failure_streak'] >= FAILURE_STREAK_THRESHOLD:
+                    exponent = health['failure_streak'] - FAILURE_STREAK_THRESHOLD
+                    backoff_seconds = min(MAX_BACKOFF_SECONDS, BASE_BACKOFF_SECONDS * 2 ** min(exponent, 16))
+                    health['next_probe'] = datetime.now(timezone.utc) + timedelta(seconds=backoff_seconds)
+            self.dirty_hotkeys.add(miner_hotkey)
+            self.removed_hotkeys.discard(miner_hotkey)
+
+    def is_live(self, miner_hotkey: str) -> bool:
+        """
+        Check whether an axon is still considered live, i.e. it hasn't failed often enough in a row to be backed off
+        Args:
+            miner_hotkey: the miner's hotkey
+
+        Returns:
+            True if the axon is live
+        """
+        with self.lock:
+            health = self.health.get(miner_hotkey)
+            return health is None or health['failure_streak'] < FAILURE_STREAK_THRESHOLD
+
+    def persist(self) -> None:
+        """
+        Write changed axon health to the database, so it survives restarts
+        Returns:
+            None
+        """
+        with self.lock:
+            rows = []
+            for miner_hotkey in self.dirty_hotkeys:
+                health = self.health[miner_hotkey]
+                next_probe = health['next_probe'].strftime(ISO8601) if health['next_probe'] else None
+                rows.append((miner_hotkey, health['last_latency'], health['last_status_code'], health['failure_streak'], next_probe))
+            removed = [(x,) for x in self.removed_hotkeys]
+            self.dirty_hotkeys = set()
+            self.removed_hotkeys = set()
+
+        if len(rows) == 0 and len(removed) == 0:
+            return
+
+        def write(cursor) -> None:
+            cursor.executemany("""
+                INSERT OR REPLACE INTO axon_health (miner_hotkey, last_latency, last_status_code, failure_streak, next_probe)
+                VALUES (?, ?, ?, ?, ?)
+            """, rows)
+            cursor.executemany("DELETE FROM axon_health WHERE miner_hotkey = ?", removed)
+
+        self.database_manager.run_in_transaction(write)
+
+    def _forget_deregistered(self, metagraph_hotkeys: set[str]) -> None:
+        """
+        Drop health for hotkeys that have left the metagraph. Caller must hold the lock.
+        Args:
+            metagraph_hotkeys: hotkeys currently in the metagraph
+
+        Returns:
+            None
+        """
+        for miner_hotkey in [x for x in self.health if x not in metagraph_hotkeys]:
+            del self.health[miner_hotkey]
+            self.dirty_hotkeys.discard(miner_hotkey)
+            self.removed_hotkeys.add(miner_hotkey)
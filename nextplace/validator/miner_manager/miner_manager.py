@@ -1,14 +1,16 @@
 import threading
 import bittensor as bt
 from nextplace.validator.database.database_manager import DatabaseManager
-from nextplace.validator.utils.contants import build_miner_predictions_table_name
+from nextplace.validator.metagraph.metagraph_cache import MetagraphCache
+from nextplace.validator.scoring.score_window import ScoreWindow
 
 
 class MinerManager:
 
-    def __init__(self, database_manager: DatabaseManager, metagraph):
+    def __init__(self, database_manager: DatabaseManager, metagraph_cache: MetagraphCache, score_window: ScoreWindow):
         self.database_manager = database_manager
-        self.metagraph = metagraph
+        self.metagraph_cache = metagraph_cache
+        self.score_window = score_window
 
     def manage_miner_data(self) -> None:
         """
@@ -19,10 +21,9 @@ class MinerManager:
         current_thread = threading.current_thread().name
 
         # Build sets
-        metagraph_hotkeys = set(self.metagraph.hotkeys)  # Get hotkeys in metagraph
-        with self.database_manager.lock:
-            stored_hotkeys = set(row[0] for row in self.database_manager.query(
-                "SELECT miner_hotkey FROM active_miners"))  # Get stored hotkeys
+        metagraph_hotkeys = set(self.metagraph_cache.snapshot().hotkeys)  # Get hotkeys in metagraph
+        stored_hotkeys = set(row[0] for row in self.database_manager.query(
+            "SELECT miner_hotkey FROM active_miners"))  # Get stored hotkeys
 
         bt.logging.trace(
             f"| {current_thread} | Managing active miners. Found {len(stored_hotkeys)} tracked miners and {len(metagraph_hotkeys)} metagraph hotkeys")
@@ -37,14 +38,12 @@ class MinerManager:
                 f"| {current_thread} | 🚨 Found {len(deregistered_hotkeys)} deregistered hotkeys. Cleaning out their data.")
             # For all deregistered miners, clear out their predictions & scores. Remove from active_miners table
             tuples = [(x,) for x in deregistered_hotkeys]
-            with self.database_manager.lock:
-                # Drop predictions tables for deregistered miners
-                for hotkey in deregistered_hotkeys:
-                    table_name = build_miner_predictions_table_name(hotkey)
-                    self.database_manager.query_and_commit(f"DROP TABLE IF EXISTS '{table_name}'")
-                self.database_manager.query_and_commit_many("DELETE FROM miner_scores WHERE miner_hotkey = ?", tuples)
-                self.database_manager.query_and_commit_many("DELETE FROM active_miners WHERE miner_hotkey = ?", tuples)
-                self.database_manager.query_and_commit_many("DELETE FROM daily_scores WHERE miner_hotkey = ?", tuples)
-                self.database_manager.query_and_commit_many("DELETE FROM scored_predictions WHERE miner_hotkey = ?", tuples)
+
+            def delete_miner_data(cursor) -> None:
+                for table_name in ['predictions', 'miner_scores', 'active_miners', 'daily_scores', 'scored_predictions', 'market_coverage']:
+                    cursor.executemany(f"DELETE FROM {table_name} WHERE miner_hotkey = ?", tuples)
+
+            self.database_manager.run_in_transaction(delete_miner_data)  # All or nothing, so a miner is never half removed
+            self.score_window.forget(deregistered_hotkeys)
 
         bt.logging.trace(f"| {current_thread} | Thread terminating")
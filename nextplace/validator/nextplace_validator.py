@@ -1,13 +1,17 @@
-import time
+import asyncio
+from concurrent.futures import Future
 import bittensor as bt
 from nextplace.protocol import RealEstateSynapse
 from nextplace.validator.database.database_manager import DatabaseManager
 from nextplace.validator.database.table_initializer import TableInitializer
 from nextplace.validator.market.market_manager import MarketManager
 from nextplace.validator.market.markets import real_estate_markets
+from nextplace.validator.metagraph.metagraph_cache import MetagraphCache
+from nextplace.validator.miner_manager.axon_health_tracker import AxonHealthTracker, SUCCESS_STATUS_CODE
 from nextplace.validator.miner_manager.miner_manager import MinerManager
 from nextplace.validator.predictions.prediction_manager import PredictionManager
 from nextplace.validator.scoring.scoring import Scorer
+from nextplace.validator.scoring.score_window import ScoreWindow
 from nextplace.validator.synapse.synapse_manager import SynapseManager
 from nextplace.validator.setting_weights.weights import WeightSetter
 from nextplace.validator.website_data.miner_score_sender import MinerScoreSender
@@ -15,54 +19,56 @@ from template.base.validator import BaseValidatorNeuron
 import threading
 
 PROPERTIES_THREAD_NAME = "🏠 PropertiesThread 🏠"
+DENDRITE_TIMEOUT_SECONDS = 30
 
 class RealEstateValidator(BaseValidatorNeuron):
     def __init__(self, config=None):
         super(RealEstateValidator, self).__init__(config=config)
         self.subtensor = bt.subtensor(config=self.config)
+        self.metagraph_cache = MetagraphCache(self.metagraph, self.subtensor, self.config.neuron.metagraph_sync_blocks)
         self.markets = real_estate_markets
         self.database_manager = DatabaseManager()
         self.table_initializer = TableInitializer(self.database_manager)
         self.table_initializer.create_tables()  # Create database tables
-        self.market_manager = MarketManager(self.database_manager, self.markets)
-        self.scorer = Scorer(self.database_manager, self.markets, self.metagraph)
+        self.market_manager = MarketManager(
+            self.database_manager,
+            self.markets,
+            prefetch_markets=self.config.neuron.prefetch_markets,
+            low_water_mark=self.config.neuron.properties_low_water_mark
+        )
+        self.score_window = ScoreWindow(self.database_manager)  # Trailing 30 day scores, shared by scoring and weights
+        self.scorer = Scorer(self.database_manager, self.markets, self.metagraph_cache, self.score_window)
         self.synapse_manager = SynapseManager(self.database_manager)
-        self.prediction_manager = PredictionManager(self.database_manager, self.metagraph)
+        self.prediction_manager = PredictionManager(self.database_manager)
         self.netuid = self.config.netuid
         self.should_step = True
+        self.pending_ingest_futures: list[Future] = []  # Prediction writes from the last forward, still in flight
         self.current_thread = threading.current_thread().name
-        self.miner_manager = MinerManager(self.database_manager, self.metagraph)
+        self.miner_manager = MinerManager(self.database_manager, self.metagraph_cache, self.score_window)
+        self.axon_health_tracker = AxonHealthTracker(self.database_manager)
         self.miner_score_sender = MinerScoreSender(self.database_manager)
 
         self.weight_setter = WeightSetter(
-            metagraph=self.metagraph,
+            metagraph_cache=self.metagraph_cache,
             wallet=self.wallet,
-            subtensor=self.subtensor,
+            subtensor_factory=lambda: bt.subtensor(config=self.config),
             config=config,
-            database_manager=self.database_manager
+            database_manager=self.database_manager,
+            score_window=self.score_window
         )
 
     def sync_metagraph(self):
-        """Sync the metagraph with the latest state from the network"""
-        bt.logging.info(f"| {self.current_thread} | 🔗 Syncing metagraph")
-        self.metagraph.sync(subtensor=self.subtensor)
-        bt.logging.trace(f"| {self.current_thread} | 📈 Metagraph has {len(self.metagraph.hotkeys)} hotkeys")
+        """Sync the metagraph with the latest state from the network, if the cached copy is out of date"""
+        self.metagraph_cache.sync()
 
     def check_timer_set_weights(self) -> None:
         """
-        Check weight setting timer. If time to set weights, try to acquire lock and set weights
+        Check weight setting timer. If time to set weights, set weights
         Returns:
             None
         """
         if self.weight_setter.is_time_to_set_weights():
-            if not self.database_manager.lock.acquire(blocking=True, timeout=10):
-                # If the lock is held by another thread, wait for 10 seconds, if still not available, return
-                bt.logging.trace(f"| {self.current_thread} | 🍃 Another thread is holding the database_manager lock. Will check timer and set weights later. This is expected behavior 😊.")
-                return
-            try:
-                self.weight_setter.check_timer_set_weights()
-            finally:
-                self.database_manager.lock.release()
+            self.weight_setter.check_timer_set_weights()
 
     def is_thread_running(self, thread_name: str):
         for thread in threading.enumerate():  # Get a list of all active threads
@@ -73,61 +79,108 @@ class RealEstateValidator(BaseValidatorNeuron):
     # OVERRIDE | Required
     def forward(self, step: int) -> None:
         """
-        Forward pass
+        Forward pass. Runs `num_concurrent_forwards` pipelined queries, while the previous step's predictions are
+        still being written to the database.
         Returns:
             None
         """
         bt.logging.info(f"| {self.current_thread} | ⏩ Running forward pass")
+        self.loop.run_until_complete(self._pipelined_forward())
+        self.axon_health_tracker.persist()
 
-        # Need database lock to handle synapse creation and prediction management
-        if not self.database_manager.lock.acquire(blocking=True, timeout=10):
-            # If the lock is held by another thread, wait for 10 seconds, if still not available, return
-            bt.logging.trace(f"| {self.current_thread} | 🍃 Another thread is holding the database_manager lock, waiting for that thread to complete. This is expected behavior 😊.")
+    async def _pipelined_forward(self) -> None:
+        """
+        Run one forward per pipeline lane concurrently. Each lane claims its own batch of properties, so while one lane
+        is waiting on Miners the next synapse is already being prepared. Predictions from this step are left to ingest
+        in the background and awaited during the next step.
+        Returns:
+            None
+        """
+        depth = max(1, self.config.neuron.num_concurrent_forwards)
+        previous_ingest_futures = self.pending_ingest_futures
+        self.pending_ingest_futures = []
+        try:
+            results = await asyncio.gather(
+                *[self._forward_lane() for _ in range(depth)],
+                self._await_ingestion(previous_ingest_futures)
+            )
+        finally:
+            await self.dendrite.aclose_session()
+
+        if not any(results[:depth]):
+            bt.logging.info(f"| {self.current_thread} | 🏘️ No properties in the properties table. PropertiesThread should be updating this table.")
             self.should_step = False
-            time.sleep(10)
-            return
 
-        try:
+    async def _forward_lane(self) -> bool:
+        """
+        Claim a batch of properties, query the Miners with it
+        Returns:
+            True if a synapse was sent, False if there were no properties to send
+        """
+        # Properties are prefetched in the background by the PropertiesThread, so this never waits on the API
+        synapse: RealEstateSynapse = await self.loop.run_in_executor(None, self.synapse_manager.get_synapse)  # Prepare data for miners
+        if synapse is None or len(synapse.real_estate_predictions.predictions) == 0:
+            return False
+
+        synapse_ids = set([x.nextplace_id for x in synapse.real_estate_predictions.predictions])
+        ingest_futures, latencies = await self._query_miners(synapse, synapse_ids)  # Query Miners, queue predictions as they arrive
+        self.synapse_manager.record_response_times(latencies)  # Size the next batch
+        self.pending_ingest_futures.extend(ingest_futures)
+        return True
+
+    async def _await_ingestion(self, ingest_futures: list[Future]) -> None:
+        """
+        Wait for queued prediction writes to finish
+        Args:
+            ingest_futures: Futures returned by the PredictionManager
 
-            # Need market lock to maintain market manager state safely
-            if not self.market_manager.lock.acquire(blocking=True, timeout=10):
-                # If the lock is held by another thread, wait for 10 seconds, if still not available, return
-                bt.logging.trace(f"| {self.current_thread} | 🍃 Another thread is holding the market_manager lock, waiting for that thread to complete. This is expected behavior 😊.")
-                self.should_step = False
-                time.sleep(10)
-                return
+        Returns:
+            None
+        """
+        for result in await asyncio.gather(*[asyncio.wrap_future(x) for x in ingest_futures], return_exceptions=True):
+            if isinstance(result, Exception):
+                bt.logging.error(f"| {self.current_thread} | ❗Failed to store predictions: {result}")
 
-            try:
-                # If we don't have any properties AND we aren't getting them yet, start thread to get properties
-                number_of_properties = self.database_manager.get_size_of_table('properties')
-                properties_thread_is_running = self.is_thread_running(PROPERTIES_THREAD_NAME)
-                if number_of_properties == 0 and not properties_thread_is_running:
-                    thread = threading.Thread(target=self.market_manager.get_properties_for_market, name=PROPERTIES_THREAD_NAME)  # Create thread
-                    thread.start()  # Start thread
-                    return
-
-                elif number_of_properties == 0:
-                    bt.logging.info(f"| {self.current_thread} | 🏘️ No properties in the properties table. PropertiesThread should be updating this table.")
-                    self.should_step = False
-                    return
-
-            finally:
-                self.market_manager.lock.release()  # Always release the lock
-
-            synapse: RealEstateSynapse = self.synapse_manager.get_synapse()  # Prepare data for miners
-            if synapse is None or len(synapse.real_estate_predictions.predictions) == 0:
-                bt.logging.trace(f"| {self.current_thread} | ↻ No data for Synapse, returning.")
-                return
-
-            synapse_ids = set([x.nextplace_id for x in synapse.real_estate_predictions.predictions])
-            responses = self.dendrite.query(
-                axons=self.metagraph.axons,
-                synapse=synapse,
-                deserialize=True,
-                timeout=30
-            )
+    async def _query_miners(self, synapse: RealEstateSynapse, synapse_ids: set[str]) -> tuple[list[Future], list[float]]:
+        """
+        Send the synapse to every axon concurrently. Each Miner's predictions are queued for ingestion as soon as that
+        Miner responds, so slow Miners don't hold up the others.
+        Args:
+            synapse: the synapse to send
+            synapse_ids: nextplace_ids in the synapse
 
-            self.prediction_manager.process_predictions(responses, synapse_ids)  # Process Miner predictions
+        Returns:
+            Futures for the database writes of this synapse's predictions, and each responsive Miner's processing time
+        """
+        bt.logging.info(f"| {self.current_thread} | 📡 Querying Miners, processing responses as they arrive")
+
+        async def query_miner(miner_hotkey: str, axon) -> tuple:
+            response = await self.dendrite.call(
+                target_axon=axon,
+                synapse=synapse.model_copy(),
+                timeout=DENDRITE_TIMEOUT_SECONDS,
+                deserialize=False
+            )
+            return miner_hotkey, response
 
-        finally:
-            self.database_manager.lock.release()  # Always release the lock
+        axons = self.axon_health_tracker.select_axons(self.metagraph_cache.snapshot(), self.config.neuron.vpermit_tao_limit)  # Skip dead endpoints
+        queries = [query_miner(miner_hotkey, axon) for miner_hotkey, axon in axons]
+        ingest_futures = []
+        latencies = []
+        for completed_query in asyncio.as_completed(queries):
+            try:
+                miner_hotkey, response = await completed_query
+            except Exception as e:
+                bt.logging.trace(f"| {self.current_thread} | ❗Failed to query miner: {e}")
+                continue
+            self.axon_health_tracker.record_response(miner_hotkey, response.dendrite.status_code, response.dendrite.process_time)
+            if response.dendrite.status_code == SUCCESS_STATUS_CODE and response.dendrite.process_time is not None:
+                latencies.append(float(response.dendrite.process_time))
+            elif response.dendrite.status_code != SUCCESS_STATUS_CODE and self.axon_health_tracker.is_live(miner_hotkey):
+                latencies.append(DENDRITE_TIMEOUT_SECONDS)  # A live Miner that couldn't answer in time, likely because the batch is too big
+            ingest_future = self.prediction_manager.queue_response(miner_hotkey, response.deserialize(), synapse_ids)
+            if ingest_future is not None:
+                ingest_futures.append(ingest_future)
+
+        ingest_futures.append(self.prediction_manager.flush())  # Store whatever is left in the batch
+        return ingest_futures, latencies
@@ -1,33 +1,48 @@
 import threading
+from collections import Counter, defaultdict
+from concurrent.futures import Future
 from typing import List, Tuple
 import bittensor as bt
 from datetime import datetime, timezone
 from nextplace.protocol import RealEstatePredictions
-from nextplace.validator.utils.contants import ISO8601, build_miner_predictions_table_name
+from nextplace.validator.utils.contants import ISO8601, MARKET_COVERAGE_WINDOW_DAYS, to_epoch_day
 from nextplace.validator.database.database_manager import DatabaseManager
 
 """
 Helper class manages processing predictions from Miners
 """
 
+INGEST_BATCH_SIZE = 1000  # Write queued predictions to the database once this many are waiting
+
 
 class PredictionManager:
 
-    def __init__(self, database_manager: DatabaseManager, metagraph):
+    def __init__(self, database_manager: DatabaseManager):
         self.database_manager = database_manager
-        self.metagraph = metagraph
+        self.ingest_lock = threading.Lock()
+        self.coverage_expired_through: int or None = None  # Last day market coverage was expired on
+        self._reset_pending()
+
+    def _reset_pending(self) -> None:
+        """
+        Start a new, empty ingest batch. Caller must hold the ingest lock (or be the constructor).
+        Returns:
+            None
+        """
+        self.pending_replace_rows: list[tuple] = []
+        self.pending_ignore_rows: list[tuple] = []
+        self.pending_hotkeys: set[str] = set()
 
-    def process_predictions(self, responses: List[RealEstatePredictions], valid_synapse_ids: set[str]) -> None:
+    def process_predictions(self, responses: List[Tuple[str, RealEstatePredictions]], valid_synapse_ids: set[str]) -> None:
         """
-        Process predictions from the Miners
+        Process predictions from the Miners and wait until they're stored
         Args:
-            responses (list): list of synapses from Miners
+            responses (list): list of (miner hotkey, synapse response) pairs
             valid_synapse_ids (set): set of valid synapse ids
 
         Returns:
             None
         """
-
         current_thread = threading.current_thread().name
         bt.logging.info(f'| {current_thread} | 📡 Processing Responses')
 
@@ -35,112 +50,177 @@ class PredictionManager:
             bt.logging.trace(f'| {current_thread} | ❗No responses received')
             return
 
-        current_utc_datetime = datetime.now(timezone.utc)
-        timestamp = current_utc_datetime.strftime(ISO8601)
-        valid_hotkeys = set()
-
-        for idx, real_estate_predictions in enumerate(responses):  # Iterate responses
-
-            try:
-                miner_hotkey = self.metagraph.hotkeys[idx]
+        futures = [self.queue_response(miner_hotkey, response, valid_synapse_ids) for miner_hotkey, response in responses]
+        futures.append(self.flush())
+        for future in futures:
+            if future is not None:
+                future.result()
 
-                if miner_hotkey is None:
-                    bt.logging.trace(f" | {current_thread} | ❗ Failed to find miner_hotkey while processing predictions")
-                    continue
-
-                valid_hotkeys.add(miner_hotkey)
-
-                table_name = build_miner_predictions_table_name(miner_hotkey)
-                replace_policy_data_for_ingestion: list[tuple] = []
-                ignore_policy_data_for_ingestion: list[tuple] = []
-
-                for prediction in real_estate_predictions.predictions:  # Iterate predictions in each response
-
-                    # Ignore predictions for houses not affiliated with this synapse
-                    if prediction.nextplace_id not in valid_synapse_ids:
-                        bt.logging.trace(f"| {current_thread} | 🐝 Found invalid nextplace_id for miner: '{miner_hotkey}'")
-                        continue
-
-                    # Only process valid predictions
-                    if prediction is None or prediction.predicted_sale_price is None or prediction.predicted_sale_date is None:
-                        continue
-
-                    values = (
-                        prediction.nextplace_id,
-                        miner_hotkey,
-                        prediction.predicted_sale_price,
-                        prediction.predicted_sale_date,
-                        timestamp,
-                        prediction.market,
-                    )
-
-                    # Parse force update flag
-                    if prediction.force_update_past_predictions:
-                        replace_policy_data_for_ingestion.append(values)
-                    else:
-                        ignore_policy_data_for_ingestion.append(values)
-
-                # Store predictions in the database
-                self._create_table_if_not_exists(table_name)
-                if len(ignore_policy_data_for_ingestion) > 0:
-                    self._handle_ingestion('IGNORE', ignore_policy_data_for_ingestion, table_name)
-                if len(replace_policy_data_for_ingestion) > 0:
-                    self._handle_ingestion('REPLACE', replace_policy_data_for_ingestion, table_name)
+    def queue_response(self, miner_hotkey: str, real_estate_predictions: RealEstatePredictions, valid_synapse_ids: set[str]) -> Future or None:
+        """
+        Validate a single miner's response and add it to the ingest batch. The batch is written once it's full.
+        Args:
+            miner_hotkey: the miner's hotkey
+            real_estate_predictions: the miner's response
+            valid_synapse_ids: set of valid synapse ids
 
-            except Exception as e:
-                bt.logging.trace(f"| {current_thread} | ❗Failed to process prediction: {e}")
+        Returns:
+            A Future for the database write if this response filled the batch, otherwise None
+        """
+        current_thread = threading.current_thread().name
+        if miner_hotkey is None:
+            bt.logging.trace(f" | {current_thread} | ❗ Failed to find miner_hotkey while processing predictions")
+            return None
 
-        self._track_miners(valid_hotkeys)
+        current_utc_datetime = datetime.now(timezone.utc)
+        timestamp = current_utc_datetime.strftime(ISO8601)
+        try:
+            replace_rows, ignore_rows = self._build_rows_for_ingestion(real_estate_predictions, miner_hotkey, valid_synapse_ids, timestamp, to_epoch_day(current_utc_datetime))
+        except Exception as e:
+            bt.logging.trace(f"| {current_thread} | ❗Failed to process prediction: {e}")
+            return None
+
+        with self.ingest_lock:
+            self.pending_hotkeys.add(miner_hotkey)
+            self.pending_replace_rows.extend(replace_rows)
+            self.pending_ignore_rows.extend(ignore_rows)
+            batch_is_full = len(self.pending_replace_rows) + len(self.pending_ignore_rows) >= INGEST_BATCH_SIZE
+        return self.flush() if batch_is_full else None
+
+    def flush(self) -> Future:
+        """
+        Hand the current ingest batch to the database writer, in a single transaction
+        Returns:
+            A Future that resolves once the batch is stored
+        """
+        today = to_epoch_day(datetime.now(timezone.utc))
+        with self.ingest_lock:
+            replace_rows, ignore_rows, hotkeys = self.pending_replace_rows, self.pending_ignore_rows, self.pending_hotkeys
+            expire_coverage = self.coverage_expired_through != today
+            self.coverage_expired_through = today
+            self._reset_pending()
+
+        def ingest(cursor) -> None:
+            stored_rows = self._get_new_rows(cursor, ignore_rows) + replace_rows  # Duplicates are dropped by the IGNORE policy
+            self._handle_ingestion(cursor, 'IGNORE', ignore_rows)
+            self._handle_ingestion(cursor, 'REPLACE', replace_rows)
+            self._track_miners(cursor, hotkeys)
+            coverage = Counter((row[1], row[5], row[6]) for row in stored_rows if row[5] is not None)
+            self._update_market_coverage(cursor, coverage, today if expire_coverage else None)
+            current_thread = threading.current_thread().name
+            bt.logging.trace(f"| {current_thread} | 📥 Stored {len(ignore_rows) + len(replace_rows)} predictions from {len(hotkeys)} miners")
+
+        return self.database_manager.submit_transaction(ingest)
+
+    def _build_rows_for_ingestion(self, real_estate_predictions: RealEstatePredictions, miner_hotkey: str, valid_synapse_ids: set[str], timestamp: str, prediction_day: int) -> Tuple[list[tuple], list[tuple]]:
+        """
+        Filter a miner's predictions down to valid ones and format them for ingestion
+        Args:
+            real_estate_predictions: the miner's response
+            miner_hotkey: the miner's hotkey
+            valid_synapse_ids: set of valid synapse ids
+            timestamp: the prediction timestamp
+            prediction_day: the prediction timestamp, as days since the epoch
 
-    def _track_miners(self, valid_hotkeys: set[str]) -> None:
+        Returns:
+            Rows to ingest with the REPLACE policy, rows to ingest with the IGNORE policy
+        """
+        current_thread = threading.current_thread().name
+        predictions = [x for x in real_estate_predictions.predictions if x is not None]
+
+        # Ignore predictions for houses not affiliated with this synapse
+        in_synapse = [x for x in predictions if x.nextplace_id in valid_synapse_ids]
+        if len(in_synapse) < len(predictions):
+            bt.logging.trace(f"| {current_thread} | 🐝 Found {len(predictions) - len(in_synapse)} invalid nextplace_ids for miner: '{miner_hotkey}'")
+
+        # Only process valid predictions
+        valid = [x for x in in_synapse if x.predicted_sale_price is not None and x.predicted_sale_date is not None]
+
+        replace_rows = []
+        ignore_rows = []
+        for prediction in valid:
+            values = (
+                prediction.nextplace_id,
+                miner_hotkey,
+                prediction.predicted_sale_price,
+                prediction.predicted_sale_date,
+                timestamp,
+                prediction.market,
+                prediction_day,
+            )
+            # Parse force update flag
+            (replace_rows if prediction.force_update_past_predictions else ignore_rows).append(values)
+        return replace_rows, ignore_rows
+
+    def _track_miners(self, cursor, valid_hotkeys: set[str]) -> None:
         formatted = [(x,) for x in valid_hotkeys]
         query_str = """
             INSERT OR IGNORE INTO active_miners
             (miner_hotkey)
             VALUES (?)
         """
-        self.database_manager.query_and_commit_many(query_str, formatted)
+        cursor.executemany(query_str, formatted)
+
+    def _get_new_rows(self, cursor, values: list[tuple]) -> list[tuple]:
+        """
+        Find the rows that aren't in the predictions table yet, keeping the first of any repeats within the batch
+        Args:
+            cursor: a database cursor, inside the ingestion transaction
+            values: prediction data
 
-    def _create_table_if_not_exists(self, table_name: str) -> None:
+        Returns:
+            The rows an INSERT OR IGNORE would store
+        """
+        nextplace_ids_by_miner = defaultdict(set)
+        for row in values:
+            nextplace_ids_by_miner[row[1]].add(row[0])
+        existing = set()
+        for miner_hotkey, nextplace_ids in nextplace_ids_by_miner.items():  # One lookup per miner, a response is at most one synapse
+            placeholders = ', '.join('?' * len(nextplace_ids))
+            cursor.execute(f"SELECT nextplace_id, miner_hotkey FROM predictions WHERE miner_hotkey = ? AND nextplace_id IN ({placeholders})", (miner_hotkey, *nextplace_ids))
+            existing.update(cursor.fetchall())
+        new_rows = []
+        for row in values:
+            if (row[0], row[1]) not in existing:
+                existing.add((row[0], row[1]))
+                new_rows.append(row)
+        return new_rows
+
+    def _update_market_coverage(self, cursor, coverage: Counter, today: int or None) -> None:
         """
-        Create the predictions table for this miner if it doesn't exist
+        Add this batch to the per-day market coverage summary, and expire days that have left the coverage window
         Args:
-            table_name: miner's table name
+            cursor: a database cursor, inside the ingestion transaction
+            coverage: number of stored predictions per (miner hotkey, market, day)
+            today: today's epoch day if old days should be expired, else None
 
         Returns:
             None
         """
-        create_str = f"""
-                    CREATE TABLE IF NOT EXISTS {table_name} (
-                        nextplace_id TEXT,
-                        miner_hotkey TEXT,
-                        predicted_sale_price REAL,
-                        predicted_sale_date TEXT,
-                        prediction_timestamp TEXT,
-                        market TEXT,
-                        PRIMARY KEY (nextplace_id, miner_hotkey)
-                    )
-                """
-        idx_str = f"CREATE INDEX IF NOT EXISTS idx_prediction_timestamp ON {table_name}(prediction_timestamp)"
-        idx_str_market = f"CREATE INDEX IF NOT EXISTS idx_market ON {table_name}(market)"
-        self.database_manager.query_and_commit(create_str)
-        self.database_manager.query_and_commit(idx_str)
-        self.database_manager.query_and_commit(idx_str_market)
-
-    def _handle_ingestion(self, conflict_policy: str, values: list[tuple], table_name: str) -> None:
-        """
-        Ingest predictions for a miner
+        cursor.executemany("""
+            INSERT INTO market_coverage (miner_hotkey, market, day, predictions)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (miner_hotkey, market, day) DO UPDATE SET predictions = predictions + excluded.predictions
+        """, [(miner_hotkey, market, day, count) for (miner_hotkey, market, day), count in coverage.items()])
+        if today is not None:
+            cursor.execute("DELETE FROM market_coverage WHERE day <= ?", (today - MARKET_COVERAGE_WINDOW_DAYS,))
+
+    def _handle_ingestion(self, cursor, conflict_policy: str, values: list[tuple]) -> None:
+        """
+        Ingest predictions for all miners
         Args:
+            cursor: a database cursor, inside the ingestion transaction
             conflict_policy: to ignore new predictions or replace existing predictions
             values: prediction data
-            table_name: the miner's prediction table
 
         Returns:
             None
         """
+        if len(values) == 0:
+            return
         query_str = f"""
-            INSERT OR {conflict_policy} INTO {table_name} 
-            (nextplace_id, miner_hotkey, predicted_sale_price, predicted_sale_date, prediction_timestamp, market)
-            VALUES (?, ?, ?, ?, ?, ?)
+            INSERT OR {conflict_policy} INTO predictions
+            (nextplace_id, miner_hotkey, predicted_sale_price, predicted_sale_date, prediction_timestamp, market, prediction_day)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
         """
-        self.database_manager.query_and_commit_many(query_str, values)
+        cursor.executemany(query_str, values)
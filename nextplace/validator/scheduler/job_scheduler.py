@@ -0,0 +1,173 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable
+import bittensor as bt
+from nextplace.validator.data_containers.job_metrics import JobMetrics
+
+"""
+Helper class runs the validator's periodic jobs on a fixed pool of worker threads
+"""
+
+JOB_THREAD_NAME_PREFIX = "⏰ JobThread"
+
+
+class Job:
+
+    def __init__(self, name: str, work: Callable[[], None], interval_seconds: float, depends_on: list[str], run_inline: bool):
+        self.name = name
+        self.work = work
+        self.interval_seconds = interval_seconds
+        self.depends_on = depends_on
+        self.run_inline = run_inline
+        self.next_run = time.monotonic()  # Due straight away
+        self.running = False
+        self.metrics: JobMetrics = {
+            'runs': 0,
+            'failures': 0,
+            'last_duration': None,
+            'average_duration': None,
+            'max_duration': None,
+            'last_finished': None,
+        }
+
+
+class JobScheduler:
+
+    def __init__(self, max_workers: int = 4):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=JOB_THREAD_NAME_PREFIX)
+        self.jobs: dict[str, Job] = {}
+        self.lock = threading.Lock()
+
+    def register(self, name: str, work: Callable[[], None], interval_seconds: float, depends_on: list[str] or None = None, run_inline: bool = False) -> None:
+        """
+        Register a periodic job
+        Args:
+            name: unique job name
+            work: the callable to run
+            interval_seconds: minimum time between the start of one run and the next
+            depends_on: jobs that must have completed at least once before this job runs. A job never runs at the same
+                time as its dependencies
+            run_inline: run on the thread calling `run_pending` instead of the worker pool
+
+        Returns:
+            None
+        """
+        depends_on = depends_on or []
+        for dependency in depends_on:
+            if dependency not in self.jobs:
+                raise ValueError(f"Job '{name}' depends on unknown job '{dependency}'")
+        with self.lock:
+            self.jobs[name] = Job(name, work, interval_seconds, depends_on, run_inline)
+
+    def run_pending(self) -> None:
+        """
+        Start every job that is due and whose dependencies allow it. Pooled jobs are submitted without waiting, inline
+        jobs run before this returns.
+        Returns:
+            None
+        """
+        now = time.monotonic()
+        inline_jobs = []
+        with self.lock:
+            for job in self.jobs.values():
+                if not self._is_ready(job, now):
+                    continue
+                job.running = True
+                job.next_run = now + job.interval_seconds
+                if job.run_inline:
+                    inline_jobs.append(job)
+                else:
+                    self.executor.submit(self._run_job, job)
+        for job in inline_jobs:
+            self._run_job(job)
+
+    def seconds_until_next_job(self) -> float:
+        """
+        Get the time until the next job is due
+        Returns:
+            Seconds until the next job is due, 0 if one is already due
+        """
+        now = time.monotonic()
+        with self.lock:
+            waiting = [job.next_run - now for job in self.jobs.values() if not job.running]
+        return max(0.0, min(waiting)) if len(waiting) > 0 else 0.0
+
+    def get_metrics(self) -> dict[str, JobMetrics]:
+        """
+        Get timing metrics for every job
+        Returns:
+            Dictionary of job name to a copy of its metrics
+        """
+        with self.lock:
+            return {name: dict(job.metrics) for name, job in self.jobs.items()}
+
+    def log_metrics(self) -> None:
+        """
+        Log timing metrics for every job
+        Returns:
+            None
+        """
+        current_thread = threading.current_thread().name
+        for name, metrics in self.get_metrics().items():
+            average = f"{metrics['average_duration']:.2f}s" if metrics['average_duration'] is not None else "n/a"
+            maximum = f"{metrics['max_duration']:.2f}s" if metrics['max_duration'] is not None else "n/a"
+            bt.logging.info(f"| {current_thread} | ⏱️ Job '{name}': {metrics['runs']} runs, {metrics['failures']} failures, average {average}, max {maximum}")
+
+    def shutdown(self) -> None:
+        """
+        Stop the worker pool, waiting for running jobs to finish
+        Returns:
+            None
+        """
+        self.executor.shutdown(wait=True)
+
+    def _is_ready(self, job: Job, now: float) -> bool:
+        """
+        Check whether a job can start now. Caller must hold the lock.
+        Args:
+            job: the job
+            now: current monotonic time
+
+        Returns:
+            True if the job is due, isn't running, and its dependencies allow it
+        """
+        if job.running or now < job.next_run:
+            return False
+        for dependency_name in job.depends_on:
+            dependency = self.jobs[dependency_name]
+            if dependency.running or dependency.metrics['runs'] == dependency.metrics['failures']:
+                return False
+        # Don't start a job while anything that depends on it is running either
+        return not any(other.running and job.name in other.depends_on for other in self.jobs.values())
+
+    def _run_job(self, job: Job) -> None:
+        """
+        Run a job and record its metrics
+        Args:
+            job: the job
+
+        Returns:
+            None
+        """
+        current_thread = threading.current_thread().name
+        start = time.monotonic()
+        failed = False
+        try:
+            job.work()
+        except Exception as e:
+            failed = True
+            bt.logging.error(f"| {current_thread} | ❗Job '{job.name}' failed: {e}")
+        duration = time.monotonic() - start
+
+        with self.lock:
+            metrics = job.metrics
+            metrics['runs'] += 1
+            metrics['failures'] += 1 if failed else 0
+            metrics['last_duration'] = duration
+            previous_average = metrics['average_duration'] or 0.0
+            metrics['average_duration'] = previous_average + (duration - previous_average) / metrics['runs']
+            metrics['max_duration'] = max(metrics['max_duration'] or 0.0, duration)
+            metrics['last_finished'] = datetime.now(timezone.utc)
+            job.running = False
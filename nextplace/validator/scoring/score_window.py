@@ -0,0 +1,161 @@
+import threading
+from datetime import datetime, timezone, timedelta, date
+import bittensor as bt
+import numpy as np
+from nextplace.validator.database.database_manager import DatabaseManager
+from nextplace.validator.utils.contants import EPOCH_DATE, to_epoch_day
+
+"""
+Helper class keeps each miner's trailing 30 day scores in memory, as per-day (sum, count) buckets in a ring.
+Backed by the daily_scores table, so it survives restarts.
+"""
+
+SCORE_WINDOW_DAYS = 30  # Incentive is based on the last 30 days of performance
+
+
+class ScoreWindow:
+
+    def __init__(self, database_manager: DatabaseManager, window_days: int = SCORE_WINDOW_DAYS):
+        self.database_manager = database_manager
+        self.window_days = window_days
+        self.lock = threading.Lock()
+        self.hotkey_rows: dict[str, int] = {}  # Miner hotkey -> row in the bucket arrays
+        self.sums = np.zeros((0, window_days))  # [miner, day % window_days]
+        self.counts = np.zeros((0, window_days))
+        self.slot_days = np.full(window_days, -1)  # The epoch day each ring slot currently holds
+        self.current_day = None
+        self._load()
+
+    def _load(self) -> None:
+        """
+        Fill the buckets from the daily_scores table
+        Returns:
+            None
+        """
+        current_thread = threading.current_thread().name
+        today = to_epoch_day(datetime.now(timezone.utc))
+        rows = self.database_manager.query_with_values("""
+            SELECT miner_hotkey, date, COALESCE(sum_score, score * total_predictions), total_predictions
+            FROM daily_scores
+            WHERE date >= ?
+        """, (self.get_first_date(today),))
+        with self.lock:
+            self._advance(today)
+            for miner_hotkey, day, sum_score, count in rows:
+                self._add(miner_hotkey, (date.fromisoformat(day) - EPOCH_DATE).days, sum_score, count)
+        bt.logging.trace(f"| {current_thread} | 🪟 Loaded {len(rows)} daily scores into the {self.window_days} day score window")
+
+    def get_first_date(self, today: int) -> str:
+        """
+        Get the oldest date inside the window
+        Args:
+            today: today, as days since the epoch
+
+        Returns:
+            The oldest date in the window, formatted like daily_scores.date
+        """
+        return (EPOCH_DATE + timedelta(days=today - self.window_days + 1)).isoformat()
+
+    def add_scores(self, new_scores_by_miner: dict[str, dict[str, float]], day: int) -> None:
+        """
+        Add newly scored predictions to a day's buckets
+        Args:
+            new_scores_by_miner: dict of miner hotkey to total score and number of valid scores
+            day: the day the scores belong to, as days since the epoch
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self._advance(to_epoch_day(datetime.now(timezone.utc)))
+            for miner_hotkey, new_scores in new_scores_by_miner.items():
+                self._add(miner_hotkey, day, new_scores['total_score'], new_scores['new_predictions'])
+
+    def get_averages(self) -> dict[str, float]:
+        """
+        Get each miner's average score over the window
+        Returns:
+            Dictionary of miner hotkey to average score, for miners with scores in the window
+        """
+        with self.lock:
+            self._advance(to_epoch_day(datetime.now(timezone.utc)))
+            sums = self.sums.sum(axis=1)
+            counts = self.counts.sum(axis=1)
+            return {
+                miner_hotkey: float(sums[row] / counts[row])
+                for miner_hotkey, row in self.hotkey_rows.items() if counts[row] > 0
+            }
+
+    def forget(self, miner_hotkeys: list[str]) -> None:
+        """
+        Drop deregistered miners from the window
+        Args:
+            miner_hotkeys: hotkeys to drop
+
+        Returns:
+            None
+        """
+        with self.lock:
+            rows = [self.hotkey_rows[x] for x in miner_hotkeys if x in self.hotkey_rows]
+            if len(rows) == 0:
+                return
+            self._keep_rows(np.setdiff1d(np.arange(len(self.sums)), rows))
+
+    def _add(self, miner_hotkey: str, day: int, sum_score: float, count: int) -> None:
+        """
+        Add to one miner's bucket for a day. Days outside the window are ignored. Caller must hold the lock.
+        Args:
+            miner_hotkey: the miner's hotkey
+            day: days since the epoch
+            sum_score: sum of the new scores
+            count: number of new scores
+
+        Returns:
+            None
+        """
+        if not self.current_day - self.window_days < day <= self.current_day:
+            return
+        if miner_hotkey not in self.hotkey_rows:
+            self.hotkey_rows[miner_hotkey] = len(self.sums)
+            self.sums = np.vstack([self.sums, np.zeros(self.window_days)])
+            self.counts = np.vstack([self.counts, np.zeros(self.window_days)])
+        row = self.hotkey_rows[miner_hotkey]
+        slot = day % self.window_days
+        self.sums[row, slot] += sum_score
+        self.counts[row, slot] += count
+
+    def _advance(self, today: int) -> None:
+        """
+        Move the window forward to today, emptying the buckets of days that have left it. Miners left without any
+        scores are dropped. Caller must hold the lock.
+        Args:
+            today: days since the epoch
+
+        Returns:
+            None
+        """
+        if self.current_day is not None and today <= self.current_day:
+            return
+        self.current_day = today
+        window = np.arange(today - self.window_days + 1, today + 1)
+        slots = window % self.window_days
+        expired = self.slot_days[slots] != window
+        self.sums[:, slots[expired]] = 0
+        self.counts[:, slots[expired]] = 0
+        self.slot_days[slots] = window
+        if len(self.counts) > 0:
+            self._keep_rows(np.flatnonzero(self.counts.sum(axis=1) > 0))
+
+    def _keep_rows(self, rows: np.ndarray) -> None:
+        """
+        Keep only the given miner rows. Caller must hold the lock.
+        Args:
+            rows: indices of the rows to keep
+
+        Returns:
+            None
+        """
+        hotkeys_by_row = {row: miner_hotkey for miner_hotkey, row in self.hotkey_rows.items()}
+        self.hotkey_rows = {hotkeys_by_row[row]: idx for idx, row in enumerate(rows)}
+        self.sums = self.sums[rows]
+        self.counts = self.counts[rows]
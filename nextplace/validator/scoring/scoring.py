@@ -1,12 +1,16 @@
+import math
 import sqlite3
+import numpy as np
 from datetime import datetime, timezone, timedelta
 from time import sleep
 import bittensor as bt
 import threading
 from nextplace.validator.scoring.scoring_calculator import ScoringCalculator
+from nextplace.validator.scoring.score_window import ScoreWindow
 from nextplace.validator.api.sold_homes_api import SoldHomesAPI
 from nextplace.validator.database.database_manager import DatabaseManager
-from nextplace.validator.utils.contants import ISO8601, build_miner_predictions_table_name
+from nextplace.validator.metagraph.metagraph_cache import MetagraphCache
+from nextplace.validator.utils.contants import ISO8601, to_epoch_day
 from nextplace.validator.website_data.website_communicator import WebsiteCommunicator
 import requests
 
@@ -14,16 +18,20 @@ import requests
 Helper class manages scoring Miner predictions
 """
 
+SCORING_SWEEP_INTERVAL_SECONDS = 300
+
 
 class Scorer:
 
-    def __init__(self, database_manager: DatabaseManager, markets: list[dict[str, str]], metagraph):
-        self.metagraph = metagraph
+    def __init__(self, database_manager: DatabaseManager, markets: list[dict[str, str]], metagraph_cache: MetagraphCache, score_window: ScoreWindow):
+        self.metagraph_cache = metagraph_cache
         self.database_manager = database_manager
         self.markets = markets
+        self.score_window = score_window
         self.sold_homes_api = SoldHomesAPI(database_manager, markets)
-        self.scoring_calculator = ScoringCalculator(database_manager, self.sold_homes_api)
+        self.scoring_calculator = ScoringCalculator(database_manager, self.sold_homes_api, score_window)
         self.sales_timer = datetime.now(timezone.utc)
+        self.consensus_checked_hotkeys: set[str] = set()
 
     def run_score_thread(self) -> None:
         """
@@ -34,83 +42,99 @@ class Scorer:
         thread_name = threading.current_thread().name
         bt.logging.trace(f"| {thread_name} | 🏁 Beginning scoring thread")
 
-        # If no sales, get them
-        with self.database_manager.lock:
-            # number_of_sales = self.database_manager.get_size_of_table('sales')
-            number_of_sales = 0  # Force validators to update sales table initially, for update v1.2.0
-        if number_of_sales == 0:
-            self.sold_homes_api.get_sold_properties()  # Get recently sold homes
-            now = datetime.now(timezone.utc)
-            self.sales_timer = now
+        self.sold_homes_api.get_sold_properties()  # Catch up on homes sold since the last sync
+        self.sales_timer = datetime.now(timezone.utc)
 
         while True:
 
-            # Refresh the `sales` table every 8ish hours
+            # Sync newly sold homes every 12ish hours
             now = datetime.now(timezone.utc)
             if now - self.sales_timer > timedelta(hours=12):
                 bt.logging.trace(f"| {thread_name} | 🏷️ Time to refresh recently sold homes")
                 self.sales_timer = now
-                self.database_manager.delete_all_sales()  # Clear out sales table
-                self.sold_homes_api.get_sold_properties()  # Get recently sold homes
+                self.sold_homes_api.get_sold_properties()  # Get homes sold since the last sync
+                self.consensus_checked_hotkeys.clear()  # Allow checking other validators' scores again
+
+            bt.logging.trace(f"| {thread_name} | 🚀 Beginning scoring sweep")
 
-            bt.logging.trace(f"| {thread_name} | 🚀 Beginning metagraph hotkey iteration")
+            try:
+                self.score_predictions()  # Score predictions for all miners
+                self._check_consensus_for_unscored_miners()  # Seed scores for miners we haven't scored yet
+            except sqlite3.OperationalError as e:
+                bt.logging.trace(f"| {thread_name} | 🏖️ SQLITE operational error: {e}")
 
-            for hotkey in self.metagraph.hotkeys:  # Iterate metagraph hotkeys
+            self._clear_out_old_predictions('predictions')  # Remove old predictions for all miners
+            self._clear_out_old_predictions('scored_predictions')  # Clear out old scored predictions
 
-                table_name = build_miner_predictions_table_name(hotkey)  # Get name of this miner's predictions table
+            sleep(SCORING_SWEEP_INTERVAL_SECONDS)  # Sleep thread until the next sweep
 
-                # Check if predictions table exists for this hotkey. If not, continue
-                with self.database_manager.lock:
-                    table_exists = self.database_manager.table_exists(table_name)
-                if not table_exists:
-                    continue
+    def _get_hotkeys_with_predictions(self) -> set[str]:
+        """
+        Get the hotkeys of all miners with at least one unscored prediction
+        Returns:
+            Set of miner hotkeys
+        """
+        results = self.database_manager.query("SELECT DISTINCT miner_hotkey FROM predictions")
+        return set(row[0] for row in results)
 
-                bt.logging.trace(f"| {thread_name} | ⛏️ Scoring miner with hotkey '{hotkey}'")
+    def score_predictions(self) -> None:
+        """
+        Score every scorable prediction, for all miners in the metagraph, in one pass
+        Returns:
+            None
+        """
+        current_thread = threading.current_thread().name
+        metagraph_hotkeys = set(self.metagraph_cache.snapshot().hotkeys)
+        scorable_predictions = [x for x in self._get_scorable_predictions() if x[1] in metagraph_hotkeys]
+        if len(scorable_predictions) == 0:
+            bt.logging.trace(f"| {current_thread} | 🏝️ Found no predictions to score")
+            return
 
-                try:
-                    self.score_predictions(table_name, hotkey)  # Score predictions
-                    self._clear_out_old_predictions(table_name)  # Remove old predictions from miner's table
-                except sqlite3.OperationalError as e:
-                    bt.logging.trace(f"| {thread_name} | 🏖️ SQLITE operational error: {e}. Note that this is may be caused by miner deregistration while trying to score the deregistered miner, in which case it is not a bug.")
+        bt.logging.trace(f"| {current_thread} | 🏅 Found {len(scorable_predictions)} predictions to score")
+        scoring_data = [(x[1], x[2], x[3], x[6], x[7]) for x in scorable_predictions]
 
-                sleep(120)  # Sleep thread for 2 minutes
+        # Scores and the move to scored_predictions commit together, so a crash can never score a prediction twice
+        def move_to_scored(cursor) -> None:
+            self._move_predictions_to_scored(cursor, scorable_predictions)
 
-            with self.database_manager.lock:
-                self._clear_out_old_predictions('scored_predictions')  # Clear out old scored predictions
+        scores = self.scoring_calculator.process_scorable_predictions(scoring_data, move_to_scored)  # Score predictions for all miners
+        self._send_data_to_website(scorable_predictions, scores)  # Send data to website
 
-    def score_predictions(self, table_name: str, miner_hotkey: str) -> None:
+    def _check_consensus_for_unscored_miners(self) -> None:
         """
-        Query to get scorable predictions that haven't been scored yet
+        For miners with predictions but no scores in our db, check if *any* validator has scored predictions for them.
+        Each miner is only checked once between sales refreshes.
         Returns:
-            list of query results
+            None
         """
         current_thread = threading.current_thread().name
-        scorable_predictions = self._get_scorable_predictions(table_name)
-        if len(scorable_predictions) > 0:
-            bt.logging.trace(f"| {current_thread} | 🏅 Found {len(scorable_predictions)} predictions to score")
-            scoring_data = [(x[1], x[2], x[3], x[6], x[7]) for x in scorable_predictions]
-            self.scoring_calculator.process_scorable_predictions(scoring_data, miner_hotkey)  # Score predictions for this home
-            self._send_data_to_website(scorable_predictions)  # Send data to website
-            self._move_predictions_to_scored(scorable_predictions)  # Move scored predictions to scored_predictions table
-            self._remove_scored_predictions_from_miner_predictions_table(table_name, scorable_predictions)  # Drop scored predictions from miner predictions table
-
-        # Check if they have any scored predictions. If not, check if *any* validator has scored predictions for them.
-        else:
-            with self.database_manager.lock:
-                miner_score_result = self.database_manager.query(f"SELECT * FROM miner_scores WHERE miner_hotkey='{miner_hotkey}'")
-            if len(miner_score_result) == 0:  # This miner has no scored predictions in our db (their scores is 0)
-                bt.logging.trace(f"| {current_thread} | 🔊 Miner '{miner_hotkey}' has no scored predictions. Checking if another validator has any scored predictions for them.")
-                avg_score_from_other_valis = self._get_miner_score_data_from_webserver(miner_hotkey)
-                if avg_score_from_other_valis > 0:  # Other validators have scores for this miner
-                    # Insert consensus score from other valis into our db for ONE SINGLE score
-                    now = datetime.now(timezone.utc).strftime(ISO8601)
-                    query_str = f"""
-                        INSERT INTO miner_scores (miner_hotkey, lifetime_score, total_predictions, last_update_timestamp)
-                        VALUES (?, ?, ?, ?)
-                    """
-                    values = (miner_hotkey, avg_score_from_other_valis, 1, now)
-                    with self.database_manager.lock:
-                        self.database_manager.query_and_commit_with_values(query_str, values)
+        scored_hotkeys = set(row[0] for row in self.database_manager.query("SELECT miner_hotkey FROM miner_scores"))
+        hotkeys_with_predictions = self._get_hotkeys_with_predictions()
+        unscored_hotkeys = [x for x in self.metagraph_cache.snapshot().hotkeys if x in hotkeys_with_predictions and x not in scored_hotkeys and x not in self.consensus_checked_hotkeys]
+
+        for miner_hotkey in unscored_hotkeys:  # These miners have no scored predictions in our db (their scores is 0)
+            self.consensus_checked_hotkeys.add(miner_hotkey)
+            bt.logging.trace(f"| {current_thread} | 🔊 Miner '{miner_hotkey}' has no scored predictions. Checking if another validator has any scored predictions for them.")
+            avg_score_from_other_valis = self._get_miner_score_data_from_webserver(miner_hotkey)
+            if avg_score_from_other_valis > 0:  # Other validators have scores for this miner
+                # Insert consensus score from other valis into our db for ONE SINGLE score
+                current_utc_datetime = datetime.now(timezone.utc)
+                now = current_utc_datetime.strftime(ISO8601)
+                query_str = f"""
+                    INSERT OR IGNORE INTO miner_scores (miner_hotkey, lifetime_score, total_predictions, last_update_timestamp, sum_score)
+                    VALUES (?, ?, ?, ?, ?)
+                """
+                values = (miner_hotkey, avg_score_from_other_valis, 1, now, avg_score_from_other_valis)
+                self.database_manager.query_and_commit_with_values(query_str, values)
+
+                # Weights use the 30 day score window, so the consensus score has to count for today as well
+                query_str = f"""
+                    INSERT OR IGNORE INTO daily_scores (miner_hotkey, date, score, total_predictions, sum_score)
+                    VALUES (?, ?, ?, ?, ?)
+                """
+                values = (miner_hotkey, current_utc_datetime.date().isoformat(), avg_score_from_other_valis, 1, avg_score_from_other_valis)
+                self.database_manager.query_and_commit_with_values(query_str, values)
+                self.score_window.add_scores({miner_hotkey: {'total_score': avg_score_from_other_valis, 'new_predictions': 1}}, to_epoch_day(current_utc_datetime))
 
     def _get_miner_score_data_from_webserver(self, miner_hotkey: str) -> int:
         current_thread = threading.current_thread().name
@@ -137,31 +161,28 @@ class Scorer:
             bt.logging.trace(f"| {current_thread} | ❗ Response:", response.text)
             return 0
 
-    def _get_scorable_predictions(self, table_name: str) -> list[tuple]:
+    def _get_scorable_predictions(self) -> list[tuple]:
         """
-        Retrieve scorable predictions for current miner
-        Args:
-            table_name: name of miner's predictions table
-
+        Retrieve scorable predictions for all miners
         Returns:
             List of scorable predictions
         """
-        query_str = f"""
-            SELECT {table_name}.nextplace_id, {table_name}.miner_hotkey, {table_name}.predicted_sale_price, {table_name}.predicted_sale_date, {table_name}.prediction_timestamp, {table_name}.market, sales.sale_price, sales.sale_date
-            FROM {table_name}
-            JOIN sales ON {table_name}.nextplace_id = sales.nextplace_id
-            AND DATE({table_name}.prediction_timestamp) < DATE(sales.sale_date)
+        query_str = """
+            SELECT predictions.nextplace_id, predictions.miner_hotkey, predictions.predicted_sale_price, predictions.predicted_sale_date, predictions.prediction_timestamp, predictions.market, sales.sale_price, sales.sale_date
+            FROM sales
+            JOIN predictions ON predictions.nextplace_id = sales.nextplace_id
+            AND predictions.prediction_day < sales.sale_day
         """
 
-        with self.database_manager.lock:  # Acquire lock
-            scorable_predictions = self.database_manager.query(query_str)  # Get scorable predictions for this home
+        scorable_predictions = self.database_manager.query(query_str)  # Get scorable predictions for all miners
         return scorable_predictions
 
-    def _send_data_to_website(self, scored_predictions: list[tuple]) -> None:
+    def _send_data_to_website(self, scored_predictions: list[tuple], scores: np.ndarray) -> None:
         """
         Send scored prediction data to the NextPlace website
         Args:
             scored_predictions: list of scored predictions
+            scores: the score of each prediction, as computed by the ScoringCalculator
 
         Returns:
             None
@@ -172,10 +193,10 @@ class Scorer:
         formatted_predictions = [(x[0], x[1], None, x[4], x[2], x[3], x[6], x[7]) for x in scored_predictions]
         data_to_send = []
 
-        for prediction in formatted_predictions:
+        for prediction, score in zip(formatted_predictions, scores.tolist()):
 
             nextplace_id, miner_hotkey, miner_coldkey, prediction_date, predicted_sale_price, predicted_sale_date, sale_price, sale_date = prediction
-            score = self.scoring_calculator.calculate_score(sale_price, predicted_sale_price, sale_date, predicted_sale_date, miner_hotkey)
+            score = None if math.isnan(score) else score
             prediction_date_parsed = self.parse_iso_datetime(prediction_date) if isinstance(prediction_date, str) else prediction_date
             predicted_sale_date_parsed = self.parse_iso_datetime(predicted_sale_date) if isinstance(predicted_sale_date, str) else predicted_sale_date
 
@@ -204,42 +225,29 @@ class Scorer:
         website_communicator = WebsiteCommunicator("Predictions")
         website_communicator.send_data(data=data_to_send)
 
-    def _move_predictions_to_scored(self, scored_predictions: list[tuple]) -> None:
+    def _move_predictions_to_scored(self, cursor, scored_predictions: list[tuple]) -> None:
         """
-        Move scorable predictions to scored predictions_table
+        Move scored predictions to the scored_predictions table
         Args:
-            scorable_predictions: list of all scorable predictions from database
+            cursor: a database cursor, inside the scoring transaction
+            scored_predictions: list of all scored predictions from database
 
         Returns:
             None
         """
-        query_str = """
+        insert_str = """
             INSERT OR IGNORE INTO scored_predictions
             (nextplace_id, miner_hotkey, predicted_sale_price, predicted_sale_date, prediction_timestamp, market, sale_price, sale_date, score_timestamp)
             VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
-        now = datetime.now(timezone.utc).strftime(ISO8601)
-        values = [(x[0], x[1], x[2], x[3], x[4], x[5], x[6], x[7], now) for x in scored_predictions]
-        with self.database_manager.lock:  # Acquire lock
-            self.database_manager.query_and_commit_many(query_str, values)  # Execute query
-
-    def _remove_scored_predictions_from_miner_predictions_table(self, table_name: str, scored_predictions: list[tuple]) -> None:
-        """
-        Remove all scored predictions from miner's predictions table
-        Args:
-            table_name: name of the miner table
-            scorable_predictions: list of scored predictions
-
-        Returns:
-            None
-        """
-        row_ids = [x[0] for x in scored_predictions]
-        formatted_ids = ','.join(f"'{str(nextplace_id)}'" for nextplace_id in row_ids)
-        query_str = f"""
-            DELETE FROM {table_name} WHERE nextplace_id in ({formatted_ids})
+        delete_str = """
+            DELETE FROM predictions WHERE miner_hotkey = ? AND nextplace_id = ?
         """
-        with self.database_manager.lock:  # Acquire lock
-            self.database_manager.query_and_commit(query_str)  # Execute query
+        now = datetime.now(timezone.utc).strftime(ISO8601)
+        insert_values = [(x[0], x[1], x[2], x[3], x[4], x[5], x[6], x[7], now) for x in scored_predictions]
+        delete_values = [(x[1], x[0]) for x in scored_predictions]
+        cursor.executemany(insert_str, insert_values)
+        cursor.executemany(delete_str, delete_values)
 
     def _cleanup(self, table_name: str) -> None:
         """
@@ -266,8 +274,7 @@ class Scorer:
                         DELETE FROM {table_name}
                         WHERE prediction_timestamp < '{min_date}'
                     """
-        with self.database_manager.lock:
-            self.database_manager.query_and_commit(query_str)
+        self.database_manager.query_and_commit(query_str)
 
     def parse_iso_datetime(self, datetime_str: str):
         """
@@ -1,162 +1,113 @@
 import threading
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, Sequence, Tuple
 from datetime import datetime, timezone
 import bittensor as bt
-from nextplace.validator.utils.contants import ISO8601
+import numpy as np
+from nextplace.validator.scoring.score_window import ScoreWindow
+from nextplace.validator.utils.contants import ISO8601, to_epoch_day
 
 
 class ScoringCalculator:
 
-    def __init__(self, database_manager, sold_homes_api):
+    def __init__(self, database_manager, sold_homes_api, score_window: ScoreWindow or None = None):
         self.database_manager = database_manager
         self.sold_homes_api = sold_homes_api
+        self.score_window = score_window
 
-    def process_scorable_predictions(self, scorable_predictions: list, miner_hotkey: str) -> None:
+    def process_scorable_predictions(self, scorable_predictions: list, in_transaction: Callable or None = None) -> np.ndarray:
         """
-        Score miner predictions in bulk
-        """
-        current_thread = threading.current_thread().name
-        miner_score = self._fetch_current_miner_score(miner_hotkey)
-        new_scores = self._calculate_new_scores(scorable_predictions)
-        if new_scores['new_predictions'] == 0:
-            bt.logging.info(f"| {current_thread} | 📰 Miner '{miner_hotkey}' had only invalid scores, likely due to invalid date formatting.")
-            return
-
-        self._add_to_daily_scores(new_scores, miner_hotkey)
-
-        if miner_score is not None:
-            self._update_miner_score(miner_score, new_scores, miner_hotkey)
-        else:
-            self._handle_new_miner_score(miner_hotkey, new_scores)
-        bt.logging.info(f"| {current_thread} | 🎯 Scored {len(scorable_predictions)} predictions for hotkey '{miner_hotkey}'")
-
-    def _add_to_daily_scores(self, new_scores: dict, miner_hotkey: str) -> None:
-        """
-        Add new scores to daily_scores table.
+        Score miner predictions in bulk, for all miners at once. Daily and lifetime scores are written in one transaction.
         Args:
-            new_scores: dict of new scores.
-            miner_hotkey: miner's hotkey.
+            scorable_predictions: list of (miner_hotkey, predicted_price, predicted_date, actual_price, actual_date)
+            in_transaction: optional function of a cursor, for writes that must commit together with the scores
 
         Returns:
-            None
+            The score of each prediction, in order. NaN for predictions that couldn't be scored.
         """
         current_thread = threading.current_thread().name
-        today = datetime.now(timezone.utc).date()
-        bt.logging.info(f"| {current_thread} | 📅 Updating daily_scores for {today}")
+        scores = self._score_predictions(scorable_predictions)
+        new_scores_by_miner = self._calculate_new_scores(scorable_predictions, scores)
 
-        existing_daily_score_query = """
-            SELECT score, total_predictions 
-            FROM daily_scores 
-            WHERE miner_hotkey = ? AND date = ?
-        """
-        values = (miner_hotkey, today)
-
-        with self.database_manager.lock:
-            results = self.database_manager.query_with_values(existing_daily_score_query, values)
-
-        if results and len(results) > 0:  # Update existing Miner score
-            result = results[0]
-            old_score = result[0]
-            old_predictions = result[1]
-            new_total_score = (old_score * old_predictions) + new_scores['total_score']
-            new_total_predictions = old_predictions + new_scores['new_predictions']
-            new_daily_score = new_total_score / new_total_predictions
-
-            update_query = """
-                UPDATE daily_scores 
-                SET score = ?, total_predictions = ? 
-                WHERE miner_hotkey = ? AND date = ?
-            """
-            update_values = (new_daily_score, new_total_predictions, miner_hotkey, today)
-
-            with self.database_manager.lock:
-                self.database_manager.query_and_commit_with_values(update_query, update_values)
-
-            bt.logging.info(f"| {current_thread} | ⭐ Updated daily score. Score: {new_daily_score}, Total Scored: {new_total_predictions}")
-
-        else:  # No scores for this Miner yet
-            score = new_scores['total_score'] / new_scores['new_predictions']
-            insert_query = """
-                INSERT INTO daily_scores (miner_hotkey, date, score, total_predictions) 
-                VALUES (?, ?, ?, ?)
-            """
-            insert_values = (miner_hotkey, today, score, new_scores['new_predictions'])
-
-            with self.database_manager.lock:
-                self.database_manager.query_and_commit_with_values(insert_query, insert_values)
-            bt.logging.info(f"| {current_thread} | ⭐ Added daily score. Score: {score}, Total Scored: {new_scores['new_predictions']}")
-
-    def _update_miner_score(self, miner_score: Dict[str, float], new_scores: Dict[str, float], miner_hotkey: str) -> None:
+        for miner_hotkey in [x for x, new_scores in new_scores_by_miner.items() if new_scores['new_predictions'] == 0]:
+            bt.logging.info(f"| {current_thread} | 📰 Miner '{miner_hotkey}' had only invalid scores, likely due to invalid date formatting.")
+            del new_scores_by_miner[miner_hotkey]
+
+        if len(new_scores_by_miner) == 0:
+            if in_transaction is not None:
+                self.database_manager.run_in_transaction(in_transaction)
+            return scores
+
+        current_utc_datetime = datetime.now(timezone.utc)
+        today = current_utc_datetime.date().isoformat()
+        now = current_utc_datetime.strftime(ISO8601)
+
+        def update_scores(cursor) -> None:
+            self._add_to_daily_scores(cursor, new_scores_by_miner, today)
+            self._update_miner_scores(cursor, new_scores_by_miner, now)
+            if self.score_window is not None:  # Days that have left the score window are no longer needed
+                cursor.execute("DELETE FROM daily_scores WHERE date < ?", (self.score_window.get_first_date(to_epoch_day(current_utc_datetime)),))
+            if in_transaction is not None:
+                in_transaction(cursor)
+
+        self.database_manager.run_in_transaction(update_scores)
+        if self.score_window is not None:
+            self.score_window.add_scores(new_scores_by_miner, to_epoch_day(current_utc_datetime))
+        bt.logging.info(f"| {current_thread} | 🎯 Scored {len(scorable_predictions)} predictions for {len(new_scores_by_miner)} miners")
+        return scores
+
+    def _add_to_daily_scores(self, cursor, new_scores_by_miner: Dict[str, Dict[str, float]], today: str) -> None:
         """
-        Update scores for a miner
+        Add new scores to daily_scores table. Running sums are updated in place, the average is derived from them.
         Args:
-            miner_score: Miner's existing score data
-            new_scores: Miner's new score data
-            miner_hotkey: Miner's hotkey
+            cursor: a database cursor, inside the scoring transaction
+            new_scores_by_miner: dict of miner hotkey to new scores
+            today: today's date
 
         Returns:
             None
         """
-        now = datetime.now(timezone.utc).strftime(ISO8601)
-        old_score = miner_score['lifetime_score']
-        old_predictions = miner_score['total_predictions']
-        new_total_score = (old_score * old_predictions) + new_scores['total_score']
-        new_total_predictions = old_predictions + new_scores['new_predictions']
-        new_lifetime_score = new_total_score / new_total_predictions
-
-        values = (new_lifetime_score, new_total_predictions, now)
-        with self.database_manager.lock:
-            self.database_manager.query_and_commit_with_values(f'''
-                UPDATE miner_scores 
-                SET lifetime_score = ?, total_predictions = ?, last_update_timestamp = ?
-                WHERE miner_hotkey = '{miner_hotkey}'
-            ''', values)
-
-    def _handle_new_miner_score(self, miner_hotkey: str, new_scores: dict) -> None:
-        """
-        Add scores for a miner without any scores yet
-        Args:
-            miner_hotkey: Hotkey of the miner
-            new_scores: Miner's new score data
+        current_thread = threading.current_thread().name
+        bt.logging.info(f"| {current_thread} | 📅 Updating daily_scores for {today}")
 
-        Returns:
-            None
-        """
-        now = datetime.now(timezone.utc).strftime(ISO8601)
-        lifetime_score = new_scores['total_score'] / new_scores['new_predictions']
-        query_str = f"""
-                        INSERT INTO miner_scores (miner_hotkey, lifetime_score, total_predictions, last_update_timestamp)
-                        VALUES (?, ?, ?, ?)
-                    """
-        values = (miner_hotkey, lifetime_score, new_scores['new_predictions'], now)
-        with self.database_manager.lock:
-            self.database_manager.query_and_commit_with_values(query_str, values)
-
-    def _fetch_current_miner_score(self, miner_hotkey: str) -> Dict[str, float] or None:
+        values = [
+            (miner_hotkey, today, new_scores['total_score'] / new_scores['new_predictions'], new_scores['new_predictions'], new_scores['total_score'])
+            for miner_hotkey, new_scores in new_scores_by_miner.items()
+        ]
+        cursor.executemany("""
+            INSERT INTO daily_scores (miner_hotkey, date, score, total_predictions, sum_score)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (miner_hotkey, date) DO UPDATE SET
+                sum_score = sum_score + excluded.sum_score,
+                total_predictions = total_predictions + excluded.total_predictions,
+                score = (sum_score + excluded.sum_score) / (total_predictions + excluded.total_predictions)
+        """, values)
+        bt.logging.info(f"| {current_thread} | ⭐ Updated daily scores for {len(values)} miners")
+
+    def _update_miner_scores(self, cursor, new_scores_by_miner: Dict[str, Dict[str, float]], now: str) -> None:
         """
-        Retrieve scores for a miner
+        Fold new scores into each miner's lifetime score, adding miners without any scores yet. Running sums are updated
+        in place, the lifetime score is derived from them.
         Args:
-            miner_hotkey: Hotkey of the miner
+            cursor: a database cursor, inside the scoring transaction
+            new_scores_by_miner: dict of miner hotkey to new scores
+            now: the update timestamp
 
         Returns:
-            Miners scores or None
-        """
-        current_thread = threading.current_thread().name
-        query_str = f"""
-            SELECT miner_hotkey, lifetime_score, total_predictions
-            FROM miner_scores
-            WHERE miner_hotkey = '{miner_hotkey}'
-            LIMIT 1
+            None
         """
-        with self.database_manager.lock:
-            results = self.database_manager.query(query_str)
-        if len(results) > 0:  # Update existing Miner score
-            bt.logging.debug(f"| {current_thread} | 🦉 Found existing scores for miner with hotkey '{miner_hotkey}'")
-            result = results[0]
-            return {'lifetime_score': result[1], 'total_predictions': result[2]}
-        else:  # No scores for this Miner yet
-            bt.logging.debug(f"| {current_thread} | 🐦‍⬛ Found no existing scores for miner with hotkey '{miner_hotkey}'")
-            return None
+        values = [
+            (miner_hotkey, new_scores['total_score'] / new_scores['new_predictions'], new_scores['new_predictions'], now, new_scores['total_score'])
+            for miner_hotkey, new_scores in new_scores_by_miner.items()
+        ]
+        cursor.executemany("""
+            INSERT INTO miner_scores (miner_hotkey, lifetime_score, total_predictions, last_update_timestamp, sum_score)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (miner_hotkey) DO UPDATE SET
+                sum_score = sum_score + excluded.sum_score,
+                total_predictions = total_predictions + excluded.total_predictions,
+                lifetime_score = (sum_score + excluded.sum_score) / (total_predictions + excluded.total_predictions),
+                last_update_timestamp = excluded.last_update_timestamp
+        """, values)
 
     def _get_num_sold_homes(self) -> int:
 
@@ -165,41 +116,106 @@ class ScoringCalculator:
         bt.logging.info(f"| {current_thread} | 🥳 Received {num_sold_homes} sold homes")
         return num_sold_homes
 
-    def _calculate_new_scores(self, scorable_predictions: List[Tuple]) -> Dict[str, float]:
-        new_scores = {'total_score': 0, 'new_predictions': 0}
+    def _score_predictions(self, scorable_predictions: List[Tuple]) -> np.ndarray:
+        """
+        Unpack scorable predictions into columns and score them all at once
+        Args:
+            scorable_predictions: list of (miner_hotkey, predicted_price, predicted_date, actual_price, actual_date)
 
-        for prediction in scorable_predictions:
-            miner_hotkey, predicted_price, predicted_date, actual_price, actual_date = prediction
-            score = self.calculate_score(actual_price, predicted_price, actual_date, predicted_date, miner_hotkey)
+        Returns:
+            The score of each prediction, NaN if it couldn't be scored
+        """
+        if len(scorable_predictions) == 0:
+            return np.empty(0)
+        miner_hotkeys, predicted_prices, predicted_dates, actual_prices, actual_dates = zip(*scorable_predictions)
+        scores = self.calculate_scores(actual_prices, predicted_prices, actual_dates, predicted_dates)
 
-            if score is not None:
-                new_scores['total_score'] += score
-                new_scores['new_predictions'] += 1
+        current_thread = threading.current_thread().name
+        for miner_hotkey in set(np.asarray(miner_hotkeys, dtype=object)[np.isnan(scores)]):
+            bt.logging.trace(f"| {current_thread} | Received invalid date format from '{miner_hotkey}'. Ignoring prediction.")
+        return scores
 
-        return new_scores
+    def _calculate_new_scores(self, scorable_predictions: List[Tuple], scores: np.ndarray) -> Dict[str, Dict[str, float]]:
+        """
+        Sum up valid scores per miner
+        Args:
+            scorable_predictions: list of (miner_hotkey, predicted_price, predicted_date, actual_price, actual_date)
+            scores: the score of each prediction
 
-    def calculate_score(self, actual_price: str, predicted_price: str, actual_date: str, predicted_date: str, miner_hotkey: str):
-        # Convert date strings to datetime objects
-        actual_date = datetime.strptime(actual_date, ISO8601).date()
-        current_thread = threading.current_thread().name
+        Returns:
+            Dictionary of miner hotkey to total score and number of valid scores
+        """
+        if len(scorable_predictions) == 0:
+            return {}
+        miner_hotkeys = [x[0] for x in scorable_predictions]
+        unique_hotkeys, miner_indices = np.unique(np.asarray(miner_hotkeys, dtype=str), return_inverse=True)
+        is_valid = ~np.isnan(scores)
+        total_scores = np.bincount(miner_indices, weights=np.where(is_valid, scores, 0.0), minlength=len(unique_hotkeys))
+        new_predictions = np.bincount(miner_indices, weights=is_valid, minlength=len(unique_hotkeys))
+        return {
+            str(miner_hotkey): {'total_score': float(total_score), 'new_predictions': int(count)}
+            for miner_hotkey, total_score, count in zip(unique_hotkeys, total_scores, new_predictions)
+        }
+
+    def calculate_scores(self, actual_prices: Sequence, predicted_prices: Sequence, actual_dates: Sequence[str], predicted_dates: Sequence[str]) -> np.ndarray:
+        """
+        Score many predictions at once
+        Args:
+            actual_prices: sale prices
+            predicted_prices: predicted sale prices
+            actual_dates: sale dates, ISO8601
+            predicted_dates: predicted sale dates, YYYY-MM-DD
 
-        try:
-            predicted_date = datetime.strptime(predicted_date, "%Y-%m-%d").date()
-        except ValueError:
-            bt.logging.trace(f"| {current_thread} | Received invalid date format from '{miner_hotkey}'. Ignoring prediction.")
-            return None
+        Returns:
+            The score of each prediction, NaN where the predicted date is invalid
+        """
+        actual_prices = np.asarray(actual_prices, dtype=float)
+        predicted_prices = np.asarray(predicted_prices, dtype=float)
+        actual_dates = np.asarray(actual_dates, dtype='U10').astype('datetime64[D]')  # Keep the YYYY-MM-DD part of the timestamp
+        predicted_dates, is_valid_date = self._parse_predicted_dates(predicted_dates)
 
         # Calculate the absolute difference in days
-        date_difference = abs((actual_date - predicted_date).days)
+        date_difference = np.abs((actual_dates - predicted_dates).astype('timedelta64[D]').astype(float))
 
         # Score based on date accuracy (14 points max, 1 point deducted per day off)
-        date_score = (max(0, 14 - date_difference) / 14) * 100
+        date_score = (np.maximum(0, 14 - date_difference) / 14) * 100
 
         # Calculate price accuracy
-        price_difference = abs(float(actual_price) - float(predicted_price)) / float(actual_price)
-        price_score = max(0, 100 - (price_difference * 100))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            price_difference = np.abs(actual_prices - predicted_prices) / actual_prices
+        price_score = np.maximum(0, 100 - (price_difference * 100))
 
         # Combine scores (86% weight to price, 14% weight to date)
-        final_score = (price_score * 0.86) + (date_score * 0.14)
+        final_scores = (price_score * 0.86) + (date_score * 0.14)
 
-        return final_score
+        return np.where(is_valid_date, final_scores, np.nan)
+
+    def _parse_predicted_dates(self, predicted_dates: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Parse predicted dates, which should be formatted as YYYY-MM-DD
+        Args:
+            predicted_dates: predicted sale dates
+
+        Returns:
+            Array of parsed dates (NaT where invalid), mask of valid dates
+        """
+        raw_dates = np.asarray(predicted_dates, dtype=object)
+        try:
+            # Fast path, every date is a well-formed YYYY-MM-DD string
+            as_strings = raw_dates.astype(str)
+            if np.all(np.char.str_len(as_strings) == 10):
+                parsed = as_strings.astype('datetime64[D]')
+                is_valid = ~np.isnat(parsed)
+                if np.all(is_valid):
+                    return parsed, is_valid
+        except ValueError:
+            pass
+
+        # Slow path, parse one at a time so invalid dates are dropped individually
+        parsed = np.full(len(raw_dates), np.datetime64('NaT'), dtype='datetime64[D]')
+        for idx, predicted_date in enumerate(raw_dates):
+            try:
+                parsed[idx] = np.datetime64(datetime.strptime(predicted_date, "%Y-%m-%d").date(), 'D')
+            except (TypeError, ValueError):
+                continue
+        return parsed, ~np.isnat(parsed)
@@ -1,21 +1,51 @@
+import time
 import torch
 import bittensor as bt
 import traceback
 import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime, timezone, timedelta
+from typing import Callable
 
-from nextplace.validator.utils.contants import build_miner_predictions_table_name
-from nextplace.validator.utils.system import timeout_with_multiprocess
+from nextplace.validator.data_containers.metagraph_snapshot import MetagraphSnapshot
+from nextplace.validator.data_containers.weight_setting_metrics import WeightSettingMetrics
+from nextplace.validator.metagraph.metagraph_cache import MetagraphCache
+from nextplace.validator.scoring.score_window import ScoreWindow
+from nextplace.validator.utils.contants import ISO8601, MARKET_COVERAGE_WINDOW_DAYS, to_epoch_day
+
+# (fraction of the average market coverage, factor) for miners predicting on fewer markets than that in the last 5 days
+MARKET_COVERAGE_TIERS = [(0.5, 0.5), (0.75, 0.6), (0.9, 0.75)]
+STALE_MINER_FACTOR = 0.5  # For miners who haven't predicted in 5 days
+# (scored predictions, factor) for new miners with fewer scored predictions than that
+PREDICTION_VOLUME_TIERS = [(5, 0.7), (10, 0.725), (15, 0.75), (20, 0.8), (25, 0.85)]
+
+SET_WEIGHTS_TIMEOUT_SECONDS = 180  # Stop waiting on the chain extrinsic after this long
+WEIGHTS_THREAD_NAME_PREFIX = "⚖️ WeightsThread"
 
 
 class WeightSetter:
-    def __init__(self, metagraph, wallet, subtensor, config, database_manager):
-        self.metagraph = metagraph
+    def __init__(self, metagraph_cache: MetagraphCache, wallet, subtensor_factory: Callable, config, database_manager, score_window: ScoreWindow):
+        self.metagraph_cache = metagraph_cache
         self.wallet = wallet
-        self.subtensor = subtensor
+        self.subtensor_factory = subtensor_factory  # Opens a subtensor connection for the extrinsic thread's own use
+        self.subtensor = None  # Connected on first use, never shared with the main thread
         self.config = config
         self.database_manager = database_manager
+        self.score_window = score_window
         self.timer = datetime.now(timezone.utc)
+        # A single thread runs the chain extrinsic, so a hung call can't pile up concurrent ones
+        self.extrinsic_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=WEIGHTS_THREAD_NAME_PREFIX)
+        self.metrics_lock = threading.Lock()
+        self.metrics: WeightSettingMetrics = {
+            'attempts': 0,
+            'successes': 0,
+            'failures': 0,
+            'timeouts': 0,
+            'last_compute_duration': None,
+            'last_extrinsic_duration': None,
+            'max_extrinsic_duration': None,
+            'last_success': None,
+        }
 
     def is_time_to_set_weights(self) -> bool:
         """
@@ -37,102 +67,93 @@ class WeightSetter:
         self.timer = datetime.now(timezone.utc)  # Reset the timer
         self.set_weights()  # Set weights
 
-    def calculate_miner_scores(self):
+    def calculate_miner_scores(self, metagraph: MetagraphSnapshot):
         current_thread = threading.current_thread().name
-        try:  # database_manager lock is already acquire at this point
-            results = self.database_manager.query("SELECT miner_hotkey, lifetime_score, last_update_timestamp, total_predictions FROM miner_scores")
-            average_markets = self.get_average_markets_in_range()
-
-            scores = torch.zeros(len(self.metagraph.hotkeys))
-            hotkey_to_uid = {hk: uid for uid, hk in enumerate(self.metagraph.hotkeys)}
-            now = datetime.now(timezone.utc)
-
-            for miner_hotkey, lifetime_score, last_update_timestamp, total_predictions in results:
-                if miner_hotkey in hotkey_to_uid:
-                    last_update_dt = datetime.strptime(last_update_timestamp, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
-                    time_diff = now - last_update_dt  # Calculate difference between now and last update
-
-                    # Score Scaling
-                    # -------------
-                    # We do this so people don't get a few lucky predictions, then turn off their miner
-                    # If a miner hasn't predicted in 5 days or has less than 5 predictions, we scale their score back
-
-                    table_name = build_miner_predictions_table_name(miner_hotkey)
-                    # Handle the case where they're only targeting specific markets
-                    market_query = f"SELECT COUNT(DISTINCT(market)) FROM {table_name} WHERE prediction_timestamp >= datetime('now', '-5 days')"
-                    distinct_markets = self.database_manager.query(market_query)
-                    if len(distinct_markets) > 0:
-                        distinct_markets = distinct_markets[0][0]
-                        if distinct_markets < int(average_markets * 0.5):
-                            bt.logging.trace(f"| {current_thread} | 🚩 Miner '{miner_hotkey}' has less than 50% markets predicted on in the last 5 days. Scaling their score.")
-                            lifetime_score = lifetime_score * 0.5
-                        elif distinct_markets < int(average_markets * 0.75):
-                            bt.logging.trace(f"| {current_thread} | 🚩 Miner '{miner_hotkey}' has less than 75% markets predicted on in the last 5 days. Scaling their score.")
-                            lifetime_score = lifetime_score * 0.6
-                        elif distinct_markets < int(average_markets * 0.9):
-                            bt.logging.trace(f"| {current_thread} | 🚩 Miner '{miner_hotkey}' has less than 90% markets predicted on in the last 5 days. Scaling their score.")
-                            lifetime_score = lifetime_score * 0.75
-
-                    # If last update was over 5 days ago, scale their score back by 50%
-                    if time_diff > timedelta(days=5):
-                        bt.logging.trace(f"| {current_thread} | 🚩 Miner '{miner_hotkey}' has not predicted in 5 days. Scaling their score.")
-                        lifetime_score = lifetime_score * 0.5
-
-                    '''
-                    Handle low scored prediction volume, only applies to miners who just registered.
-                    We don't want miners getting outsized rewards for a few lucky predictions.
-                    '''
-                    if total_predictions < 5:
-                        bt.logging.trace(f"| {current_thread} | 🚩 Miner '{miner_hotkey}' has less than 5 scored predictions. Scaling their score.")
-                        lifetime_score = lifetime_score * 0.7
-
-                    elif total_predictions < 10:
-                        bt.logging.trace(f"| {current_thread} | 🚩 Miner '{miner_hotkey}' has less than 10 scored predictions. Scaling their score.")
-                        lifetime_score = lifetime_score * 0.725
-
-                    elif total_predictions < 15:
-                        bt.logging.trace(f"| {current_thread} | 🚩 Miner '{miner_hotkey}' has less than 15 scored predictions. Scaling their score.")
-                        lifetime_score = lifetime_score * 0.75
-
-                    elif total_predictions < 20:
-                        bt.logging.trace(f"| {current_thread} | 🚩 Miner '{miner_hotkey}' has less than 20 scored predictions. Scaling their score.")
-                        lifetime_score = lifetime_score * 0.8
-
-                    elif total_predictions < 25:
-                        bt.logging.trace(f"| {current_thread} | 🚩 Miner '{miner_hotkey}' has less than 25 scored predictions. Scaling their score.")
-                        lifetime_score = lifetime_score * 0.85
-
-                    uid = hotkey_to_uid[miner_hotkey]
-                    scores[uid] = lifetime_score
-
+        try:
+            rows = self.get_miner_score_inputs()
+            hotkey_to_uid = {hk: uid for uid, hk in enumerate(metagraph.hotkeys)}
+            rows = [row for row in rows if row[0] in hotkey_to_uid]
+            scores = torch.zeros(len(metagraph.hotkeys))
+            if len(rows) == 0:
+                return scores
+
+            average_markets = rows[0][4]
+            if average_markets is None:
+                bt.logging.debug(f"| {current_thread} | ❗ ERROR Found no predictions!")
+                return scores
+            bt.logging.trace(f"| {current_thread} | 🛒 Found {average_markets} as the average number of markets predicted on in the last 5 days")
+
+            window_averages = self.score_window.get_averages()  # Incentive is based on the last 30 days of performance
+            uids = torch.tensor([hotkey_to_uid[row[0]] for row in rows], dtype=torch.long)
+            window_scores = torch.tensor([window_averages.get(row[0], 0.0) for row in rows], dtype=torch.float32)
+            is_stale = torch.tensor([bool(row[1]) for row in rows], dtype=torch.bool)
+            total_predictions = torch.tensor([row[2] for row in rows], dtype=torch.float32)
+            distinct_markets = torch.tensor([row[3] for row in rows], dtype=torch.float32)
+
+            # Score Scaling
+            # -------------
+            # We do this so people don't get a few lucky predictions, then turn off their miner
+            # If a miner hasn't predicted in 5 days or has less than 5 predictions, we scale their score back
+
+            # Handle the case where they're only targeting specific markets
+            market_cutoffs = [(int(average_markets * coverage), factor) for coverage, factor in MARKET_COVERAGE_TIERS]
+            market_factor = self.tiered_factor(distinct_markets, market_cutoffs)
+
+            # If last update was over 5 days ago, scale their score back by 50%
+            stale_factor = torch.where(is_stale, torch.tensor(STALE_MINER_FACTOR), torch.tensor(1.0))
+
+            # Handle low scored prediction volume, only applies to miners who just registered.
+            # We don't want miners getting outsized rewards for a few lucky predictions.
+            volume_factor = self.tiered_factor(total_predictions, PREDICTION_VOLUME_TIERS)
+
+            scores[uids] = window_scores * market_factor * stale_factor * volume_factor
+            bt.logging.trace(f"| {current_thread} | 🚩 Scaled {int((market_factor < 1).sum())} miners for market coverage, "
+                             f"{int(is_stale.sum())} for not predicting in 5 days, {int((volume_factor < 1).sum())} for few scored predictions")
             return scores
 
         except Exception as e:
             bt.logging.error(f" | {current_thread} |❗Error fetching miner scores: {str(e)}")
-            return torch.zeros(len(self.metagraph.hotkeys))
+            return torch.zeros(len(metagraph.hotkeys))
 
-    def get_average_markets_in_range(self):
-        current_thread = threading.current_thread().name
-        bt.logging.trace(f"| {current_thread} | 🧮 Calculating market cutoff...")
-        all_table_query = "SELECT name FROM sqlite_master WHERE type='table'"
-        all_tables = [x[0] for x in self.database_manager.query(all_table_query)]  # Get all tables in database
-        predictions_tables = [s for s in all_tables if s.startswith("predictions_")]
-        total = 0
-        count = 0
-        for predictions_table in predictions_tables:
-            market_query = f"SELECT COUNT(DISTINCT(market)) FROM {predictions_table} WHERE prediction_timestamp >= datetime('now', '-5 days')"
-            with self.database_manager.lock:
-                results = self.database_manager.query(market_query)
-                if len(results) > 0:
-                    value = results[0][0]
-                    if value > 0:
-                        total += results[0][0]
-                        count += 1
-        if count == 0:
-            bt.logging.debug(f"| {current_thread} | ❗ ERROR Found no predictions tables!")
-        average = total / count
-        bt.logging.trace(f"| {current_thread} | 🛒 Found {average} as the average number of markets predicted on in the last 5 days")
-        return average
+    def get_miner_score_inputs(self) -> list[tuple]:
+        """
+        Fetch everything needed to scale the miners' scores in one query: staleness, lifetime prediction counts, and the distinct markets
+        each miner predicted on in the last 5 days alongside the average across all miners who predicted. Coverage is
+        read from the `market_coverage` summary, maintained at ingest time, rather than the raw predictions
+        Returns:
+            List of (miner_hotkey, is_stale, total_predictions, distinct_markets, average_markets)
+        """
+        now = datetime.now(timezone.utc)
+        cutoff = (now - timedelta(days=MARKET_COVERAGE_WINDOW_DAYS)).strftime(ISO8601)
+        first_day = to_epoch_day(now) - MARKET_COVERAGE_WINDOW_DAYS + 1  # Today is the last of the window's days
+        query = """
+            WITH coverage AS (
+                SELECT miner_hotkey, COUNT(DISTINCT(market)) AS distinct_markets
+                FROM market_coverage
+                WHERE day >= ?
+                GROUP BY miner_hotkey
+            )
+            SELECT scores.miner_hotkey, scores.last_update_timestamp < ?, scores.total_predictions,
+                   COALESCE(coverage.distinct_markets, 0), (SELECT AVG(distinct_markets) FROM coverage)
+            FROM miner_scores scores
+            LEFT JOIN coverage ON coverage.miner_hotkey = scores.miner_hotkey
+        """
+        return self.database_manager.query_with_values(query, (first_day, cutoff))
+
+    def tiered_factor(self, values: torch.Tensor, tiers: list[tuple[float, float]]) -> torch.Tensor:
+        """
+        Map each value to the scaling factor of the strictest tier it falls below
+        Args:
+            values: per-miner values
+            tiers: (cutoff, factor) pairs, in ascending order of cutoff
+
+        Returns:
+            Per-miner factors, 1.0 for values that aren't below any cutoff
+        """
+        factors = torch.ones_like(values, dtype=torch.float32)
+        for cutoff, factor in reversed(tiers):  # The lowest cutoff is applied last, so it wins
+            factors = torch.where(values < cutoff, torch.tensor(factor), factors)
+        return factors
 
     def calculate_weights(self, scores):
         n_miners = len(scores)
@@ -166,41 +187,117 @@ class WeightSetter:
         else:
             return torch.full_like(tier_scores, total_weight / len(tier_scores))
 
-    @timeout_with_multiprocess(seconds=180)
-    def set_weights(self):
+    def set_weights(self) -> bool:
+        """
+        Calculate weights in-process, then set them on chain. Only the extrinsic runs under a deadline, on a worker
+        thread with its own subtensor connection, so a hung chain call can't block the validator.
+        Returns:
+            True if the weights were set
+        """
         current_thread = threading.current_thread()
-        # Sync the metagraph to get the latest data
-        self.metagraph.sync(subtensor=self.subtensor, lite=True)
+        compute_start = time.monotonic()
+        # The scheduler keeps the cached metagraph fresh, no need to sync it again here
+        metagraph = self.metagraph_cache.snapshot()
 
-        scores = self.calculate_miner_scores()
+        scores = self.calculate_miner_scores(metagraph)
         weights = self.calculate_weights(scores)
+        compute_duration = time.monotonic() - compute_start
 
-        bt.logging.info(f"| {current_thread.name} | ⚖️ Calculated weights: {weights}")
+        bt.logging.info(f"| {current_thread.name} | ⚖️ Calculated weights in {compute_duration:.2f}s: {weights}")
 
         try:
-            uid = self.metagraph.hotkeys.index(self.wallet.hotkey.ss58_address)
-            stake = float(self.metagraph.S[uid])
+            uid = metagraph.hotkeys.index(self.wallet.hotkey.ss58_address)
+            stake = float(metagraph.S[uid])
 
             if stake < 1000.0:
                 bt.logging.error(f"| {current_thread.name} | Insufficient stake. Failed in setting weights.")
                 return False
 
-            result = self.subtensor.set_weights(
+            if self.subtensor is None:
+                self.subtensor = self.subtensor_factory()
+            extrinsic_start = time.monotonic()
+            pending_extrinsic = self.extrinsic_executor.submit(
+                self.subtensor.set_weights,
                 netuid=self.config.netuid,
                 wallet=self.wallet,
-                uids=self.metagraph.uids,
+                uids=list(metagraph.uids),
                 weights=weights,
                 wait_for_inclusion=True,
                 wait_for_finalization=False,
             )
+            try:
+                result = pending_extrinsic.result(timeout=SET_WEIGHTS_TIMEOUT_SECONDS)
+            except FutureTimeoutError:
+                bt.logging.warning(f"| {current_thread.name} | ❗Setting weights timed out after {SET_WEIGHTS_TIMEOUT_SECONDS} seconds. Reconnecting.")
+                self._record_metrics(compute_duration, time.monotonic() - extrinsic_start, success=False, timed_out=True)
+                self._reset_extrinsic_thread()
+                return False
+            extrinsic_duration = time.monotonic() - extrinsic_start
 
             success = result[0] if isinstance(result, tuple) and len(result) >= 1 else False
+            self._record_metrics(compute_duration, extrinsic_duration, success=success, timed_out=False)
 
             if success:
-                bt.logging.info(f"| {current_thread.name} | ✅ Successfully set weights.")
+                bt.logging.info(f"| {current_thread.name} | ✅ Successfully set weights in {extrinsic_duration:.2f}s.")
             else:
                 bt.logging.error(f"| {current_thread.name} | ❗Failed to set weights. Result: {result}")
+            return success
 
         except Exception as e:
             bt.logging.error(f"| {current_thread.name} | ❗Error setting weights: {str(e)}")
             bt.logging.error(traceback.format_exc())
+            self._record_metrics(compute_duration, None, success=False, timed_out=False)
+            return False
+
+    def _reset_extrinsic_thread(self) -> None:
+        """
+        Abandon a hung extrinsic. The worker thread and its connection are replaced, so the next call starts fresh
+        instead of queueing behind the hung one.
+        Returns:
+            None
+        """
+        current_thread = threading.current_thread().name
+        hung_executor, hung_subtensor = self.extrinsic_executor, self.subtensor
+        self.extrinsic_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=WEIGHTS_THREAD_NAME_PREFIX)
+        self.subtensor = None
+        hung_executor.shutdown(wait=False, cancel_futures=True)
+        try:
+            hung_subtensor.close()  # Closing the websocket usually unblocks the hung call, so its thread can exit
+        except Exception as e:
+            bt.logging.trace(f"| {current_thread} | ❗Failed to close the hung subtensor connection: {e}")
+
+    def get_metrics(self) -> WeightSettingMetrics:
+        """
+        Get timing metrics for setting weights
+        Returns:
+            A copy of the metrics
+        """
+        with self.metrics_lock:
+            return dict(self.metrics)
+
+    def _record_metrics(self, compute_duration: float, extrinsic_duration: float or None, success: bool, timed_out: bool) -> None:
+        """
+        Record the outcome of a set weights attempt
+        Args:
+            compute_duration: seconds spent calculating weights
+            extrinsic_duration: seconds spent waiting on the chain, or None if we never got that far
+            success: whether the weights were set
+            timed_out: whether the extrinsic hit the deadline
+
+        Returns:
+            None
+        """
+        with self.metrics_lock:
+            metrics = self.metrics
+            metrics['attempts'] += 1
+            metrics['successes'] += 1 if success else 0
+            metrics['failures'] += 0 if success else 1
+            metrics['timeouts'] += 1 if timed_out else 0
+            metrics['last_compute_duration'] = compute_duration
+            metrics['last_extrinsic_duration'] = extrinsic_duration
+            if extrinsic_duration is not None:
+                metrics['max_extrinsic_duration'] = max(metrics['max_extrinsic_duration'] or 0.0, extrinsic_duration)
+            if success:
+                metrics['last_success'] = datetime.now(timezone.utc)
+            current_thread = threading.current_thread().name
+            bt.logging.trace(f"| {current_thread} | ⏱️ Set weights: {metrics['successes']} of {metrics['attempts']} attempts succeeded, {metrics['timeouts']} timed out")
@@ -1,6 +1,7 @@
 import threading
 
 import bittensor as bt
+import numpy as np
 from nextplace.protocol import RealEstateSynapse, RealEstatePrediction, RealEstatePredictions
 from nextplace.validator.database.database_manager import DatabaseManager
 from nextplace.validator.utils.contants import NUMBER_OF_PROPERTIES_PER_SYNAPSE
@@ -9,94 +10,82 @@ from nextplace.validator.utils.contants import NUMBER_OF_PROPERTIES_PER_SYNAPSE
 Helper class manages creating Synapse objects
 """
 
+# Columns of the `properties` table, named exactly like the RealEstatePrediction fields they populate
+PROPERTY_COLUMNS = [
+    'nextplace_id', 'property_id', 'listing_id', 'address', 'city', 'state', 'zip_code', 'price', 'beds', 'baths',
+    'sqft', 'lot_size', 'year_built', 'days_on_market', 'latitude', 'longitude', 'property_type', 'last_sale_date',
+    'hoa_dues', 'query_date', 'market'
+]
+
+MIN_PROPERTIES_PER_SYNAPSE = 10
+TARGET_RESPONSE_SECONDS = 15  # Shrink batches when miners take longer than this to respond, grow them when faster
+RESPONSE_TIME_PERCENTILE = 75  # Per-miner latency the target applies to, so a few slow miners don't shrink every batch
+BATCH_SIZE_INCREMENT = 10  # Grow slowly...
+BATCH_SIZE_DECREASE_FACTOR = 0.75  # ...and back off quickly
+
 
 class SynapseManager:
 
     def __init__(self, database_manager: DatabaseManager):
         self.database_manager = database_manager
+        self.batch_size = NUMBER_OF_PROPERTIES_PER_SYNAPSE
+        self.lock = threading.Lock()
 
     def get_synapse(self) -> RealEstateSynapse or None:
         """
-        Get a property from the `properties` table, format the synapse
+        Claim the next batch of properties from the `properties` table, format the synapse. Claimed properties are
+        removed in the same statement, so concurrent callers always get disjoint batches.
         Returns:
             A RealEstateSynapse to send to Miners, or None
         """
-
         current_thread = threading.current_thread().name
-        try:
-            # Query to get the next round of properties
-            retrieve_query = f'''
-                SELECT * FROM properties
-                LIMIT {NUMBER_OF_PROPERTIES_PER_SYNAPSE}
-            '''
-            property_data = self.database_manager.query(retrieve_query)  # Execute query
-
-            if len(property_data) == 0:
-                return None
+        property_data = self._claim_properties(self.batch_size)
 
-            nextplace_id_index = 0
-            row_ids = [row[nextplace_id_index] for row in property_data]  # Extract unique ID's
-            formatted_ids = ','.join(f"'{str(nextplace_id)}'" for nextplace_id in row_ids)
-            delete_query = f'''
-                    DELETE FROM properties
-                    WHERE nextplace_id IN ({formatted_ids})
-                '''
-            self.database_manager.query_and_commit(delete_query)  # Remove the retrieved rows from the database
-
-            outgoing_data = []
+        if len(property_data) == 0:
+            bt.logging.info(f"| {current_thread} | ❗No property data available")
+            return None
 
-            for property_datum in property_data:  # Iterate db responses
-                if property_datum:
-                    try:
-                        next_property = self._property_from_database_row(property_datum)
-                        outgoing_data.append(next_property)
-                    except IndexError as ie:
-                        bt.logging.error(f"| {current_thread} | ❗IndexError: {ie} - The data from the database failed to convert to a Synapse")
-                        return None
-                else:
-                    bt.logging.warning(f"| {current_thread} | ❗No property data found in the database")
-                    return None
+        outgoing_data = [RealEstatePrediction(**property_datum) for property_datum in property_data]
+        real_estate_predictions = RealEstatePredictions(predictions=outgoing_data)
+        synapse = RealEstateSynapse.create(real_estate_predictions=real_estate_predictions)
+        market = property_data[0]['market']
+        bt.logging.trace(f"| {current_thread} | ✉️ Created Synapse with {len(outgoing_data)} properties in {market}")
+        return synapse
 
-            real_estate_predictions = RealEstatePredictions(predictions=outgoing_data)
-            synapse = RealEstateSynapse.create(real_estate_predictions=real_estate_predictions)
-            market_index = 20
-            market = property_data[0][market_index]
-            bt.logging.trace(f"| {current_thread} | ✉️ Created Synapse with {len(outgoing_data)} properties in {market}")
-            return synapse
+    def record_response_times(self, latencies: list[float]) -> None:
+        """
+        Adapt the batch size to how long miners took to answer the last synapse
+        Args:
+            latencies: each miner's processing time for the last synapse, in seconds. Live miners that failed to answer
+                count as the full dendrite timeout
 
-        except IndexError:
-            bt.logging.info(f"| {current_thread} | ❗No property data available")
-            return None
+        Returns:
+            None
+        """
+        if len(latencies) == 0:  # Nothing to learn from
+            return
+        seconds = float(np.percentile(latencies, RESPONSE_TIME_PERCENTILE))
+        with self.lock:
+            if seconds > TARGET_RESPONSE_SECONDS:
+                batch_size = int(self.batch_size * BATCH_SIZE_DECREASE_FACTOR)
+            else:
+                batch_size = self.batch_size + BATCH_SIZE_INCREMENT
+            self.batch_size = max(MIN_PROPERTIES_PER_SYNAPSE, min(NUMBER_OF_PROPERTIES_PER_SYNAPSE, batch_size))
 
-    def _property_from_database_row(self, property_data: any) -> RealEstatePrediction:
+    def _claim_properties(self, batch_size: int) -> list[dict]:
         """
-        Convert API response to a RealEstatePrediction object
+        Atomically remove the oldest `batch_size` properties from the `properties` table and return them
         Args:
-            property_data: API response
+            batch_size: maximum number of properties to claim
 
         Returns:
-            RealEstatePrediction object
+            List of properties, keyed by column name
         """
-        return RealEstatePrediction(
-            nextplace_id=property_data[0],
-            property_id=property_data[1],
-            listing_id=property_data[2],
-            address=property_data[3],
-            city=property_data[4],
-            state=property_data[5],
-            zip_code=property_data[6],
-            price=property_data[7],
-            beds=property_data[8],
-            baths=property_data[9],
-            sqft=property_data[10],
-            lot_size=property_data[11],
-            year_built=property_data[12],
-            days_on_market=property_data[13],
-            latitude=property_data[14],
-            longitude=property_data[15],
-            property_type=property_data[16],
-            last_sale_date=property_data[17],
-            hoa_dues=property_data[18],
-            query_date=property_data[19],
-            market=property_data[20],
-        )
+        columns = ', '.join(PROPERTY_COLUMNS)
+        claim_query = f'''
+            DELETE FROM properties
+            WHERE rowid IN (SELECT rowid FROM properties ORDER BY rowid LIMIT ?)
+            RETURNING {columns}
+        '''
+        rows = self.database_manager.run_in_transaction(lambda cursor: cursor.execute(claim_query, (batch_size,)).fetchall())
+        return [dict(zip(PROPERTY_COLUMNS, row)) for row in rows]
@@ -1,6 +1,19 @@
+from datetime import date, datetime
 
 ISO8601 = "%Y-%m-%dT%H:%M:%SZ"
 NUMBER_OF_PROPERTIES_PER_SYNAPSE = 100
+MARKET_COVERAGE_WINDOW_DAYS = 5  # Miners are expected to have predicted on most markets within this many calendar days, today included
 
-def build_miner_predictions_table_name(miner_hotkey):
-    return f"predictions_{miner_hotkey}"
+EPOCH_DATE = date(1970, 1, 1)
+
+
+def to_epoch_day(value: datetime) -> int:
+    """
+    Convert a datetime to the number of days since 1970-01-01, for the indexed day columns
+    Args:
+        value: a UTC datetime
+
+    Returns:
+        Days since the epoch
+    """
+    return (value.date() - EPOCH_DATE).days
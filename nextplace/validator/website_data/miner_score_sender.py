@@ -1,5 +1,4 @@
 from datetime import timezone, datetime
-from sqlite3 import OperationalError
 
 from nextplace.validator.database.database_manager import DatabaseManager
 import threading
@@ -23,31 +22,29 @@ class MinerScoreSender:
         """
         current_thread = threading.current_thread().name
 
-        with self.database_manager.lock:
-            active_miners = self.database_manager.query(f"SELECT miner_hotkey FROM active_miners")
+        # Scores and outstanding prediction counts for every active miner, in one query
+        miner_data = self.database_manager.query("""
+            SELECT active_miners.miner_hotkey, miner_scores.lifetime_score, miner_scores.total_predictions,
+                   miner_scores.last_update_timestamp, COALESCE(prediction_counts.total, 0)
+            FROM active_miners
+            LEFT JOIN miner_scores ON miner_scores.miner_hotkey = active_miners.miner_hotkey
+            LEFT JOIN (
+                SELECT miner_hotkey, COUNT(*) AS total FROM predictions GROUP BY miner_hotkey
+            ) AS prediction_counts ON prediction_counts.miner_hotkey = active_miners.miner_hotkey
+        """)
 
         data_to_send = []
 
         now = datetime.now(timezone.utc).strftime(ISO8601)
-        for hotkey in active_miners:
-            hotkey = hotkey[0]
-            with self.database_manager.lock:
-                result = self.database_manager.query(f"SELECT lifetime_score, total_predictions, last_update_timestamp FROM miner_scores WHERE miner_hotkey='{hotkey}'")
-                score = result[0][0] if len(result) == 1 else 0
-                num_predictions = result[0][1] if len(result) == 1 else 0
-                last_update_timestamp = result[0][2] if len(result) == 1 else now
-                try:
-                    total_predictions = self.database_manager.get_size_of_table(f"predictions_{hotkey}")
-                except OperationalError:
-                    total_predictions = 0
-                data_to_send.append({
-                    "minerHotKey": hotkey,
-                    "minerColdKey": "N/A",
-                    "minerScore": score,
-                    "numPredictions": num_predictions,
-                    "scoreGenerationDate": last_update_timestamp,
-                    "totalPredictions": total_predictions,
-                })
+        for hotkey, score, num_predictions, last_update_timestamp, total_predictions in miner_data:
+            data_to_send.append({
+                "minerHotKey": hotkey,
+                "minerColdKey": "N/A",
+                "minerScore": score if score is not None else 0,
+                "numPredictions": num_predictions if num_predictions is not None else 0,
+                "scoreGenerationDate": last_update_timestamp if last_update_timestamp is not None else now,
+                "totalPredictions": total_predictions,
+            })
 
         bt.logging.info(f"| {current_thread} | ⛵ Sending {len(data_to_send)} miner scores to website")
         website_communicator = WebsiteCommunicator("/Miner/Scores")
@@ -228,6 +228,27 @@ def add_validator_args(cls, parser):
         default=4096,
     )
 
+    parser.add_argument(
+        "--neuron.prefetch_markets",
+        type=int,
+        help="The number of upcoming markets to keep prefetched in the properties table.",
+        default=2,
+    )
+
+    parser.add_argument(
+        "--neuron.properties_low_water_mark",
+        type=int,
+        help="Prefetch another market when fewer than this many properties are left to send to miners.",
+        default=500,
+    )
+
+    parser.add_argument(
+        "--neuron.metagraph_sync_blocks",
+        type=int,
+        help="Only re-sync the metagraph once the chain has advanced this many blocks since the last sync.",
+        default=25,
+    )
+
     parser.add_argument(
         "--wandb.project_name",
         type=str,
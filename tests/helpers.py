@@ -15,6 +15,9 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
+import os
+import tempfile
+import unittest
 from typing import Union
 from bittensor import (
     Balance,
@@ -32,6 +35,9 @@ from bittensor.mock.wallet_mock import get_mock_wallet as _get_mock_wallet
 from rich.console import Console
 from rich.text import Text
 
+from nextplace.validator.database.database_manager import DatabaseManager
+from nextplace.validator.database.table_initializer import TableInitializer
+
 
 def __mock_wallet_factory__(*args, **kwargs) -> _MockWallet:
     """Returns a mock wallet object."""
@@ -179,3 +185,24 @@ class MockConsole:
         output_no_syntax = Text.from_ansi(Text.from_markup(text).plain).plain
 
         return output_no_syntax
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """
+    Runs each test against a fresh database, in a temporary working directory
+    """
+
+    create_tables = True  # Set to False to start from an empty database
+
+    def setUp(self):
+        self.original_cwd = os.getcwd()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.temp_dir.name)
+        self.database_manager = DatabaseManager()
+        if self.create_tables:
+            TableInitializer(self.database_manager).create_tables()
+
+    def tearDown(self):
+        self.database_manager.close()
+        os.chdir(self.original_cwd)
+        self.temp_dir.cleanup()
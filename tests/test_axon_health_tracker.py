@@ -0,0 +1,70 @@
+import unittest
+from types import SimpleNamespace
+from nextplace.validator.miner_manager.axon_health_tracker import AxonHealthTracker, FAILURE_STREAK_THRESHOLD
+from tests.helpers import DatabaseTestCase
+
+
+def _build_metagraph(hotkeys: list[str], serving: list[bool], validator_permit: list[bool], stake: list[float]) -> SimpleNamespace:
+    return SimpleNamespace(
+        hotkeys=hotkeys,
+        axons=[SimpleNamespace(hotkey=hotkey, is_serving=is_serving) for hotkey, is_serving in zip(hotkeys, serving)],
+        validator_permit=validator_permit,
+        S=stake,
+    )
+
+
+class TestAxonHealthTracker(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tracker = AxonHealthTracker(self.database_manager)
+        self.metagraph = _build_metagraph(['miner', 'offline', 'validator'], [True, False, True], [False, False, True], [0, 0, 10000])
+
+    def _selected_hotkeys(self, tracker: AxonHealthTracker) -> list[str]:
+        return [miner_hotkey for miner_hotkey, _ in tracker.select_axons(self.metagraph, 4096)]
+
+    def test_skips_non_serving_axons_and_validators(self):
+        self.assertEqual(self._selected_hotkeys(self.tracker), ['miner'])
+
+    def test_failing_axon_is_backed_off_until_it_succeeds(self):
+        for _ in range(FAILURE_STREAK_THRESHOLD - 1):
+            self.tracker.record_response('miner', 408, 30.0)
+        self.assertEqual(self._selected_hotkeys(self.tracker), ['miner'])
+
+        self.assertTrue(self.tracker.is_live('miner'))
+
+        self.tracker.record_response('miner', 408, 30.0)
+        self.assertEqual(self._selected_hotkeys(self.tracker), [])
+        self.assertFalse(self.tracker.is_live('miner'))
+
+        self.tracker.record_response('miner', 200, 1.5)
+        self.assertEqual(self._selected_hotkeys(self.tracker), ['miner'])
+        self.assertTrue(self.tracker.is_live('miner'))
+
+    def test_backoff_grows_exponentially(self):
+        for _ in range(FAILURE_STREAK_THRESHOLD):
+            self.tracker.record_response('miner', 408, 30.0)
+        first_probe = self.tracker.health['miner']['next_probe']
+        self.tracker.record_response('miner', 408, 30.0)
+        second_probe = self.tracker.health['miner']['next_probe']
+        self.assertGreater((second_probe - first_probe).total_seconds(), 50)
+
+    def test_health_survives_restart(self):
+        for _ in range(FAILURE_STREAK_THRESHOLD):
+            self.tracker.record_response('miner', 408, 30.0)
+        self.tracker.persist()
+
+        restarted = AxonHealthTracker(self.database_manager)
+        self.assertEqual(restarted.health['miner']['failure_streak'], FAILURE_STREAK_THRESHOLD)
+        self.assertEqual(self._selected_hotkeys(restarted), [])
+
+    def test_deregistered_hotkeys_are_forgotten(self):
+        self.tracker.record_response('gone', 408, 30.0)
+        self.tracker.persist()
+        self.tracker.select_axons(self.metagraph, 4096)
+        self.tracker.persist()
+        self.assertEqual(self.database_manager.get_size_of_table('axon_health'), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
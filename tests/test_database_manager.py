@@ -0,0 +1,71 @@
+import threading
+import unittest
+from tests.helpers import DatabaseTestCase
+
+
+class TestDatabaseManager(DatabaseTestCase):
+    create_tables = False
+
+    def setUp(self):
+        super().setUp()
+        self.database_manager.query_and_commit("CREATE TABLE IF NOT EXISTS items (id INTEGER PRIMARY KEY, name TEXT)")
+
+    def test_thread_connection_is_reused(self):
+        first = self.database_manager.get_db_connection()
+        second = self.database_manager.get_db_connection()
+        self.assertIs(first, second)
+
+    def test_threads_get_their_own_connection(self):
+        main_connection = self.database_manager.get_db_connection()
+        connections = []
+        thread = threading.Thread(target=lambda: connections.append(self.database_manager.get_db_connection()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(main_connection, connections[0])
+
+    def test_reads_see_committed_writes(self):
+        self.database_manager.query_and_commit_many("INSERT INTO items (name) VALUES (?)", [("a",), ("b",)])
+        self.database_manager.query_and_commit_with_values("INSERT INTO items (name) VALUES (?)", ("c",))
+        rows = self.database_manager.query("SELECT name FROM items ORDER BY id")
+        self.assertEqual(rows, [("a",), ("b",), ("c",)])
+        self.assertEqual(self.database_manager.get_size_of_table("items"), 3)
+
+    def test_read_connections_are_read_only(self):
+        rows = self.database_manager.query("INSERT INTO items (name) VALUES ('x') RETURNING id")
+        self.assertEqual(rows, [])
+        self.assertEqual(self.database_manager.get_size_of_table("items"), 0)
+
+    def test_failed_write_is_rolled_back(self):
+        self.database_manager.query_and_commit("CREATE TABLE unique_items (name TEXT UNIQUE)")
+        with self.assertRaises(Exception):
+            self.database_manager.query_and_commit_many("INSERT INTO unique_items (name) VALUES (?)", [("a",), ("a",)])
+        self.assertEqual(self.database_manager.get_size_of_table("unique_items"), 0)
+
+    def test_database_uses_wal_journal(self):
+        rows = self.database_manager.query("PRAGMA journal_mode")
+        self.assertEqual(rows, [("wal",)])
+
+    def test_writes_run_on_writer_thread(self):
+        thread_names = self.database_manager.run_in_transaction(lambda cursor: [threading.current_thread().name])
+        self.assertEqual(thread_names, [self.database_manager.writer._thread.name])
+
+    def test_transaction_is_atomic(self):
+        def work(cursor):
+            cursor.execute("INSERT INTO items (name) VALUES ('a')")
+            raise ValueError("abort")
+
+        with self.assertRaises(ValueError):
+            self.database_manager.run_in_transaction(work)
+        self.assertEqual(self.database_manager.get_size_of_table("items"), 0)
+
+    def test_nested_writes_run_inline(self):
+        def work(cursor):
+            cursor.execute("INSERT INTO items (name) VALUES ('a')")
+            self.database_manager.query_and_commit("INSERT INTO items (name) VALUES ('b')")
+
+        self.database_manager.run_in_transaction(work)
+        self.assertEqual(self.database_manager.get_size_of_table("items"), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+import asyncio
+import threading
+import time
+import unittest
+from nextplace.miner.ml.inference_pool import InferencePool
+from nextplace.miner.ml.prediction_cache import PredictionCache
+from nextplace.protocol import RealEstatePrediction
+
+CHUNK_SIZE = 10
+
+
+class FakeModel:
+
+    def __init__(self, seconds_per_chunk: float = 0.0, supports_batch_inference: bool = False):
+        self.seconds_per_chunk = seconds_per_chunk
+        self.supports_batch_inference = supports_batch_inference
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+        self.order = []
+
+    def predict(self, predictions):
+        self.release.wait()
+        time.sleep(self.seconds_per_chunk)
+        self.order.append(predictions[0].nextplace_id)
+        self.calls.append(threading.current_thread().name)
+        for prediction in predictions:
+            prediction.predicted_sale_price = prediction.price * 2
+            prediction.predicted_sale_date = '2030-01-01'
+
+
+class TestInferencePool(unittest.TestCase):
+
+    def _pool(self, model: FakeModel, max_workers: int = 1, max_queue: int = 8, chunk_size: int = 0) -> InferencePool:
+        cache = PredictionCache({'max_entries': 1000, 'ttl_seconds': 60, 'path': None})
+        return InferencePool(model, cache, {'max_workers': max_workers, 'max_queue': max_queue, 'chunk_size': chunk_size})
+
+    def _predictions(self, prefix: str, count: int) -> list[RealEstatePrediction]:
+        return [RealEstatePrediction(nextplace_id=f'{prefix}-{idx}', price=float(idx)) for idx in range(count)]
+
+    def test_fills_in_predictions(self):
+        model = FakeModel()
+        pool = self._pool(model)
+        predictions = self._predictions('a', 25)
+
+        async def scenario():
+            return await pool.run(predictions, 1.0, asyncio.get_running_loop().time() + 5)
+
+        self.assertEqual(asyncio.run(scenario()), 25)
+        self.assertEqual([x.predicted_sale_price for x in predictions], [float(idx) * 2 for idx in range(25)])
+        self.assertEqual(pool.running, 0)
+        self.assertEqual(len(model.calls), 1)  # The whole request in one call by default
+
+    def test_batch_models_get_the_whole_request(self):
+        model = FakeModel(supports_batch_inference=True)
+        pool = self._pool(model, chunk_size=CHUNK_SIZE)
+        predictions = self._predictions('a', CHUNK_SIZE * 3)
+
+        async def scenario():
+            return await pool.run(predictions, 1.0, asyncio.get_running_loop().time() + 5)
+
+        self.assertEqual(asyncio.run(scenario()), CHUNK_SIZE * 3)
+        self.assertEqual(len(model.calls), 1)
+        self.assertTrue(model.calls[0].startswith('🧠 InferenceThread'))  # Model and cache writes stay off the event loop
+        self.assertEqual(len(pool.prediction_cache.entries), CHUNK_SIZE * 3)
+
+    def test_returns_partial_predictions_at_deadline(self):
+        model = FakeModel(seconds_per_chunk=0.2)
+        pool = self._pool(model, chunk_size=CHUNK_SIZE)
+        predictions = self._predictions('a', CHUNK_SIZE * 5)
+
+        async def scenario():
+            completed = await pool.run(predictions, 1.0, asyncio.get_running_loop().time() + 0.3)
+            self.assertEqual(pool.running, 1)  # The late chunk still holds the worker
+            await asyncio.sleep(0.3)
+            return completed
+
+        completed = asyncio.run(scenario())
+        self.assertEqual(completed, CHUNK_SIZE)
+        self.assertIsNone(predictions[-1].predicted_sale_price)
+        self.assertIsNone(predictions[CHUNK_SIZE].predicted_sale_price)  # Late results never touch the synapse
+        self.assertEqual(len(pool.prediction_cache.entries), CHUNK_SIZE * 2)  # ...but they do warm the cache
+        self.assertEqual(pool.running, 0)
+
+    def test_waiting_requests_are_served_by_priority(self):
+        model = FakeModel()
+        model.release.clear()
+        pool = self._pool(model)
+
+        async def scenario():
+            deadline = asyncio.get_running_loop().time() + 5
+            first = asyncio.create_task(pool.run(self._predictions('first', 1), 1.0, deadline))
+            await asyncio.sleep(0.05)
+            low = asyncio.create_task(pool.run(self._predictions('low', 1), 1.0, deadline))
+            high = asyncio.create_task(pool.run(self._predictions('high', 1), 9.0, deadline))
+            await asyncio.sleep(0.05)
+            model.release.set()
+            await asyncio.gather(first, low, high)
+
+        asyncio.run(scenario())
+        self.assertEqual(model.order, ['first-0', 'high-0', 'low-0'])
+
+    def test_full_queue_sheds_lowest_priority(self):
+        model = FakeModel()
+        model.release.clear()
+        pool = self._pool(model, max_queue=1)
+
+        async def scenario():
+            deadline = asyncio.get_running_loop().time() + 5
+            first = asyncio.create_task(pool.run(self._predictions('first', 1), 5.0, deadline))
+            await asyncio.sleep(0.05)
+            low = asyncio.create_task(pool.run(self._predictions('low', 1), 1.0, deadline))
+            await asyncio.sleep(0.05)
+            rejected = await pool.run(self._predictions('lower', 1), 0.5, deadline)
+            high = asyncio.create_task(pool.run(self._predictions('high', 1), 9.0, deadline))
+            await asyncio.sleep(0.05)
+            model.release.set()
+            return rejected, await asyncio.gather(first, low, high)
+
+        rejected, (first, low, high) = asyncio.run(scenario())
+        self.assertEqual((rejected, first, low, high), (0, 1, 0, 1))
+        self.assertEqual(model.order, ['first-0', 'high-0'])
+        self.assertEqual(pool.running, 0)
+
+
+    def test_busy_pool_without_a_queue_drops_requests(self):
+        model = FakeModel()
+        model.release.clear()
+        pool = self._pool(model, max_queue=0)
+
+        async def scenario():
+            deadline = asyncio.get_running_loop().time() + 5
+            first = asyncio.create_task(pool.run(self._predictions('first', 1), 1.0, deadline))
+            await asyncio.sleep(0.05)
+            rejected = await pool.run(self._predictions('second', 1), 9.0, deadline)
+            model.release.set()
+            return rejected, await first
+
+        self.assertEqual(asyncio.run(scenario()), (0, 1))
+        self.assertEqual(pool.running, 0)
+
+
+    def test_cancelled_request_keeps_the_worker_until_the_model_finishes(self):
+        model = FakeModel()
+        model.release.clear()
+        pool = self._pool(model)
+
+        async def scenario():
+            deadline = asyncio.get_running_loop().time() + 5
+            cancelled = asyncio.create_task(pool.run(self._predictions('cancelled', 1), 1.0, deadline))
+            await asyncio.sleep(0.05)
+            cancelled.cancel()  # The validator hung up mid-inference
+            await asyncio.gather(cancelled, return_exceptions=True)
+            try:
+                self.assertEqual(pool.running, 1)  # The model is still busy with the cancelled chunk
+                waiting = asyncio.create_task(pool.run(self._predictions('next', 1), 1.0, deadline))
+                await asyncio.sleep(0.05)
+                self.assertEqual(model.calls, [])  # ...so the next request waits for it
+            finally:
+                model.release.set()
+            return await waiting
+
+        self.assertEqual(asyncio.run(scenario()), 1)
+        self.assertEqual(model.order, ['cancelled-0', 'next-0'])
+        self.assertEqual(pool.running, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import threading
+import time
+import unittest
+from nextplace.validator.scheduler.job_scheduler import JobScheduler
+
+
+class TestJobScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.scheduler = JobScheduler(max_workers=2)
+
+    def tearDown(self):
+        self.scheduler.shutdown()
+
+    def _wait_for_runs(self, name: str, runs: int) -> None:
+        deadline = time.monotonic() + 5
+        while self.scheduler.get_metrics()[name]['runs'] < runs and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_jobs_run_once_per_interval(self):
+        calls = []
+        self.scheduler.register('job', lambda: calls.append(1), interval_seconds=60)
+        self.scheduler.run_pending()
+        self._wait_for_runs('job', 1)
+        self.scheduler.run_pending()
+        self.scheduler.shutdown()
+        self.assertEqual(len(calls), 1)
+        self.assertGreater(self.scheduler.seconds_until_next_job(), 50)
+
+    def test_inline_jobs_run_on_calling_thread(self):
+        threads = []
+        self.scheduler.register('inline', lambda: threads.append(threading.current_thread()), interval_seconds=60, run_inline=True)
+        self.scheduler.run_pending()
+        self.assertEqual(threads, [threading.current_thread()])
+
+    def test_dependent_waits_for_dependency_to_succeed(self):
+        release = threading.Event()
+        order = []
+        self.scheduler.register('dependency', lambda: (release.wait(5), order.append('dependency')), interval_seconds=60)
+        self.scheduler.register('dependent', lambda: order.append('dependent'), interval_seconds=60, depends_on=['dependency'])
+
+        self.scheduler.run_pending()  # Only the dependency can start
+        self.scheduler.run_pending()
+        release.set()
+        self._wait_for_runs('dependency', 1)
+        self.assertEqual(self.scheduler.get_metrics()['dependent']['runs'], 0)
+
+        self.scheduler.run_pending()
+        self._wait_for_runs('dependent', 1)
+        self.assertEqual(order, ['dependency', 'dependent'])
+
+    def test_failed_dependency_blocks_dependent(self):
+        def fail():
+            raise RuntimeError("boom")
+
+        self.scheduler.register('dependency', fail, interval_seconds=60)
+        self.scheduler.register('dependent', lambda: None, interval_seconds=60, depends_on=['dependency'])
+        self.scheduler.run_pending()
+        self._wait_for_runs('dependency', 1)
+        self.scheduler.run_pending()
+        self.scheduler.shutdown()
+
+        metrics = self.scheduler.get_metrics()
+        self.assertEqual(metrics['dependency']['failures'], 1)
+        self.assertEqual(metrics['dependent']['runs'], 0)
+
+    def test_unknown_dependency_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.scheduler.register('dependent', lambda: None, interval_seconds=60, depends_on=['missing'])
+
+    def test_metrics_record_durations(self):
+        self.scheduler.register('job', lambda: time.sleep(0.05), interval_seconds=60, run_inline=True)
+        self.scheduler.run_pending()
+        metrics = self.scheduler.get_metrics()['job']
+        self.assertEqual(metrics['runs'], 1)
+        self.assertGreaterEqual(metrics['last_duration'], 0.05)
+        self.assertEqual(metrics['average_duration'], metrics['last_duration'])
+        self.assertIsNotNone(metrics['last_finished'])
+
+
+if __name__ == '__main__':
+    unittest.main()
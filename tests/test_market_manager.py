@@ -0,0 +1,42 @@
+import unittest
+from nextplace.validator.market.market_manager import MarketManager
+from tests.helpers import DatabaseTestCase
+
+
+class TestMarketManager(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.markets = [{'id': str(idx), 'name': f'market-{idx}'} for idx in range(4)]
+
+    def _add_properties(self, market: str, count: int) -> None:
+        self.database_manager.query_and_commit_many(
+            "INSERT INTO properties (nextplace_id, market) VALUES (?, ?)",
+            [(f'{market}-{idx}', market) for idx in range(count)]
+        )
+
+    def test_prefetches_until_buffer_holds_enough_markets(self):
+        market_manager = MarketManager(self.database_manager, self.markets, prefetch_markets=2, low_water_mark=5)
+        self.assertTrue(market_manager._needs_prefetch())
+        self._add_properties('market-0', 10)
+        self.assertTrue(market_manager._needs_prefetch())
+        self._add_properties('market-1', 10)
+        self.assertFalse(market_manager._needs_prefetch())
+
+    def test_refills_at_low_water_mark_without_overfilling(self):
+        market_manager = MarketManager(self.database_manager, self.markets, prefetch_markets=2, low_water_mark=5)
+        self._add_properties('market-0', 2)
+        self._add_properties('market-1', 2)
+        self.assertTrue(market_manager._needs_prefetch())
+        self._add_properties('market-2', 1)
+        self.assertFalse(market_manager._needs_prefetch())
+
+    def test_resumes_after_newest_buffered_market(self):
+        self._add_properties('market-1', 3)
+        self._add_properties('market-2', 3)
+        market_manager = MarketManager(self.database_manager, self.markets)
+        self.assertEqual(market_manager.market_index, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from types import SimpleNamespace
+from nextplace.validator.metagraph.metagraph_cache import MetagraphCache
+
+
+class FakeMetagraph:
+
+    def __init__(self):
+        self.block = 100
+        self.hotkeys = ['hotkeyA']
+        self.axons = ['axonA']
+        self.uids = [0]
+        self.S = [1.0]
+        self.validator_permit = [False]
+        self.syncs = []
+
+    def sync(self, block, lite, subtensor):
+        self.syncs.append((block, lite))
+        self.block = block
+        self.hotkeys = self.hotkeys + [f'hotkey{block}']
+        self.axons = self.axons + ['axon']
+        self.uids = list(range(len(self.hotkeys)))
+        self.S = self.S + [0.0]
+        self.validator_permit = self.validator_permit + [False]
+
+
+class TestMetagraphCache(unittest.TestCase):
+
+    def setUp(self):
+        self.metagraph = FakeMetagraph()
+        self.subtensor = SimpleNamespace(current_block=100)
+        self.subtensor.get_current_block = lambda: self.subtensor.current_block
+        self.cache = MetagraphCache(self.metagraph, self.subtensor, sync_interval_blocks=10)
+
+    def test_skips_sync_until_interval_has_passed(self):
+        self.subtensor.current_block = 109
+        self.assertFalse(self.cache.sync())
+        self.assertEqual(self.metagraph.syncs, [])
+
+        self.subtensor.current_block = 110
+        self.assertTrue(self.cache.sync())
+        self.assertEqual(self.metagraph.syncs, [(110, True)])
+        self.assertEqual(self.cache.snapshot().block, 110)
+
+    def test_snapshots_are_not_changed_by_later_syncs(self):
+        before = self.cache.snapshot()
+        self.subtensor.current_block = 200
+        self.cache.sync()
+        after = self.cache.snapshot()
+
+        self.assertEqual(before.hotkeys, ('hotkeyA',))
+        self.assertEqual(after.hotkeys, ('hotkeyA', 'hotkey200'))
+        self.assertEqual(after.uids, (0, 1))
+        with self.assertRaises(AttributeError):
+            after.hotkeys = ()
+
+
+if __name__ == '__main__':
+    unittest.main()
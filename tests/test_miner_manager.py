@@ -0,0 +1,52 @@
+import sqlite3
+import unittest
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from nextplace.validator.miner_manager.miner_manager import MinerManager
+from nextplace.validator.scoring.score_window import ScoreWindow
+from nextplace.validator.utils.contants import to_epoch_day
+from tests.helpers import DatabaseTestCase
+
+MINER_TABLES = ['predictions', 'miner_scores', 'active_miners', 'daily_scores', 'scored_predictions', 'market_coverage']
+
+
+class TestMinerManager(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.score_window = ScoreWindow(self.database_manager)
+        metagraph = SimpleNamespace(hotkeys=['registered'])
+        self.miner_manager = MinerManager(self.database_manager, SimpleNamespace(snapshot=lambda: metagraph), self.score_window)
+        today = datetime.now(timezone.utc)
+        for miner_hotkey in ['registered', 'deregistered']:
+            self.database_manager.query_and_commit_with_values("INSERT INTO predictions (nextplace_id, miner_hotkey) VALUES (?, ?)", ('home-1', miner_hotkey))
+            self.database_manager.query_and_commit_with_values("INSERT INTO miner_scores (miner_hotkey, lifetime_score, total_predictions) VALUES (?, ?, ?)", (miner_hotkey, 50.0, 1))
+            self.database_manager.query_and_commit_with_values("INSERT INTO active_miners (miner_hotkey) VALUES (?)", (miner_hotkey,))
+            self.database_manager.query_and_commit_with_values("INSERT INTO daily_scores (miner_hotkey, date, score, total_predictions, sum_score) VALUES (?, ?, ?, ?, ?)", (miner_hotkey, today.date().isoformat(), 50.0, 1, 50.0))
+            self.database_manager.query_and_commit_with_values("INSERT INTO scored_predictions (nextplace_id, miner_hotkey) VALUES (?, ?)", ('home-0', miner_hotkey))
+            self.database_manager.query_and_commit_with_values("INSERT INTO market_coverage (miner_hotkey, market, day, predictions) VALUES (?, ?, ?, ?)", (miner_hotkey, 'Columbus', to_epoch_day(today), 1))
+            self.score_window.add_scores({miner_hotkey: {'total_score': 50.0, 'new_predictions': 1}}, to_epoch_day(today))
+
+    def _hotkeys_in(self, table_name: str) -> list[str]:
+        return [row[0] for row in self.database_manager.query(f"SELECT DISTINCT miner_hotkey FROM {table_name} ORDER BY miner_hotkey")]
+
+    def test_deregistered_miners_are_removed_everywhere(self):
+        self.miner_manager.manage_miner_data()
+
+        for table_name in MINER_TABLES:
+            self.assertEqual(self._hotkeys_in(table_name), ['registered'], table_name)
+        self.assertEqual(list(self.score_window.get_averages()), ['registered'])
+
+    def test_failed_cleanup_removes_nothing(self):
+        self.database_manager.query_and_commit("DROP TABLE market_coverage")  # The last delete fails
+
+        with self.assertRaises(sqlite3.OperationalError):
+            self.miner_manager.manage_miner_data()
+
+        for table_name in MINER_TABLES[:-1]:
+            self.assertEqual(self._hotkeys_in(table_name), ['deregistered', 'registered'], table_name)
+        self.assertEqual(sorted(self.score_window.get_averages()), ['deregistered', 'registered'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from nextplace.miner.ml.model import Model
+from nextplace.miner.ml.utils import prepare_input_batch
+from nextplace.protocol import RealEstateSynapse, RealEstatePrediction, RealEstatePredictions
+
+ROW_MODEL = '''
+class RowModel:
+
+    def __init__(self):
+        self.calls = 0
+
+    def run_inference(self, input_data):
+        self.calls += 1
+        return input_data['price'] + 1, '2030-01-01'
+'''
+
+BATCH_MODEL = '''
+import numpy as np
+
+
+class BatchModel:
+
+    def __init__(self):
+        self.batch_calls = 0
+        self.row_calls = 0
+
+    def run_inference(self, input_data):
+        self.row_calls += 1
+        return 0.0, '1999-01-01'
+
+    def run_inference_batch(self, batch):
+        self.batch_calls += 1
+        return batch['price'] * 2, np.datetime64('2030-06-01T12:00') + np.arange(len(batch['price'])).astype('timedelta64[D]')
+'''
+
+BROKEN_BATCH_MODEL = '''
+class BrokenBatchModel:
+
+    def __init__(self):
+        self.row_calls = 0
+
+    def run_inference(self, input_data):
+        self.row_calls += 1
+        return 5.0, '2030-01-01'
+
+    def run_inference_batch(self, batch):
+        return [1.0], ['2030-01-01']  # Always one prediction, whatever the batch size
+'''
+
+
+class TestModel(unittest.TestCase):
+
+    def setUp(self):
+        self.original_cwd = os.getcwd()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.temp_dir.name)
+        os.mkdir('models')
+        for filename, source in [('RowModel.py', ROW_MODEL), ('BatchModel.py', BATCH_MODEL), ('BrokenBatchModel.py', BROKEN_BATCH_MODEL)]:
+            with open(os.path.join('models', filename), 'w') as f:
+                f.write(source)
+
+    def tearDown(self):
+        os.chdir(self.original_cwd)
+        self.temp_dir.cleanup()
+
+    def _load(self, filename: str) -> Model:
+        return Model({'model_source': 'local', 'model_path': 'models', 'api_key': '', 'model_class_filename': filename})
+
+    def _synapse(self, count: int) -> RealEstateSynapse:
+        predictions = [RealEstatePrediction(nextplace_id=f'home-{idx}', price=100000.0 + idx) for idx in range(count)]
+        return RealEstateSynapse.create(real_estate_predictions=RealEstatePredictions(predictions=predictions))
+
+    def test_uses_per_row_inference_without_batch_method(self):
+        model = self._load('RowModel.py')
+        synapse = self._synapse(3)
+        model.run_inference(synapse)
+        self.assertFalse(model.supports_batch_inference)
+        self.assertEqual(model.model.calls, 3)
+        self.assertEqual([x.predicted_sale_price for x in synapse.real_estate_predictions.predictions], [100001.0, 100002.0, 100003.0])
+
+    def test_uses_batch_inference_when_available(self):
+        model = self._load('BatchModel.py')
+        synapse = self._synapse(3)
+        model.run_inference(synapse)
+        predictions = synapse.real_estate_predictions.predictions
+        self.assertTrue(model.supports_batch_inference)
+        self.assertEqual((model.model.batch_calls, model.model.row_calls), (1, 0))
+        self.assertEqual([x.predicted_sale_price for x in predictions], [200000.0, 200002.0, 200004.0])
+        self.assertEqual([x.predicted_sale_date for x in predictions], ['2030-06-01', '2030-06-02', '2030-06-03'])
+        self.assertIsInstance(predictions[0].predicted_sale_price, float)
+
+    def test_falls_back_to_per_row_inference_on_bad_batch(self):
+        model = self._load('BrokenBatchModel.py')
+        synapse = self._synapse(3)
+        model.run_inference(synapse)
+        self.assertEqual(model.model.row_calls, 3)
+        self.assertEqual([x.predicted_sale_price for x in synapse.real_estate_predictions.predictions], [5.0, 5.0, 5.0])
+
+    def test_prepare_input_batch_is_columnar(self):
+        predictions = [RealEstatePrediction(nextplace_id='a', price=1.0, beds=2), RealEstatePrediction(nextplace_id='b')]
+        batch = prepare_input_batch(predictions)
+        self.assertEqual(batch['price'].dtype, np.float64)
+        self.assertTrue(np.isnan(batch['price'][1]))
+        self.assertEqual(batch['beds'][0], 2.0)
+        self.assertEqual(list(batch['nextplace_id']), ['a', 'b'])
+        self.assertIsNone(batch['city'][0])
+
+
+if __name__ == '__main__':
+    unittest.main()
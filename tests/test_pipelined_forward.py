@@ -0,0 +1,104 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from nextplace.validator.miner_manager.axon_health_tracker import AxonHealthTracker
+from nextplace.validator.nextplace_validator import RealEstateValidator
+from nextplace.validator.predictions.prediction_manager import PredictionManager
+from nextplace.validator.synapse.synapse_manager import SynapseManager
+from nextplace.validator.utils.contants import NUMBER_OF_PROPERTIES_PER_SYNAPSE
+from tests.helpers import DatabaseTestCase
+
+
+class FakeDendrite:
+    """
+    Answers every synapse with a prediction for each property in it
+    """
+
+    def __init__(self, timed_out_hotkeys: set[str] = frozenset()):
+        self.calls = []
+        self.timed_out_hotkeys = timed_out_hotkeys
+
+    async def call(self, target_axon, synapse, timeout, deserialize):
+        await asyncio.sleep(0)
+        synapse = synapse.model_copy(deep=True)  # Like the real dendrite, every call gets its own TerminalInfo
+        self.calls.append((target_axon.hotkey, [x.nextplace_id for x in synapse.real_estate_predictions.predictions]))
+        if target_axon.hotkey in self.timed_out_hotkeys:
+            synapse.dendrite.status_code = 408
+            return synapse
+        for prediction in synapse.real_estate_predictions.predictions:
+            prediction.predicted_sale_price = 100.0
+            prediction.predicted_sale_date = '2024-09-01'
+        synapse.dendrite.status_code = 200
+        synapse.dendrite.process_time = 0.1
+        return synapse
+
+    async def aclose_session(self):
+        pass
+
+
+class TestPipelinedForward(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.loop = asyncio.new_event_loop()
+
+        hotkeys = ['minerA', 'minerB']
+        validator = RealEstateValidator.__new__(RealEstateValidator)
+        validator.config = SimpleNamespace(neuron=SimpleNamespace(num_concurrent_forwards=3, vpermit_tao_limit=4096))
+        metagraph = SimpleNamespace(
+            hotkeys=hotkeys,
+            axons=[SimpleNamespace(hotkey=x, is_serving=True) for x in hotkeys],
+            validator_permit=[False, False],
+            S=[0, 0],
+        )
+        validator.metagraph_cache = SimpleNamespace(snapshot=lambda: metagraph)
+        validator.loop = self.loop
+        validator.dendrite = FakeDendrite()
+        validator.current_thread = 'MainThread'
+        validator.should_step = True
+        validator.pending_ingest_futures = []
+        validator.synapse_manager = SynapseManager(self.database_manager)
+        validator.prediction_manager = PredictionManager(self.database_manager)
+        validator.axon_health_tracker = AxonHealthTracker(self.database_manager)
+        self.validator = validator
+
+    def tearDown(self):
+        self.loop.close()
+        super().tearDown()
+
+    def _add_properties(self, count: int) -> None:
+        self.database_manager.query_and_commit_many(
+            "INSERT INTO properties (nextplace_id, market) VALUES (?, ?)",
+            [(f'home-{idx}', 'Columbus') for idx in range(count)]
+        )
+
+    def test_lanes_send_disjoint_batches(self):
+        self._add_properties(NUMBER_OF_PROPERTIES_PER_SYNAPSE * 3)
+        self.validator.forward(1)
+
+        batches = {tuple(nextplace_ids) for miner_hotkey, nextplace_ids in self.validator.dendrite.calls if miner_hotkey == 'minerA'}
+        self.assertEqual(len(batches), 3)
+        claimed = [x for batch in batches for x in batch]
+        self.assertEqual(len(claimed), len(set(claimed)))
+        self.assertEqual(self.database_manager.get_size_of_table('properties'), 0)
+        self.assertTrue(self.validator.should_step)
+
+    def test_batch_shrinks_when_half_the_miners_time_out(self):
+        self.validator.dendrite = FakeDendrite(timed_out_hotkeys={'minerB'})
+        self._add_properties(NUMBER_OF_PROPERTIES_PER_SYNAPSE * 3)
+        self.validator.forward(1)
+
+        self.assertLess(self.validator.synapse_manager.batch_size, NUMBER_OF_PROPERTIES_PER_SYNAPSE)
+
+    def test_predictions_are_stored_by_the_next_step(self):
+        self._add_properties(NUMBER_OF_PROPERTIES_PER_SYNAPSE)
+        self.validator.forward(1)
+        self.validator.forward(2)
+
+        self.assertEqual(self.validator.pending_ingest_futures, [])
+        self.assertEqual(self.database_manager.get_size_of_table('predictions'), NUMBER_OF_PROPERTIES_PER_SYNAPSE * 2)
+        self.assertFalse(self.validator.should_step)  # Nothing left to send on the second step
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import time
+import unittest
+from nextplace.miner.ml.prediction_cache import PredictionCache
+from nextplace.protocol import RealEstatePrediction
+
+
+class TestPredictionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'prediction_cache.json')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _prediction(self, nextplace_id: str, price: float = 100000.0, days_on_market: int = 5) -> RealEstatePrediction:
+        return RealEstatePrediction(nextplace_id=nextplace_id, listing_id=f'listing-{nextplace_id}', price=price, days_on_market=days_on_market)
+
+    def _inferred(self, nextplace_id: str, **kwargs) -> RealEstatePrediction:
+        prediction = self._prediction(nextplace_id, **kwargs)
+        prediction.predicted_sale_price = 123.0
+        prediction.predicted_sale_date = '2030-01-01'
+        return prediction
+
+    def test_serves_hits_and_returns_misses(self):
+        cache = PredictionCache({'max_entries': 10, 'ttl_seconds': 60, 'path': None})
+        cache.store([self._inferred('a')])
+        incoming = [self._prediction('a'), self._prediction('b')]
+        misses = cache.apply(incoming)
+        self.assertEqual([x.nextplace_id for x in misses], ['b'])
+        self.assertEqual((incoming[0].predicted_sale_price, incoming[0].predicted_sale_date), (123.0, '2030-01-01'))
+
+    def test_changed_listing_is_a_miss(self):
+        cache = PredictionCache({'max_entries': 10, 'ttl_seconds': 60, 'path': None})
+        cache.store([self._inferred('a')])
+        self.assertEqual(len(cache.apply([self._prediction('a', price=90000.0)])), 1)
+        self.assertEqual(len(cache.apply([self._prediction('a', days_on_market=6)])), 1)
+
+    def test_expired_entry_is_a_miss(self):
+        cache = PredictionCache({'max_entries': 10, 'ttl_seconds': -1, 'path': None})
+        cache.store([self._inferred('a')])
+        self.assertEqual(len(cache.apply([self._prediction('a')])), 1)
+
+    def test_evicts_least_recently_used(self):
+        cache = PredictionCache({'max_entries': 2, 'ttl_seconds': 60, 'path': None})
+        cache.store([self._inferred('a'), self._inferred('b')])
+        cache.apply([self._prediction('a')])  # 'a' is now the most recently used
+        cache.store([self._inferred('c')])
+        self.assertEqual(list(cache.entries.keys()), ['a', 'c'])
+
+    def test_disabled_cache_misses_everything(self):
+        cache = PredictionCache({'max_entries': 0, 'ttl_seconds': 60, 'path': None})
+        cache.store([self._inferred('a')])
+        self.assertEqual(len(cache.apply([self._prediction('a')])), 1)
+
+    def test_persists_and_reloads(self):
+        cache = PredictionCache({'max_entries': 10, 'ttl_seconds': 60, 'path': self.path})
+        cache.store([self._inferred('a')])
+        cache.entries['expired'] = {'fingerprint': [None, None, None], 'predicted_sale_price': 1.0, 'predicted_sale_date': '2030-01-01', 'expires_at': time.time() - 1}
+        cache.persist()
+
+        reloaded = PredictionCache({'max_entries': 10, 'ttl_seconds': 60, 'path': self.path})
+        self.assertEqual(list(reloaded.entries.keys()), ['a'])
+        self.assertEqual(len(reloaded.apply([self._prediction('a')])), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
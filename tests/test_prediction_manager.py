@@ -0,0 +1,78 @@
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import patch
+from nextplace.protocol import RealEstatePrediction, RealEstatePredictions
+from nextplace.validator.predictions.prediction_manager import PredictionManager
+from nextplace.validator.utils.contants import to_epoch_day
+from tests.helpers import DatabaseTestCase
+
+
+def _build_response(nextplace_ids: list[str], force_update: bool = False, price: float = 100.0) -> RealEstatePredictions:
+    return RealEstatePredictions(predictions=[
+        RealEstatePrediction(
+            nextplace_id=nextplace_id,
+            market='Columbus',
+            predicted_sale_price=price,
+            predicted_sale_date='2024-09-01',
+            force_update_past_predictions=force_update,
+        )
+        for nextplace_id in nextplace_ids
+    ])
+
+
+class TestPredictionManager(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.prediction_manager = PredictionManager(self.database_manager)
+
+    def test_only_predictions_in_synapse_are_stored(self):
+        self.prediction_manager.process_predictions([
+            ('hotkeyA', _build_response(['home1', 'not-in-synapse'])),
+            ('hotkeyB', _build_response(['home1'])),
+        ], {'home1'})
+
+        rows = self.database_manager.query("SELECT miner_hotkey, nextplace_id FROM predictions ORDER BY miner_hotkey")
+        self.assertEqual(rows, [('hotkeyA', 'home1'), ('hotkeyB', 'home1')])
+        self.assertEqual(self.database_manager.get_size_of_table('active_miners'), 2)
+
+    def test_force_update_replaces_existing_prediction(self):
+        self.prediction_manager.process_predictions([('hotkeyA', _build_response(['home1'], price=100.0))], {'home1'})
+        self.prediction_manager.process_predictions([('hotkeyA', _build_response(['home1'], price=200.0))], {'home1'})
+        self.assertEqual(self.database_manager.query("SELECT predicted_sale_price FROM predictions"), [(100.0,)])
+        self.prediction_manager.process_predictions([('hotkeyA', _build_response(['home1'], force_update=True, price=300.0))], {'home1'})
+        self.assertEqual(self.database_manager.query("SELECT predicted_sale_price FROM predictions"), [(300.0,)])
+
+    def test_queued_responses_are_written_once_the_batch_is_full(self):
+        with patch('nextplace.validator.predictions.prediction_manager.INGEST_BATCH_SIZE', 3):
+            self.assertIsNone(self.prediction_manager.queue_response('hotkeyA', _build_response(['home1', 'home2']), {'home1', 'home2'}))
+            self.assertEqual(self.database_manager.get_size_of_table('predictions'), 0)
+            future = self.prediction_manager.queue_response('hotkeyB', _build_response(['home1']), {'home1', 'home2'})
+
+        self.assertIsNotNone(future)
+        future.result()
+        self.assertEqual(self.database_manager.get_size_of_table('predictions'), 3)
+        self.assertEqual(self.prediction_manager.pending_ignore_rows, [])
+
+    def test_market_coverage_is_summarized_at_ingest(self):
+        self.database_manager.query_and_commit_with_values(
+            "INSERT INTO market_coverage (miner_hotkey, market, day, predictions) VALUES (?, ?, ?, ?)", ('hotkeyA', 'Columbus', 1, 5)
+        )
+        self.prediction_manager.process_predictions([('hotkeyA', _build_response(['home1', 'home2']))], {'home1', 'home2'})
+        self.prediction_manager.process_predictions([('hotkeyA', _build_response(['home3']))], {'home3'})
+
+        today = to_epoch_day(datetime.now(timezone.utc))
+        rows = self.database_manager.query("SELECT miner_hotkey, market, day, predictions FROM market_coverage")
+        self.assertEqual(rows, [('hotkeyA', 'Columbus', today, 3)])  # Day 1 has left the coverage window
+
+    def test_market_coverage_skips_ignored_duplicates(self):
+        self.prediction_manager.process_predictions([('hotkeyA', _build_response(['home1', 'home2']))], {'home1', 'home2'})
+        self.prediction_manager.process_predictions([('hotkeyA', _build_response(['home1', 'home3']))], {'home1', 'home3'})  # home1 is ignored
+
+        rows = self.database_manager.query("SELECT predictions FROM market_coverage WHERE miner_hotkey = 'hotkeyA'")
+        self.assertEqual(rows, [(3,)])
+        self.assertEqual(self.database_manager.get_size_of_table('predictions'), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+from types import SimpleNamespace
+from nextplace.miner.real_estate_miner import RealEstateMiner
+
+
+class FakeMetagraph:
+
+    def __init__(self, hotkeys: list[str], stakes: list[float]):
+        self.hotkeys = hotkeys
+        self.S = stakes
+        self.next = None
+
+    def sync(self, subtensor=None):
+        self.hotkeys, self.S = self.next
+
+
+class TestRealEstateMiner(unittest.TestCase):
+
+    def setUp(self):
+        self.miner = RealEstateMiner.__new__(RealEstateMiner)
+        self.miner.metagraph = FakeMetagraph(['validator', 'miner'], [1000.0, 1.0])
+        self.miner.subtensor = None
+        self.miner.hotkey_index = self.miner._build_hotkey_index()
+
+    def _synapse(self, hotkey: str):
+        return SimpleNamespace(dendrite=SimpleNamespace(hotkey=hotkey))
+
+    def test_blacklists_unknown_hotkeys(self):
+        self.assertTrue(self.miner.blacklist(self._synapse('stranger'))[0])
+        self.assertFalse(self.miner.blacklist(self._synapse('validator'))[0])
+
+    def test_priority_is_stake(self):
+        self.assertEqual(self.miner.priority(self._synapse('validator')), 1000.0)
+        self.assertEqual(self.miner.get_validator_stake_and_uid('miner'), (1.0, 1))
+
+    def test_resync_rebuilds_index(self):
+        self.miner.metagraph.next = (['newcomer', 'validator'], [5.0, 2000.0])
+        self.miner.resync_metagraph()
+        self.assertEqual(self.miner.get_validator_stake_and_uid('validator'), (2000.0, 1))
+        self.assertTrue(self.miner.blacklist(self._synapse('miner'))[0])
+        self.assertFalse(self.miner.blacklist(self._synapse('newcomer'))[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+from datetime import datetime, timezone, timedelta
+from unittest.mock import patch
+from nextplace.validator.scoring.score_window import ScoreWindow
+from nextplace.validator.utils.contants import to_epoch_day
+from tests.helpers import DatabaseTestCase
+
+
+class TestScoreWindow(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.today = to_epoch_day(datetime.now(timezone.utc))
+
+    def _add_daily_score(self, hotkey: str, days_ago: int, sum_score: float, count: int) -> None:
+        day = (datetime.now(timezone.utc) - timedelta(days=days_ago)).date().isoformat()
+        self.database_manager.query_and_commit_with_values(
+            "INSERT INTO daily_scores (miner_hotkey, date, score, total_predictions, sum_score) VALUES (?, ?, ?, ?, ?)",
+            (hotkey, day, sum_score / count, count, sum_score)
+        )
+
+    def test_loads_only_days_inside_the_window(self):
+        self._add_daily_score('minerA', 0, 80.0, 2)
+        self._add_daily_score('minerA', 29, 20.0, 2)
+        self._add_daily_score('minerA', 30, 1000.0, 1)  # Just outside the window
+        self._add_daily_score('minerB', 45, 50.0, 1)
+
+        score_window = ScoreWindow(self.database_manager)
+
+        self.assertEqual(score_window.get_averages(), {'minerA': 25.0})
+
+    def test_days_expire_as_the_window_moves(self):
+        score_window = ScoreWindow(self.database_manager, window_days=3)
+        score_window.add_scores({'minerA': {'total_score': 30.0, 'new_predictions': 1}}, self.today)
+        score_window.add_scores({'minerB': {'total_score': 60.0, 'new_predictions': 2}}, self.today)
+
+        with patch('nextplace.validator.scoring.score_window.to_epoch_day', return_value=self.today + 1):
+            score_window.add_scores({'minerA': {'total_score': 10.0, 'new_predictions': 1}}, self.today + 1)
+            self.assertEqual(score_window.get_averages(), {'minerA': 20.0, 'minerB': 30.0})
+        with patch('nextplace.validator.scoring.score_window.to_epoch_day', return_value=self.today + 3):
+            self.assertEqual(score_window.get_averages(), {'minerA': 10.0})
+            self.assertEqual(list(score_window.hotkey_rows), ['minerA'])  # Miners without scores are dropped
+
+    def test_forget_drops_miners(self):
+        score_window = ScoreWindow(self.database_manager)
+        score_window.add_scores({
+            'minerA': {'total_score': 30.0, 'new_predictions': 1},
+            'minerB': {'total_score': 40.0, 'new_predictions': 1},
+            'minerC': {'total_score': 50.0, 'new_predictions': 1},
+        }, self.today)
+        score_window.forget(['minerB', 'unknown'])
+        self.assertEqual(score_window.get_averages(), {'minerA': 30.0, 'minerC': 50.0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import sqlite3
+import unittest
+from datetime import datetime, timezone, timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+from nextplace.validator.scoring.score_window import ScoreWindow
+from nextplace.validator.scoring.scoring import Scorer
+from nextplace.validator.utils.contants import ISO8601, to_epoch_day
+from tests.helpers import DatabaseTestCase
+
+
+class TestScorer(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.score_window = ScoreWindow(self.database_manager)
+        metagraph = SimpleNamespace(hotkeys=['minerA', 'minerB'])
+        self.scorer = Scorer(self.database_manager, [], SimpleNamespace(snapshot=lambda: metagraph), self.score_window)
+        self.now = datetime.now(timezone.utc)
+        website = patch.object(Scorer, '_send_data_to_website')
+        website.start()
+        self.addCleanup(website.stop)
+
+    def _add_prediction(self, nextplace_id: str, miner_hotkey: str, predicted_sale_price: float, predicted_sale_date: str, days_ago: int = 10) -> None:
+        predicted_at = self.now - timedelta(days=days_ago)
+        self.database_manager.query_and_commit_with_values(
+            "INSERT INTO predictions (nextplace_id, miner_hotkey, predicted_sale_price, predicted_sale_date, prediction_timestamp, market, prediction_day) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (nextplace_id, miner_hotkey, predicted_sale_price, predicted_sale_date, predicted_at.strftime(ISO8601), 'Columbus', to_epoch_day(predicted_at))
+        )
+
+    def _add_sale(self, nextplace_id: str, sale_price: float, days_ago: int = 2) -> None:
+        sold_at = self.now - timedelta(days=days_ago)
+        self.database_manager.query_and_commit_with_values(
+            "INSERT INTO sales (nextplace_id, sale_price, sale_date, sale_day) VALUES (?, ?, ?, ?)",
+            (nextplace_id, sale_price, sold_at.strftime(ISO8601), to_epoch_day(sold_at))
+        )
+
+    def test_sweep_scores_and_moves_predictions(self):
+        sale_date = (self.now - timedelta(days=2)).date().isoformat()
+        self._add_sale('home-1', 100000.0)
+        self._add_prediction('home-1', 'minerA', 100000.0, sale_date)  # Perfect prediction
+        self._add_prediction('home-1', 'minerB', 50000.0, sale_date)
+        self._add_prediction('home-1', 'deregistered', 100000.0, sale_date)
+        self._add_prediction('home-2', 'minerA', 100000.0, sale_date)  # Not sold yet
+
+        self.scorer.score_predictions()
+
+        scores = dict(self.database_manager.query("SELECT miner_hotkey, lifetime_score FROM miner_scores"))
+        self.assertEqual(set(scores), {'minerA', 'minerB'})  # Hotkeys outside the metagraph are skipped
+        self.assertAlmostEqual(scores['minerA'], 100.0)
+        self.assertAlmostEqual(scores['minerB'], 50.0 * 0.86 + 100.0 * 0.14)
+        scored = self.database_manager.query("SELECT nextplace_id, miner_hotkey, sale_price FROM scored_predictions ORDER BY miner_hotkey")
+        self.assertEqual(scored, [('home-1', 'minerA', 100000.0), ('home-1', 'minerB', 100000.0)])
+        remaining = self.database_manager.query("SELECT nextplace_id, miner_hotkey FROM predictions ORDER BY nextplace_id")
+        self.assertEqual(remaining, [('home-1', 'deregistered'), ('home-2', 'minerA')])
+
+        self.scorer.score_predictions()  # Nothing left to score, so nothing is counted twice
+        self.assertEqual(self.database_manager.query("SELECT total_predictions FROM miner_scores WHERE miner_hotkey = 'minerA'"), [(1,)])
+
+    def test_failed_move_leaves_scores_uncommitted(self):
+        sale_date = (self.now - timedelta(days=2)).date().isoformat()
+        self._add_sale('home-1', 100000.0)
+        self._add_prediction('home-1', 'minerA', 100000.0, sale_date)
+        self.database_manager.query_and_commit("DROP TABLE scored_predictions")
+
+        with self.assertRaises(sqlite3.OperationalError):
+            self.scorer.score_predictions()
+
+        self.assertEqual(self.database_manager.get_size_of_table('miner_scores'), 0)
+        self.assertEqual(self.database_manager.get_size_of_table('daily_scores'), 0)
+        self.assertEqual(self.database_manager.get_size_of_table('predictions'), 1)
+
+    def test_consensus_seeds_unscored_miners_once(self):
+        self._add_prediction('home-1', 'minerA', 100000.0, '2030-01-01')
+        self._add_prediction('home-1', 'deregistered', 100000.0, '2030-01-01')
+
+        with patch.object(Scorer, '_get_miner_score_data_from_webserver', return_value=70) as get_score:
+            self.scorer._check_consensus_for_unscored_miners()
+            self.scorer._check_consensus_for_unscored_miners()  # Already checked since the last sales refresh
+
+        get_score.assert_called_once_with('minerA')
+        self.assertEqual(self.database_manager.query("SELECT miner_hotkey, lifetime_score, total_predictions FROM miner_scores"), [('minerA', 70.0, 1)])
+        self.assertEqual(self.database_manager.query("SELECT miner_hotkey, score FROM daily_scores"), [('minerA', 70.0)])
+        self.assertEqual(self.score_window.get_averages(), {'minerA': 70.0})
+
+    def test_consensus_without_scores_seeds_nothing(self):
+        self._add_prediction('home-1', 'minerA', 100000.0, '2030-01-01')
+
+        with patch.object(Scorer, '_get_miner_score_data_from_webserver', return_value=0):
+            self.scorer._check_consensus_for_unscored_miners()
+
+        self.assertEqual(self.database_manager.get_size_of_table('miner_scores'), 0)
+        self.assertEqual(self.score_window.get_averages(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
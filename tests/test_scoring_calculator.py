@@ -0,0 +1,86 @@
+import unittest
+from datetime import datetime
+import numpy as np
+from nextplace.validator.scoring.scoring_calculator import ScoringCalculator
+from nextplace.validator.utils.contants import ISO8601
+from tests.helpers import DatabaseTestCase
+
+
+def reference_score(actual_price, predicted_price, actual_date, predicted_date):
+    actual_date = datetime.strptime(actual_date, ISO8601).date()
+    try:
+        predicted_date = datetime.strptime(predicted_date, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return None
+    date_difference = abs((actual_date - predicted_date).days)
+    date_score = (max(0, 14 - date_difference) / 14) * 100
+    price_difference = abs(float(actual_price) - float(predicted_price)) / float(actual_price)
+    price_score = max(0, 100 - (price_difference * 100))
+    return (price_score * 0.86) + (date_score * 0.14)
+
+
+class TestScoringCalculator(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.scoring_calculator = ScoringCalculator(None, None)
+
+    def test_batch_scores_match_reference(self):
+        actual_prices = [500000, 320000, 150000, 800000, 275000]
+        predicted_prices = [510000, 100000, 150000, 2000000, 270000]
+        actual_dates = ['2024-09-10T07:00:00Z', '2024-09-01T00:00:00Z', '2024-08-15T12:30:00Z', '2024-09-20T00:00:00Z', '2024-09-05T00:00:00Z']
+        predicted_dates = ['2024-09-12', '2024-08-01', '2024-08-15', '2024-09-19', '2024-09-05']
+
+        scores = self.scoring_calculator.calculate_scores(actual_prices, predicted_prices, actual_dates, predicted_dates)
+
+        expected = [reference_score(*x) for x in zip(actual_prices, predicted_prices, actual_dates, predicted_dates)]
+        np.testing.assert_allclose(scores, expected)
+
+    def test_invalid_predicted_dates_are_nan(self):
+        predicted_dates = ['2024-09-12', '09/12/2024', None, '2024-02-30', '2024-9-1', '2024-09-12T00:00:00']
+        n = len(predicted_dates)
+
+        scores = self.scoring_calculator.calculate_scores([100000] * n, [100000] * n, ['2024-09-10T00:00:00Z'] * n, predicted_dates)
+
+        expected = [reference_score(100000, 100000, '2024-09-10T00:00:00Z', x) for x in predicted_dates]
+        self.assertEqual([x is None for x in expected], np.isnan(scores).tolist())
+        for score, expected_score in zip(scores, expected):
+            if expected_score is not None:
+                self.assertAlmostEqual(score, expected_score)
+
+    def test_new_scores_are_summed_per_miner(self):
+        scorable_predictions = [
+            ('minerA', 100000, '2024-09-10', 100000, '2024-09-10T00:00:00Z'),
+            ('minerB', 100000, 'not a date', 100000, '2024-09-10T00:00:00Z'),
+            ('minerA', 50000, '2024-09-10', 100000, '2024-09-10T00:00:00Z'),
+        ]
+        scores = self.scoring_calculator._score_predictions(scorable_predictions)
+
+        new_scores = self.scoring_calculator._calculate_new_scores(scorable_predictions, scores)
+
+        self.assertEqual(new_scores['minerA']['new_predictions'], 2)
+        self.assertAlmostEqual(new_scores['minerA']['total_score'], 100 + 57)
+        self.assertEqual(new_scores['minerB'], {'total_score': 0.0, 'new_predictions': 0})
+
+    def test_running_sums_are_upserted(self):
+        scoring_calculator = ScoringCalculator(self.database_manager, None)
+        scoring_calculator.process_scorable_predictions([
+            ('minerA', 100000, '2024-09-10', 100000, '2024-09-10T00:00:00Z'),
+            ('minerB', 50000, '2024-09-10', 100000, '2024-09-10T00:00:00Z'),
+        ])
+        scoring_calculator.process_scorable_predictions([
+            ('minerA', 50000, '2024-09-10', 100000, '2024-09-10T00:00:00Z'),
+        ])
+
+        lifetime = self.database_manager.query("SELECT miner_hotkey, lifetime_score, total_predictions, sum_score FROM miner_scores ORDER BY miner_hotkey")
+        daily = self.database_manager.query("SELECT miner_hotkey, score, total_predictions, sum_score FROM daily_scores ORDER BY miner_hotkey")
+
+        for rows in [lifetime, daily]:
+            self.assertEqual([(x[0], x[2]) for x in rows], [('minerA', 2), ('minerB', 1)])
+            self.assertAlmostEqual(rows[0][3], 100 + 57)
+            self.assertAlmostEqual(rows[0][1], (100 + 57) / 2)
+            self.assertAlmostEqual(rows[1][1], 57)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+import json
+import threading
+import unittest
+from datetime import datetime, timezone, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from nextplace.validator.api.sold_homes_api import SoldHomesAPI, SALES_WINDOW_DAYS, SALES_SYNC_OVERLAP_DAYS, SALES_FULL_SYNC_INTERVAL_HOURS
+from nextplace.validator.utils.contants import ISO8601, to_epoch_day
+from tests.helpers import DatabaseTestCase
+
+
+def _build_home(address: str, sale_price: float, sold_date: datetime) -> dict:
+    return {
+        'homeData': {
+            'propertyId': f'property-{address}',
+            'timezone': 'UTC',
+            'priceInfo': {'amount': sale_price},
+            'lastSaleData': {'lastSoldDate': sold_date.strftime(ISO8601)},
+            'addressInfo': {'formattedStreetLine': address, 'zip': '43004'},
+        }
+    }
+
+
+class StubRedfinServer:
+    """
+    Local stand-in for the redfin API. Serves a queue of (status, headers, homes) responses per region.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.responses: dict[str, list[tuple[int, dict, list]]] = {}
+        self.requests: list[dict[str, str]] = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+                with stub.lock:
+                    stub.requests.append(params)
+                    queued = stub.responses.get(params['regionId'], [])
+                    status, headers, homes = queued.pop(0) if queued else (200, {}, [])
+                body = json.dumps({'data': homes}).encode()
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def queue(self, region_id: str, homes: list, status: int = 200, headers: dict or None = None) -> None:
+        self.responses.setdefault(region_id, []).append((status, headers or {}, homes))
+
+    def shutdown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestSoldHomesAPI(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.stub = StubRedfinServer()
+        self.markets = [{'id': 'region-1', 'name': 'Columbus'}, {'id': 'region-2', 'name': 'Austin'}]
+        self.sold_homes_api = SoldHomesAPI(self.database_manager, self.markets, base_url=self.stub.base_url, max_workers=2)
+        self.now = datetime.now(timezone.utc).replace(microsecond=0)
+
+    def tearDown(self):
+        self.stub.shutdown()
+        self.sold_homes_api.session.close()
+        super().tearDown()
+
+    def _requests_for(self, region_id: str) -> list[dict[str, str]]:
+        return [x for x in self.stub.requests if x['regionId'] == region_id]
+
+    def test_first_sync_fetches_full_window_and_records_high_water_mark(self):
+        newest = self.now - timedelta(days=1)
+        self.stub.queue('region-1', [
+            _build_home('1 Main St', 100.0, self.now - timedelta(days=5)),
+            _build_home('2 Main St', 200.0, newest),
+        ])
+        self.sold_homes_api.get_sold_properties()
+
+        self.assertEqual(self._requests_for('region-1')[0]['soldWithin'], str(SALES_WINDOW_DAYS))
+        self.assertEqual(self.database_manager.get_size_of_table('sales'), 2)
+        sync_state = self.database_manager.query("SELECT high_water_mark FROM sales_sync_state WHERE market_id = 'region-1'")
+        self.assertEqual(sync_state, [(newest.strftime(ISO8601),)])
+
+    def test_next_sync_only_fetches_since_high_water_mark_and_upserts(self):
+        sold_date = self.now - timedelta(days=1)
+        self.stub.queue('region-1', [_build_home('1 Main St', 100.0, sold_date)])
+        self.sold_homes_api.get_sold_properties()
+        self.stub.queue('region-1', [_build_home('1 Main St', 150.0, sold_date)])
+        self.sold_homes_api.get_sold_properties()
+
+        self.assertEqual(self._requests_for('region-1')[-1]['soldWithin'], str(2 + SALES_SYNC_OVERLAP_DAYS))
+        self.assertEqual(self.database_manager.query("SELECT sale_price FROM sales"), [(150.0,)])
+
+    def test_daily_full_sync_picks_up_late_reported_sales(self):
+        self.stub.queue('region-1', [_build_home('1 Main St', 100.0, self.now - timedelta(days=1))])
+        self.sold_homes_api.get_sold_properties()
+        self.sold_homes_api.get_sold_properties()  # Incremental, so a sale dated before the high-water mark is missed
+        self.assertEqual(self._requests_for('region-1')[-1]['soldWithin'], str(2 + SALES_SYNC_OVERLAP_DAYS))
+
+        a_day_ago = (self.now - timedelta(hours=SALES_FULL_SYNC_INTERVAL_HOURS)).strftime(ISO8601)
+        self.database_manager.query_and_commit_with_values("UPDATE sales_sync_state SET last_full_sync = ?", (a_day_ago,))
+        self.stub.queue('region-1', [_build_home('2 Main St', 200.0, self.now - timedelta(days=10))])  # Reported days late
+        self.sold_homes_api.get_sold_properties()
+
+        self.assertEqual(self._requests_for('region-1')[-1]['soldWithin'], str(SALES_WINDOW_DAYS))
+        self.assertEqual(self.database_manager.query("SELECT sale_price FROM sales ORDER BY sale_price"), [(100.0,), (200.0,)])
+        high_water_mark, last_full_sync = self.database_manager.query("SELECT high_water_mark, last_full_sync FROM sales_sync_state WHERE market_id = 'region-1'")[0]
+        self.assertEqual(high_water_mark, (self.now - timedelta(days=1)).strftime(ISO8601))  # The late sale doesn't move it back
+        self.assertGreater(last_full_sync, a_day_ago)
+
+    def test_pages_are_ingested_until_a_short_page(self):
+        self.sold_homes_api.max_results_per_page = 2
+        self.stub.queue('region-1', [
+            _build_home('1 Main St', 100.0, self.now - timedelta(days=1)),
+            _build_home('2 Main St', 100.0, self.now - timedelta(days=1)),
+        ])
+        self.stub.queue('region-1', [_build_home('3 Main St', 100.0, self.now - timedelta(days=1))])
+        self.sold_homes_api.get_sold_properties()
+
+        self.assertEqual([x['page'] for x in self._requests_for('region-1')], ['1', '2'])
+        self.assertEqual(self.database_manager.get_size_of_table('sales'), 3)
+
+    def test_rate_limited_requests_are_retried(self):
+        self.stub.queue('region-1', [], status=429, headers={'Retry-After': '0'})
+        self.stub.queue('region-1', [_build_home('1 Main St', 100.0, self.now - timedelta(days=1))])
+        self.sold_homes_api.get_sold_properties()
+
+        self.assertEqual(len(self._requests_for('region-1')), 2)
+        self.assertEqual(self.database_manager.get_size_of_table('sales'), 1)
+
+    def test_failed_sync_keeps_high_water_mark(self):
+        self.stub.queue('region-1', [], status=500)
+        self.sold_homes_api.get_sold_properties()
+        synced = self.database_manager.query("SELECT market_id FROM sales_sync_state")
+        self.assertEqual(synced, [('region-2',)])
+
+    def test_expired_sales_are_pruned(self):
+        expired_day = to_epoch_day(self.now - timedelta(days=SALES_WINDOW_DAYS + 1))
+        self.database_manager.query_and_commit_with_values(
+            "INSERT INTO sales (nextplace_id, property_id, sale_price, sale_date, sale_day) VALUES (?, ?, ?, ?, ?)",
+            ('old-home', 'p1', 100.0, '2000-01-01T00:00:00Z', expired_day)
+        )
+        self.stub.queue('region-1', [_build_home('1 Main St', 100.0, self.now - timedelta(days=1))])
+        self.sold_homes_api.get_sold_properties()
+
+        self.assertEqual(self.database_manager.query("SELECT nextplace_id FROM sales WHERE nextplace_id = 'old-home'"), [])
+        self.assertEqual(self.database_manager.get_size_of_table('sales'), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
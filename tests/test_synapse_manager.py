@@ -0,0 +1,73 @@
+import threading
+import unittest
+from nextplace.validator.synapse.synapse_manager import SynapseManager, MIN_PROPERTIES_PER_SYNAPSE, TARGET_RESPONSE_SECONDS
+from nextplace.validator.utils.contants import NUMBER_OF_PROPERTIES_PER_SYNAPSE
+from tests.helpers import DatabaseTestCase
+
+
+class TestSynapseManager(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.synapse_manager = SynapseManager(self.database_manager)
+
+    def _add_properties(self, count: int) -> None:
+        self.database_manager.query_and_commit_many(
+            "INSERT INTO properties (nextplace_id, address, price, market) VALUES (?, ?, ?, ?)",
+            [(f'home-{idx}', f'{idx} Main St', 100000 + idx, 'Columbus') for idx in range(count)]
+        )
+
+    def test_synapse_maps_columns_by_name(self):
+        self._add_properties(1)
+        prediction = self.synapse_manager.get_synapse().real_estate_predictions.predictions[0]
+        self.assertEqual(prediction.nextplace_id, 'home-0')
+        self.assertEqual(prediction.address, '0 Main St')
+        self.assertEqual(prediction.price, 100000)
+        self.assertEqual(prediction.market, 'Columbus')
+
+    def test_claimed_properties_are_removed(self):
+        self._add_properties(NUMBER_OF_PROPERTIES_PER_SYNAPSE + 5)
+        synapse = self.synapse_manager.get_synapse()
+        self.assertEqual(len(synapse.real_estate_predictions.predictions), NUMBER_OF_PROPERTIES_PER_SYNAPSE)
+        self.assertEqual(self.database_manager.get_size_of_table('properties'), 5)
+        self.assertEqual(len(self.synapse_manager.get_synapse().real_estate_predictions.predictions), 5)
+        self.assertIsNone(self.synapse_manager.get_synapse())
+
+    def test_concurrent_claims_are_disjoint(self):
+        self._add_properties(NUMBER_OF_PROPERTIES_PER_SYNAPSE * 4)
+        claimed = []
+        lock = threading.Lock()
+
+        def claim():
+            synapse = self.synapse_manager.get_synapse()
+            with lock:
+                claimed.extend(x.nextplace_id for x in synapse.real_estate_predictions.predictions)
+
+        threads = [threading.Thread(target=claim) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(claimed), NUMBER_OF_PROPERTIES_PER_SYNAPSE * 4)
+        self.assertEqual(len(set(claimed)), len(claimed))
+
+    def test_batch_size_adapts_to_response_time(self):
+        for _ in range(20):
+            self.synapse_manager.record_response_times([TARGET_RESPONSE_SECONDS * 2])
+        self.assertEqual(self.synapse_manager.batch_size, MIN_PROPERTIES_PER_SYNAPSE)
+        self.synapse_manager.record_response_times([1])
+        self.assertGreater(self.synapse_manager.batch_size, MIN_PROPERTIES_PER_SYNAPSE)
+        for _ in range(20):
+            self.synapse_manager.record_response_times([1])
+        self.assertEqual(self.synapse_manager.batch_size, NUMBER_OF_PROPERTIES_PER_SYNAPSE)
+
+    def test_a_few_slow_miners_do_not_shrink_the_batch(self):
+        latencies = [1.0] * 90 + [TARGET_RESPONSE_SECONDS * 2] * 10
+        for _ in range(20):
+            self.synapse_manager.record_response_times(latencies)
+        self.assertEqual(self.synapse_manager.batch_size, NUMBER_OF_PROPERTIES_PER_SYNAPSE)
+        self.synapse_manager.record_response_times([])  # No successful responses, keep the current size
+        self.assertEqual(self.synapse_manager.batch_size, NUMBER_OF_PROPERTIES_PER_SYNAPSE)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+from datetime import datetime, timezone
+from nextplace.validator.database.table_initializer import TableInitializer
+from nextplace.validator.utils.contants import to_epoch_day
+from tests.helpers import DatabaseTestCase
+
+
+class TestTableInitializer(DatabaseTestCase):
+    create_tables = False
+
+    def setUp(self):
+        super().setUp()
+        self.table_initializer = TableInitializer(self.database_manager)
+
+    def _create_legacy_predictions_table(self, miner_hotkey: str, rows: list[tuple]) -> None:
+        self.database_manager.query_and_commit(f"""
+            CREATE TABLE predictions_{miner_hotkey} (
+                nextplace_id TEXT,
+                miner_hotkey TEXT,
+                predicted_sale_price REAL,
+                predicted_sale_date TEXT,
+                prediction_timestamp TEXT,
+                market TEXT,
+                PRIMARY KEY (nextplace_id, miner_hotkey)
+            )
+        """)
+        self.database_manager.query_and_commit_many(f"""
+            INSERT INTO predictions_{miner_hotkey}
+            (nextplace_id, miner_hotkey, predicted_sale_price, predicted_sale_date, prediction_timestamp, market)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, rows)
+
+    def test_legacy_predictions_tables_are_migrated(self):
+        self._create_legacy_predictions_table("hotkeyA", [
+            ("home1", "hotkeyA", 100.0, "2024-09-01", "2024-08-20T00:00:00Z", "Columbus"),
+            ("home2", "hotkeyA", 200.0, "2024-09-02", "2024-08-20T00:00:00Z", "Columbus"),
+        ])
+        self._create_legacy_predictions_table("hotkeyB", [
+            ("home1", "hotkeyB", 150.0, "2024-09-03", "2024-08-21T00:00:00Z", "Orlando"),
+        ])
+
+        self.table_initializer.create_tables()
+
+        rows = self.database_manager.query("SELECT miner_hotkey, nextplace_id, predicted_sale_price FROM predictions ORDER BY miner_hotkey, nextplace_id")
+        self.assertEqual(rows, [("hotkeyA", "home1", 100.0), ("hotkeyA", "home2", 200.0), ("hotkeyB", "home1", 150.0)])
+        self.assertFalse(self.database_manager.table_exists("predictions_hotkeyA"))
+        self.assertFalse(self.database_manager.table_exists("predictions_hotkeyB"))
+
+    def test_day_columns_are_added_and_backfilled(self):
+        self.database_manager.query_and_commit("""
+            CREATE TABLE sales (nextplace_id TEXT PRIMARY KEY, property_id TEXT, sale_price REAL, sale_date DATETIME)
+        """)
+        self.database_manager.query_and_commit("INSERT INTO sales VALUES ('home1', 'p1', 100.0, '2024-09-10T23:59:59Z')")
+        self._create_legacy_predictions_table("hotkeyA", [
+            ("home1", "hotkeyA", 100.0, "2024-09-01", "2024-09-09T00:00:01Z", "Columbus"),
+        ])
+
+        self.table_initializer.create_tables()
+
+        expected_sale_day = to_epoch_day(datetime(2024, 9, 10, tzinfo=timezone.utc))
+        self.assertEqual(self.database_manager.query("SELECT sale_day FROM sales"), [(expected_sale_day,)])
+        self.assertEqual(self.database_manager.query("SELECT prediction_day FROM predictions"), [(expected_sale_day - 1,)])
+
+    def test_market_coverage_is_backfilled_from_recent_predictions(self):
+        recent = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        self._create_legacy_predictions_table("hotkeyA", [
+            ("home1", "hotkeyA", 100.0, "2024-09-01", recent, "Columbus"),
+            ("home2", "hotkeyA", 100.0, "2024-09-01", recent, "Columbus"),
+            ("home3", "hotkeyA", 100.0, "2024-09-01", "2024-08-20T00:00:00Z", "Orlando"),
+        ])
+
+        self.table_initializer.create_tables()
+
+        today = to_epoch_day(datetime.now(timezone.utc))
+        self.assertEqual(self.database_manager.query("SELECT miner_hotkey, market, day, predictions FROM market_coverage"), [("hotkeyA", "Columbus", today, 2)])
+
+    def test_sum_score_columns_are_added_and_backfilled(self):
+        self.database_manager.query_and_commit("""
+            CREATE TABLE miner_scores (miner_hotkey TEXT PRIMARY KEY, lifetime_score REAL, total_predictions INTEGER, last_update_timestamp DATETIME)
+        """)
+        self.database_manager.query_and_commit("INSERT INTO miner_scores VALUES ('hotkeyA', 80.0, 4, '2024-09-10T00:00:00Z')")
+
+        self.table_initializer.create_tables()
+
+        self.assertEqual(self.database_manager.query("SELECT sum_score FROM miner_scores"), [(320.0,)])
+
+    def test_create_tables_is_idempotent(self):
+        self.table_initializer.create_tables()
+        self.table_initializer.create_tables()
+        self.assertTrue(self.database_manager.table_exists("predictions"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import threading
+import unittest
+import torch
+from unittest.mock import patch
+from datetime import datetime, timezone, timedelta
+from types import SimpleNamespace
+from nextplace.validator.scoring.score_window import ScoreWindow
+from nextplace.validator.setting_weights.weights import WeightSetter
+from nextplace.validator.utils.contants import ISO8601, to_epoch_day
+from tests.helpers import DatabaseTestCase
+
+
+class TestWeightSetter(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.score_window = ScoreWindow(self.database_manager)
+        self.weight_setter = WeightSetter(None, None, None, None, self.database_manager, self.score_window)
+        self.now = datetime.now(timezone.utc)
+        self.metagraph = SimpleNamespace(hotkeys=['full', 'partial', 'stale', 'new', 'unscored'])
+
+    def _add_score(self, hotkey: str, score: float, total_predictions: int, days_since_update: int) -> None:
+        last_update = (self.now - timedelta(days=days_since_update)).strftime(ISO8601)
+        self.database_manager.query_and_commit_with_values(
+            "INSERT INTO miner_scores (miner_hotkey, lifetime_score, total_predictions, last_update_timestamp) VALUES (?, ?, ?, ?)",
+            (hotkey, score, total_predictions, last_update)
+        )
+        self.score_window.add_scores({hotkey: {'total_score': score * total_predictions, 'new_predictions': total_predictions}}, to_epoch_day(self.now))
+
+    def _add_predictions(self, hotkey: str, markets: int, days_ago: int = 0) -> None:
+        day = to_epoch_day(self.now) - days_ago
+        self.database_manager.query_and_commit_many(
+            "INSERT INTO market_coverage (miner_hotkey, market, day, predictions) VALUES (?, ?, ?, ?)",
+            [(hotkey, f'market-{idx}', day, 3) for idx in range(markets)]
+        )
+
+    def test_applies_scaling_factors(self):
+        self._add_score('full', 10.0, 100, 0)
+        self._add_predictions('full', 10)
+        self._add_score('partial', 10.0, 100, 0)
+        self._add_predictions('partial', 4)  # Average is 7 markets, 4 < int(7 * 0.75)
+        self._add_score('stale', 10.0, 100, 6)
+        self._add_score('new', 10.0, 3, 0)
+        self._add_predictions('new', 7)
+        self._add_predictions('new', 20, days_ago=5)  # Just outside the 5 day coverage window
+        self._add_score('deregistered', 10.0, 100, 0)
+
+        scores = self.weight_setter.calculate_miner_scores(self.metagraph)
+        self.assertEqual(len(scores), 5)
+        expected = [10.0, 10.0 * 0.6, 10.0 * 0.5 * 0.5, 10.0 * 0.7, 0.0]
+        for actual, wanted in zip(scores.tolist(), expected):
+            self.assertAlmostEqual(actual, wanted, places=5)
+
+    def test_uses_trailing_window_average_not_lifetime_score(self):
+        self._add_score('full', 10.0, 100, 0)
+        self._add_predictions('full', 10)
+        self.database_manager.query_and_commit("UPDATE miner_scores SET lifetime_score = 90.0")  # Old, out of window scores
+        self.assertAlmostEqual(self.weight_setter.calculate_miner_scores(self.metagraph).tolist()[0], 10.0, places=5)
+
+    def test_tiered_factor_picks_strictest_tier(self):
+        factors = self.weight_setter.tiered_factor(torch.tensor([0.0, 5.0, 12.0, 30.0]), [(5, 0.7), (10, 0.725), (15, 0.75)])
+        self.assertEqual([round(x, 3) for x in factors.tolist()], [0.7, 0.725, 0.75, 1.0])
+
+    def test_no_predictions_scores_zero(self):
+        self._add_score('full', 10.0, 100, 0)
+        self.assertEqual(self.weight_setter.calculate_miner_scores(self.metagraph).tolist(), [0.0] * 5)
+
+    def _weight_setter_with_chain(self, set_weights, connections: list = None) -> WeightSetter:
+        hotkeys = ['validator', 'full'] + [f'miner{idx}' for idx in range(8)]
+        metagraph = SimpleNamespace(hotkeys=hotkeys, S=[5000.0] + [0.0] * 9, uids=list(range(10)))
+        wallet = SimpleNamespace(hotkey=SimpleNamespace(ss58_address='validator'))
+        metagraph_cache = SimpleNamespace(snapshot=lambda: metagraph)
+
+        def connect():
+            subtensor = SimpleNamespace(set_weights=set_weights, closed=False)
+            subtensor.close = lambda: setattr(subtensor, 'closed', True)
+            if connections is not None:
+                connections.append(subtensor)
+            return subtensor
+
+        return WeightSetter(metagraph_cache, wallet, connect, SimpleNamespace(netuid=1), self.database_manager, self.score_window)
+
+    def test_set_weights_records_metrics(self):
+        self._add_score('full', 10.0, 100, 0)
+        self._add_predictions('full', 10)
+        calls = []
+        connections = []
+        weight_setter = self._weight_setter_with_chain(lambda **kwargs: calls.append(kwargs) or (True, ''), connections)
+
+        self.assertTrue(weight_setter.set_weights())
+        self.assertTrue(weight_setter.set_weights())
+        self.assertEqual(calls[0]['uids'], list(range(10)))
+        self.assertAlmostEqual(float(calls[0]['weights'].sum()), 1.0, places=5)
+        self.assertEqual(len(connections), 1)  # The connection is kept between calls
+        metrics = weight_setter.get_metrics()
+        self.assertEqual((metrics['attempts'], metrics['successes'], metrics['timeouts']), (2, 2, 0))
+        self.assertIsNotNone(metrics['last_success'])
+
+    def test_hung_extrinsic_is_abandoned_for_a_fresh_connection(self):
+        release = threading.Event()
+        calls = []
+        connections = []
+
+        def set_weights(**kwargs):
+            calls.append(kwargs)
+            if len(calls) == 1:
+                release.wait()  # Only the first call hangs
+            return True, ''
+
+        weight_setter = self._weight_setter_with_chain(set_weights, connections)
+        hung_executor = weight_setter.extrinsic_executor
+
+        with patch('nextplace.validator.setting_weights.weights.SET_WEIGHTS_TIMEOUT_SECONDS', 0.1):
+            self.assertFalse(weight_setter.set_weights())
+            self.assertTrue(weight_setter.set_weights())  # Runs on a new thread and connection, not behind the hung call
+        release.set()
+        hung_executor.shutdown(wait=True)
+        weight_setter.extrinsic_executor.shutdown(wait=True)
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(len(connections), 2)
+        self.assertTrue(connections[0].closed)
+        self.assertFalse(connections[1].closed)
+        metrics = weight_setter.get_metrics()
+        self.assertEqual((metrics['timeouts'], metrics['successes']), (1, 1))
+
+if __name__ == '__main__':
+    unittest.main()